@@ -1,4 +1,6 @@
 import os
+import threading
+import time
 from pymongo import MongoClient
 from dotenv import load_dotenv
 from pymongo.errors import BulkWriteError
@@ -9,22 +11,84 @@ from pymongo.errors import BulkWriteError  # ✅ correct
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
-if not DATABASE_URL:
-    raise ValueError("Missing DATABASE_URL in .env")
 
-client = MongoClient(DATABASE_URL)
-db = client.get_default_database()
-events_collection = db['events']
+# The Mongo connection (and the index check) is opened on first use rather than
+# at import time, so importing a scraper module stays cheap.
+_database = None
+_events_collection = None
+_connection_lock = threading.Lock()
 
-# Create a compound index on title + date + link to prevent duplicates
-events_collection.create_index(
-    [("title", 1), ("date", 1), ("link", 1)],
-    unique=True
-)
+def get_database():
+    """Return the default database of DATABASE_URL, connecting on the first call."""
+    global _database
+    if _database is None:
+        with _connection_lock:
+            if _database is None:
+                if not DATABASE_URL:
+                    raise ValueError("Missing DATABASE_URL in .env")
+                _database = MongoClient(DATABASE_URL).get_default_database()
+    return _database
+
+def get_events_collection():
+    """Return the 'events' collection, creating its index on the first call."""
+    global _events_collection
+    if _events_collection is None:
+        collection = get_database()['events']
+        with _connection_lock:
+            if _events_collection is None:
+                # Create a compound index on title + date + link to prevent duplicates
+                collection.create_index(
+                    [("title", 1), ("date", 1), ("link", 1)],
+                    unique=True
+                )
+                _events_collection = collection
+    return _events_collection
+
+# When set, save_events_bulk hands the events to this callable instead of writing
+# them to Mongo. Child processes use it to send their events back to the parent.
+_event_sink = None
+
+def set_event_sink(sink):
+    """Redirect save_events_bulk to `sink(events)`. Pass None to write to Mongo again."""
+    global _event_sink
+    _event_sink = sink
+
+# Per-thread totals of what save_events_bulk did, so the runner can tell how
+# many events a source actually inserted or changed during its run, and how
+# long it spent writing them.
+_write_stats = threading.local()
+
+def reset_write_stats():
+    """Zero the current thread's write totals."""
+    _write_stats.events = 0
+    _write_stats.upserted = 0
+    _write_stats.modified = 0
+    _write_stats.seconds = 0.0
+
+def get_write_stats():
+    """Write totals of the current thread since the last reset_write_stats()."""
+    return {
+        "events": getattr(_write_stats, "events", 0),
+        "upserted": getattr(_write_stats, "upserted", 0),
+        "modified": getattr(_write_stats, "modified", 0),
+        "seconds": getattr(_write_stats, "seconds", 0.0),
+    }
+
+def add_write_stats(stats):
+    """Add write totals collected on other threads to the current thread's."""
+    _count_writes(stats.get("events", 0), stats.get("upserted", 0), stats.get("modified", 0),
+                  stats.get("seconds", 0.0))
+
+def _count_writes(events=0, upserted=0, modified=0, seconds=0.0):
+    stats = get_write_stats()
+    _write_stats.events = stats["events"] + events
+    _write_stats.upserted = stats["upserted"] + upserted
+    _write_stats.modified = stats["modified"] + modified
+    _write_stats.seconds = stats["seconds"] + seconds
 
 def event_exists(title, date, link):
     """Check if an event with the same title, date, and link already exists."""
-    return events_collection.find_one({
+    return get_events_collection().find_one({
         "title": title,
         "date": date,
         "link": link
@@ -33,7 +97,7 @@ def event_exists(title, date, link):
 def save_event(event_data):
     """Insert a single event dictionary into the 'events' collection."""
     if not event_exists(event_data["title"], event_data["date"], event_data["link"]):
-        events_collection.insert_one(event_data)
+        get_events_collection().insert_one(event_data)
         print(f"✅ Saved event: {event_data['title']}")
     else:
         print(f"🔁 Duplicate (single): {event_data['title']} on {event_data['date']}")
@@ -59,7 +123,13 @@ def save_events_bulk(events):
     Upsert multiple events into the database.
     - If an event with the same title + date + link exists, update it.
     - Otherwise, insert it.
+    Raises BulkWriteError if any of them could not be written.
     """
+    if _event_sink is not None:
+        _event_sink(list(events))
+        _count_writes(events=len(events))
+        return
+
     operations = []
 
     for event in events:
@@ -75,11 +145,19 @@ def save_events_bulk(events):
         operations.append(UpdateOne(filter_, update, upsert=True))
 
     if operations:
+        start = time.perf_counter()
         try:
-            result = events_collection.bulk_write(operations, ordered=False)
+            result = get_events_collection().bulk_write(operations, ordered=False)
             print(f"✅ Upserted {result.upserted_count} | Modified {result.modified_count} | Matched {result.matched_count}")
+            _count_writes(len(operations), result.upserted_count, result.modified_count,
+                          time.perf_counter() - start)
         except BulkWriteError as bwe:
             print(f"❌ Bulk write error: {bwe.details}")
+            _count_writes(len(operations), bwe.details.get("nUpserted", 0), bwe.details.get("nModified", 0),
+                          time.perf_counter() - start)
+            # Some events were not written: the caller must not mark the page
+            # saved (checkpoint, HTTP cache), or the next run would skip it.
+            raise
 
 
 def deduplicate_events(events):
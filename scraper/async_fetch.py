@@ -0,0 +1,196 @@
+import asyncio
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+try:
+    import aiohttp
+except ImportError:  # optional: without it the requests run on threads through http_client
+    aiohttp = None
+
+from scraper import circuit_breaker, http_client, proxy_pool, rate_limit
+from scraper.config import ASYNC_CONCURRENCY, CASSETTE_MODE, HTTP_POOL_PER_HOST, HTTP_RETRIES
+from scraper.timing import add_timings
+
+# --- Async fetch engine ---
+# Fetches many independent URLs at once on an asyncio loop and hands each page
+# back as soon as it arrives, so a scraper can parse one page while the others
+# are still downloading:
+#
+#     for page in async_fetch.fetch_all(detail_urls, headers=HEADERS, verify=False):
+#         if page["error"]:
+#             ...
+#         parse(page["content"], page["url"], page["encoding"])
+#
+# Each page is a dict: url, status, content (the raw body), encoding (see
+# http_client.page_encoding), not_modified, error (None, or why the fetch
+# failed, including HTTP error statuses) and seconds.
+#
+# With aiohttp installed the whole batch runs on one thread. Without it, when a
+# call asks for cache=True or until=... (both live in http_client) or while a
+# cassette is recorded or replayed (scraper/cassette.py), every request
+# goes through http_client.get on a small thread pool instead; the limits below
+# and the per-host rate limiter, retries and circuit breaker of the shared
+# client apply either way.
+#
+# The loop runs on its own thread, so fetch_all() can be called from the
+# ordinary (synchronous) scraper code.
+
+_DONE = object()
+
+# Failures to reach or get through the proxy (its 407 included), as opposed to the site's.
+_PROXY_ERRORS = (aiohttp.ClientProxyConnectionError, aiohttp.ClientHttpProxyError) if aiohttp else ()
+
+
+def _host(url):
+    return urlsplit(url).netloc
+
+
+def _timeout(kwargs):
+    timeout = kwargs.get("timeout", http_client.DEFAULT_TIMEOUT)
+    if isinstance(timeout, tuple):
+        return aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+    return aiohttp.ClientTimeout(total=timeout)
+
+
+async def _get_with_aiohttp(session, url, kwargs):
+    # Same rate limits, proxies, retries and circuit breaker as http_client._send.
+    circuit_breaker.check(url)
+    try:
+        return await _aiohttp_attempts(session, url, kwargs)
+    finally:
+        circuit_breaker.release(url)
+
+
+async def _aiohttp_attempts(session, url, kwargs):
+    proxy = None
+    for attempt in range(HTTP_RETRIES + 1):
+        proxy = proxy_pool.choose(url, avoid=proxy)
+        via = proxy_pool.label(proxy) if proxy else None
+        await asyncio.sleep(rate_limit.reserve(url, via))
+        start = time.perf_counter()
+        error = status = retry_after = None
+        try:
+            async with session.get(url, headers=kwargs.get("headers"), params=kwargs.get("params"),
+                                   proxy=proxy if proxy != proxy_pool.DIRECT else None,
+                                   ssl=kwargs.get("verify", True) is not False, timeout=_timeout(kwargs)) as response:
+                content = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            rate_limit.record(url, error=True, via=via)
+            if isinstance(e, _PROXY_ERRORS):
+                proxy_pool.record(proxy, error=True)
+            error = e
+        else:
+            status = response.status
+            seconds = time.perf_counter() - start
+            rate_limit.record(url, status, seconds, response.headers, via=via)
+            proxy_pool.record(proxy, seconds, status)
+            retry_statuses = http_client.RETRY_STATUSES | proxy_pool.PROXY_ERROR_STATUSES if proxy else http_client.RETRY_STATUSES
+            if status not in retry_statuses:
+                circuit_breaker.record(url, ok=True)
+                return status, content, http_client.encoding_from(response.headers.get("Content-Type"), content), False
+            retry_after = rate_limit.parse_retry_after(response.headers.get("Retry-After"))
+
+        if attempt < HTTP_RETRIES:
+            await asyncio.sleep(http_client.retry_delay(attempt, retry_after))
+
+    # As in http_client._send: the proxy failing says nothing about the host.
+    if status is not None and status >= 500 or status is None and not isinstance(error, _PROXY_ERRORS):
+        circuit_breaker.record(url, ok=False)
+    if error:
+        raise error
+    return status, content, http_client.encoding_from(response.headers.get("Content-Type"), content), False
+
+
+async def _get_with_requests(url, kwargs):
+    response = await asyncio.to_thread(http_client.get, url, **kwargs)
+    return response.status_code, response.content, http_client.page_encoding(response), response.not_modified
+
+
+async def _fetch_all(urls, out, concurrency, per_host, kwargs):
+    # to_thread() uses the loop's default executor; size it to the limit.
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+    in_flight = asyncio.Semaphore(concurrency)
+    host_limits = {}
+
+    session = None
+    if aiohttp is not None and not kwargs.get("cache") and not kwargs.get("until") and not CASSETTE_MODE:
+        session = aiohttp.ClientSession(
+            headers=http_client.DEFAULT_HEADERS,
+            connector=aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host),
+        )
+
+    async def fetch_one(url):
+        host_limit = host_limits.setdefault(_host(url), asyncio.Semaphore(per_host))
+        async with in_flight, host_limit:
+            start = time.perf_counter()
+            page = {"url": url, "status": None, "content": None, "encoding": None, "not_modified": False, "error": None}
+            try:
+                if session is not None:
+                    page["status"], page["content"], page["encoding"], page["not_modified"] = await _get_with_aiohttp(session, url, kwargs)
+                else:
+                    page["status"], page["content"], page["encoding"], page["not_modified"] = await _get_with_requests(url, kwargs)
+                if page["status"] >= 400:
+                    page["error"] = f"HTTP {page['status']}"
+            except Exception as e:
+                page["error"] = f"{type(e).__name__}: {e}"
+            page["seconds"] = time.perf_counter() - start
+        out.put(page)
+
+    try:
+        await asyncio.gather(*(fetch_one(url) for url in urls))
+    finally:
+        if session is not None:
+            await session.close()
+        out.put(_DONE)
+
+
+def fetch_all(urls, concurrency=None, per_host=None, **kwargs):
+    """
+    Fetch `urls` concurrently and yield each page (see above) as it completes,
+    in completion order. Keyword arguments are those of http_client.get
+    (headers, verify, timeout, cache...).
+
+    Stopping the iteration early cancels the requests still in flight.
+    The time spent on each request is added to the source's "fetch" timing.
+    """
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return
+    concurrency = concurrency or ASYNC_CONCURRENCY
+    per_host = per_host or HTTP_POOL_PER_HOST
+    out = queue.Queue()
+    running = {}
+
+    async def main():
+        running["loop"] = asyncio.get_running_loop()
+        running["task"] = asyncio.current_task()
+        await _fetch_all(urls, out, concurrency, per_host, kwargs)
+
+    def run():
+        try:
+            asyncio.run(main())
+        except asyncio.CancelledError:
+            pass
+
+    # The copied context keeps the requests on the calling source's cassette.
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(run,), name="async-fetch", daemon=True)
+    thread.start()
+
+    fetch_seconds = 0.0
+    finished = False
+    try:
+        while True:
+            page = out.get()
+            if page is _DONE:
+                finished = True
+                break
+            fetch_seconds += page["seconds"]
+            yield page
+    finally:
+        if not finished and "loop" in running:
+            running["loop"].call_soon_threadsafe(running["task"].cancel)
+        add_timings({"fetch": fetch_seconds})
@@ -0,0 +1,154 @@
+import os
+from urllib.parse import urljoin
+
+from scraper import html_parser
+from scraper.utils import load_scraper_configs
+
+# --- Card specs ---
+# The listing pages of the static sources all look alike: a container, a run
+# of cards, a few fields per card. Instead of each module walking its cards by
+# hand, scraper_configs.json (next to this file) describes them per source and
+# extract() runs every spec through the same loop. The specs are read and their
+# selectors compiled once, the first time a source's spec is asked for.
+#
+#     "lebillet": {
+#         "only": "div.next-shows-inner",     # parse just this (html_parser.parse)
+#         "container": "div.next-shows-inner", # cards are looked for in here
+#         "cards": "div.show-card",
+#         "fields": {
+#             "title": {"select": "h3.title", "required": true},
+#             "link": {"select": "a.card-link", "attr": "href"},
+#             ...
+#         }
+#     }
+#
+# Field options:
+#   select      CSS selector, or a list of them tried in order (fallbacks);
+#               without it the field is read from the card itself
+#   attr        read this attribute instead of the text
+#   separator   read the text as get_text(separator, strip=True) does
+#   all         a list with the value of every match (empty ones dropped)
+#   transforms  names from TRANSFORMS applied in order, e.g. ["absolute_url"]
+#   default     the value when nothing matches (None if not given)
+#   required    skip the card when nothing matches (they are counted, not logged one by one)
+#
+# Values are always stripped. "base_url" in a spec resolves absolute_url when
+# the page URL isn't known.
+
+SPECS_FILE = os.path.join(os.path.dirname(__file__), "scraper_configs.json")
+
+TRANSFORMS = {
+    "absolute_url": lambda value, base_url: urljoin(base_url, value) if base_url else value,
+    "collapse_whitespace": lambda value, base_url: " ".join(value.split()),
+    "lower": lambda value, base_url: value.lower(),
+}
+
+
+class _Incomplete(Exception):
+    """A required field of a card found nothing."""
+
+
+class CardSpec:
+    def __init__(self, name, spec):
+        self.name = name
+        self.only = spec.get("only")
+        self.base_url = spec.get("base_url")
+        self.container = html_parser.compile(spec["container"]) if spec.get("container") else None
+        self.cards = html_parser.compile(spec["cards"])
+        self.fields = [self._compile_field(field, options) for field, options in spec["fields"].items()]
+
+    def _compile_field(self, field, options):
+        selectors = options.get("select") or []
+        if isinstance(selectors, str):
+            selectors = [selectors]
+        unknown = [name for name in options.get("transforms", []) if name not in TRANSFORMS]
+        if unknown:
+            raise ValueError(f"Card spec '{self.name}', field '{field}': unknown transforms {unknown}")
+        return (
+            field,
+            tuple(html_parser.compile(css) for css in selectors),
+            options.get("attr"),
+            options.get("separator"),
+            options.get("all", False),
+            tuple(TRANSFORMS[name] for name in options.get("transforms", [])),
+            options.get("default"),
+            options.get("required", False),
+        )
+
+    def extract(self, html, url=None, encoding=None):
+        """The raw fields of every card on the page, as a list of dicts."""
+        doc = html_parser.parse(html, encoding, only=self.only)
+        if self.container is not None:
+            doc = self.container.select_one(doc)
+            if doc is None:
+                print(f"❌ Could not find the {self.name} container ({self.container.css}).")
+                return []
+        base_url = url or self.base_url
+
+        cards = []
+        incomplete = 0
+        for card in self.cards.select(doc):
+            try:
+                values = {}
+                for field, selectors, attr, separator, every, transforms, default, required in self.fields:
+                    if every:
+                        nodes = selectors[0].select(card) if selectors else [card]
+                        value = [_read(node, attr, separator, transforms, base_url) for node in nodes]
+                        value = [item for item in value if item]
+                    else:
+                        node = card
+                        for selector in selectors:
+                            node = selector.select_one(card)
+                            if node is not None:
+                                break
+                        value = _read(node, attr, separator, transforms, base_url) if node is not None else None
+                    if not value:
+                        if required:
+                            raise _Incomplete(field)
+                        if default is not None:
+                            value = default
+                    values[field] = value
+                cards.append(values)
+            except _Incomplete:
+                incomplete += 1
+            except Exception as e:
+                print(f"⚠️ Skipped {self.name} card due to error: {e}")
+
+        if incomplete:
+            print(f"⏩ Skipped {incomplete} {self.name} cards missing a required field.")
+        if not cards:
+            print(f"⚠️ No {self.name} cards found.")
+        return cards
+
+
+def _read(node, attr, separator, transforms, base_url):
+    if attr:
+        value = node.get(attr)
+        if value is None:
+            return None
+        if isinstance(value, list):  # bs4's "class"
+            value = " ".join(value)
+        value = value.strip()
+    elif separator is not None:
+        value = node.get_text(separator, strip=True)
+    else:
+        value = node.text.strip()
+    for transform in transforms:
+        value = transform(value, base_url)
+    return value
+
+
+_specs = None
+
+
+def spec(name):
+    """The compiled card spec of `name` (all specs are compiled on first use)."""
+    global _specs
+    if _specs is None:
+        _specs = {name: CardSpec(name, raw) for name, raw in load_scraper_configs(SPECS_FILE).items()}
+    return _specs[name]
+
+
+def extract(name, html, url=None, encoding=None):
+    """Run `name`'s card spec over one page (see above)."""
+    return spec(name).extract(html, url, encoding)
@@ -0,0 +1,300 @@
+import base64
+import contextlib
+import contextvars
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from scraper.config import CASSETTE_DIR, CASSETTE_MODE
+from scraper.http_cache import KEPT_HEADERS
+
+logger = logging.getLogger("event_scraper_log")
+
+# --- Record / replay ---
+# With SCRAPER_CASSETTE=record every page a source fetches is kept in memory and
+# written to CASSETTE_DIR/<source>.json.gz when the source ends: the responses
+# of http_client.get (status, headers, body) and the page_source reads of the
+# browsers opened with chrome() below. With SCRAPER_CASSETTE=replay the same
+# calls are answered from that file instead, in the order they were recorded,
+# so a whole run (parsing, categorizing, saving) can be repeated offline.
+#
+# The runner wraps each source in use(name); requests made outside of any
+# source go to the "_default" cassette. A request missing from the cassette
+# raises CassetteMiss, which scrapers see as a failed fetch.
+#
+# In replay no browser is started: ReplayDriver serves the recorded page
+# sources and answers find_element(s) by CSS from them. Clicks and scripts do
+# nothing, and XPath lookups find nothing.
+
+DEFAULT_CASSETTE = "_default"
+
+
+class CassetteMiss(requests.ConnectionError):
+    """Raised in replay mode for a request the cassette doesn't hold."""
+
+
+_current = contextvars.ContextVar("cassette_source", default=None)
+_tapes = {}
+_positions = {}
+_lock = threading.Lock()
+
+
+def recording():
+    return CASSETTE_MODE == "record"
+
+
+def replaying():
+    return CASSETTE_MODE == "replay"
+
+
+def current_source():
+    return _current.get() or DEFAULT_CASSETTE
+
+
+def path_for(name):
+    return os.path.join(CASSETTE_DIR, re.sub(r"[^\w.-]", "_", name) + ".json.gz")
+
+
+def request_key(url, params=None):
+    """The full URL a GET with `params` goes to."""
+    return requests.Request("GET", url, params=params).prepare().url
+
+
+@contextlib.contextmanager
+def use(name):
+    """
+    Record to / replay from `name`'s cassette inside the block (threads that
+    should follow must be started with contextvars.copy_context()). In record
+    mode the cassette is written when the block ends.
+    """
+    token = _current.set(name)
+    if replaying():
+        with _lock:
+            for key in [key for key in _positions if key[0] == name]:
+                del _positions[key]
+    try:
+        yield
+    finally:
+        _current.reset(token)
+        if recording():
+            save(name)
+
+
+def _load(name):
+    path = path_for(name)
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.warning(f"No cassette for '{name}' at {path}; its requests will all miss.")
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"Could not read cassette '{path}': {e}")
+    return {"http": {}, "page": {}}
+
+
+def _tape(name):
+    with _lock:
+        if name not in _tapes:
+            _tapes[name] = _load(name) if replaying() else {"http": {}, "page": {}}
+        return _tapes[name]
+
+
+def save(name):
+    """Write what `name` recorded so far and start a fresh tape."""
+    with _lock:
+        tape = _tapes.pop(name, None)
+    if not tape or not (tape["http"] or tape["page"]):
+        return
+    path = path_for(name)
+    os.makedirs(CASSETTE_DIR, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(tape, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    print(f"📼 Recorded {sum(map(len, tape['http'].values()))} responses and "
+          f"{sum(map(len, tape['page'].values()))} page sources to {path}")
+
+
+def _append(kind, key, entry):
+    tape = _tape(current_source())
+    with _lock:
+        tape[kind].setdefault(key, []).append(entry)
+
+
+def _next(kind, key):
+    """The next recorded entry for `key` (the last one again once they run out)."""
+    name = current_source()
+    entries = _tape(name)[kind].get(key)
+    if not entries:
+        raise CassetteMiss(f"{key} is not in the cassette of '{name}'")
+    with _lock:
+        position = _positions.get((name, kind, key), 0)
+        _positions[(name, kind, key)] = position + 1
+    return entries[min(position, len(entries) - 1)]
+
+
+def _peek(kind, key):
+    name = current_source()
+    entries = _tape(name)[kind].get(key)
+    if not entries:
+        return None
+    with _lock:
+        position = _positions.get((name, kind, key), 0)
+    return entries[min(position, len(entries) - 1)]
+
+
+def recorded_pages(name):
+    """
+    (url, body, content type) of every page in `name`'s cassette: HTTP bodies as
+    bytes, browser page sources as text (with no content type).
+    """
+    tape = _load(name)
+    for responses in tape["http"].values():
+        for entry in responses:
+            yield entry["url"], base64.b64decode(entry["body"]), entry["headers"].get("Content-Type")
+    for url, sources in tape["page"].items():
+        for html in sources:
+            yield url, html, None
+
+
+# --- HTTP responses ---
+
+def record_response(url, params, response):
+    _append("http", request_key(url, params), {
+        "status": response.status_code,
+        "url": response.url,
+        "encoding": response.encoding,
+        "headers": {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+        "body": base64.b64encode(response.content).decode("ascii"),
+    })
+
+
+def replay_response(url, params=None):
+    """The recorded response for a GET of `url`, or CassetteMiss."""
+    entry = _next("http", request_key(url, params))
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response.url = entry["url"]
+    response._content = base64.b64decode(entry["body"])
+    response.encoding = entry["encoding"]
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response.not_modified = False
+    return response
+
+
+# --- Browser pages ---
+
+def chrome(options, manage_driver=False):
+    """
+    The Chrome driver of a Selenium source: a live webdriver.Chrome (installed
+    through webdriver_manager with `manage_driver`), wrapped to record its page
+    sources in record mode, or a ReplayDriver in replay mode.
+    """
+    if replaying():
+        return ReplayDriver()
+
+    from selenium import webdriver
+    if manage_driver:
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    else:
+        driver = webdriver.Chrome(options=options)
+    return RecordingDriver(driver) if recording() else driver
+
+
+class RecordingDriver:
+    """A live driver that records every page_source read under the URL last passed to get()."""
+
+    def __init__(self, driver):
+        self._driver = driver
+        self._url = None
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def get(self, url):
+        self._url = url
+        return self._driver.get(url)
+
+    @property
+    def page_source(self):
+        html = self._driver.page_source
+        _append("page", self._url, html)
+        return html
+
+
+class ReplayElement:
+    def __init__(self, tag):
+        self._tag = tag
+        self.text = tag.get_text(" ", strip=True)
+        self.tag_name = tag.name
+
+    def get_attribute(self, name):
+        value = self._tag.get(name)
+        return " ".join(value) if isinstance(value, list) else value
+
+    def is_displayed(self):
+        return True
+
+    def click(self):
+        pass
+
+
+# Selenium locator strategies ReplayDriver can answer, as CSS selectors.
+_CSS_FOR = {
+    "css selector": "{}",
+    "class name": ".{}",
+    "id": "#{}",
+    "tag name": "{}",
+    "name": '[name="{}"]',
+}
+
+
+class ReplayDriver:
+    """Stands in for webdriver.Chrome in replay mode."""
+
+    def __init__(self):
+        self.current_url = None
+
+    def get(self, url):
+        self.current_url = url
+
+    @property
+    def page_source(self):
+        return _next("page", self.current_url)
+
+    def find_elements(self, by="id", value=None):
+        from bs4 import BeautifulSoup
+        html = _peek("page", self.current_url)
+        if html is None or by not in _CSS_FOR:
+            return []
+        soup = BeautifulSoup(html, "html.parser")
+        return [ReplayElement(tag) for tag in soup.select(_CSS_FOR[by].format(value))]
+
+    def find_element(self, by="id", value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            from selenium.common.exceptions import NoSuchElementException
+            raise NoSuchElementException(f"{by}={value} not in the replayed page")
+        return elements[0]
+
+    def execute_script(self, script, *args):
+        return None
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def set_page_load_timeout(self, seconds):
+        pass
+
+    def quit(self):
+        pass
+
+    close = quit
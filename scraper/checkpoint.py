@@ -0,0 +1,141 @@
+import logging
+import os
+import re
+import threading
+import uuid
+from datetime import datetime
+
+from scraper.config import CHECKPOINTS, STATE_DIR
+from scraper.utils import load_json_state, save_json_state
+
+logger = logging.getLogger("event_scraper_log")
+
+# --- Run checkpoints ---
+# A run manifest (STATE_DIR/run_manifest.json) lists the sources of the current
+# run and which of them finished. Paginated sources also keep a page checkpoint
+# (STATE_DIR/checkpoints/<source>.json) with the pages already saved. If the
+# process dies mid-run, the next run picks up the unfinished sources and skips
+# their finished pages instead of starting over.
+#
+# Page checkpoints are per source so a source running in a child process
+# (scraper/isolation.py) can write its own without touching the manifest.
+
+MANIFEST_PATH = os.path.join(STATE_DIR, "run_manifest.json")
+PAGES_DIR = os.path.join(STATE_DIR, "checkpoints")
+
+_lock = threading.Lock()
+
+
+def _pages_path(name):
+    return os.path.join(PAGES_DIR, re.sub(r"[^\w.-]", "_", name) + ".json")
+
+
+def _load_manifest():
+    return load_json_state(MANIFEST_PATH)
+
+
+def unfinished_sources():
+    """Sources of an interrupted run that still have to run (empty if none)."""
+    if not CHECKPOINTS:
+        return []
+    manifest = _load_manifest()
+    if not manifest or manifest.get("finished"):
+        return []
+    return [name for name in manifest["sources"] if name not in manifest["done"]]
+
+
+def start_run(names):
+    """
+    Start a run of `names`. If the previous run was interrupted, its unfinished
+    sources are added in front and their page checkpoints are kept.
+
+    Returns:
+        list[str]: The sources this run has to go through.
+    """
+    if not CHECKPOINTS:
+        return list(names)
+
+    with _lock:
+        manifest = _load_manifest()
+        if manifest and not manifest.get("finished"):
+            leftover = [name for name in manifest["sources"] if name not in manifest["done"]]
+            sources = leftover + [name for name in names if name not in leftover]
+            logger.info(f"Resuming run {manifest['run_id']}: {', '.join(leftover) or 'nothing left'} unfinished.")
+            manifest.update({"sources": sources, "done": []})
+        else:
+            sources = list(names)
+            manifest = {
+                "run_id": uuid.uuid4().hex,
+                "started_at": datetime.now().isoformat(),
+                "sources": sources,
+                "done": [],
+                "finished": False,
+            }
+            _clear_pages()
+        save_json_state(MANIFEST_PATH, manifest)
+    return sources
+
+
+def mark_source_done(name):
+    if not CHECKPOINTS:
+        return
+    with _lock:
+        manifest = _load_manifest()
+        if not manifest or name in manifest["done"]:
+            return
+        manifest["done"].append(name)
+        save_json_state(MANIFEST_PATH, manifest)
+    clear_pages(name)
+
+
+def finish_run():
+    if not CHECKPOINTS:
+        return
+    with _lock:
+        manifest = _load_manifest()
+        if not manifest:
+            return
+        manifest["finished"] = True
+        manifest["finished_at"] = datetime.now().isoformat()
+        save_json_state(MANIFEST_PATH, manifest)
+        _clear_pages()
+
+
+def done_pages(name):
+    """Pages (numbers or URLs) of `name` already saved in the current run."""
+    if not CHECKPOINTS:
+        return set()
+    manifest = _load_manifest()
+    state = load_json_state(_pages_path(name), {})
+    if not manifest or state.get("run_id") != manifest["run_id"]:
+        return set()
+    return set(state.get("pages", []))
+
+
+def mark_page_done(name, page):
+    """Record that everything from `page` of source `name` has been saved."""
+    if not CHECKPOINTS:
+        return
+    with _lock:
+        # Read under the lock, so finish_run can't clear the pages in between.
+        manifest = _load_manifest()
+        if not manifest:
+            return
+        pages = done_pages(name)
+        pages.add(page)
+        save_json_state(_pages_path(name), {"run_id": manifest["run_id"], "pages": sorted(pages, key=str)})
+
+
+def clear_pages(name):
+    try:
+        os.remove(_pages_path(name))
+    except FileNotFoundError:
+        pass
+
+
+def _clear_pages():
+    if not os.path.isdir(PAGES_DIR):
+        return
+    for file_name in os.listdir(PAGES_DIR):
+        if file_name.endswith(".json"):
+            os.remove(os.path.join(PAGES_DIR, file_name))
@@ -0,0 +1,120 @@
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+from scraper.config import CIRCUIT_FAILURES, CIRCUIT_MAX_OPEN_SECONDS, CIRCUIT_OPEN_SECONDS
+
+logger = logging.getLogger("event_scraper_log")
+
+# --- Per-host circuit breaker ---
+# A host that keeps failing is most likely down; waiting on its timeouts only
+# stretches the run. After CIRCUIT_FAILURES failed requests in a row (already
+# retried by scraper/http_client.py) the host's circuit opens:
+#
+#   closed:    requests go through, failures are counted
+#   open:      requests fail at once with CircuitOpenError; the sources listing
+#              the host in their "hosts" (scraper/sources.py) are skipped
+#   half-open: once the cooldown is over one request is let through as a probe;
+#              success closes the circuit, failure opens it again for twice as long
+#
+# check() is called once per request, before its first attempt (its retries
+# belong to the same probe), and release() once the request is over, whatever
+# happened: a probe that ended without a verdict (e.g. on a 429) lets the next
+# request probe instead of keeping the host blocked.
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+class HostCircuit:
+    def __init__(self, host):
+        self.host = host
+        self.failures = 0
+        self.open_until = 0.0
+        self.open_seconds = CIRCUIT_OPEN_SECONDS
+        self.probing = False
+        self._lock = threading.Lock()
+
+    def is_open(self):
+        return time.monotonic() < self.open_until
+
+    def allow(self):
+        """True if a request may be sent now (in half-open state only one at a time)."""
+        with self._lock:
+            if self.failures < CIRCUIT_FAILURES:
+                return True
+            if self.is_open() or self.probing:
+                return False
+            self.probing = True
+            return True
+
+    def end_probe(self):
+        with self._lock:
+            self.probing = False
+
+    def record_success(self):
+        with self._lock:
+            was_tripped = self.failures >= CIRCUIT_FAILURES
+            self.failures = 0
+            self.probing = False
+            self.open_seconds = CIRCUIT_OPEN_SECONDS
+        if was_tripped:
+            logger.info(f"Circuit for {self.host} closed again.")
+
+    def record_failure(self):
+        with self._lock:
+            if self.probing:
+                # The probe failed: back off for longer this time.
+                self.open_seconds = min(self.open_seconds * 2, CIRCUIT_MAX_OPEN_SECONDS)
+            self.failures += 1
+            self.probing = False
+            if self.failures < CIRCUIT_FAILURES:
+                return
+            self.open_until = time.monotonic() + self.open_seconds
+            open_seconds = self.open_seconds
+        logger.warning(f"Circuit for {self.host} open for {open_seconds:.0f}s after {self.failures} failures.")
+
+
+_circuits = {}
+_circuits_lock = threading.Lock()
+
+
+def _host(url_or_host):
+    return urlsplit(url_or_host).netloc if "//" in url_or_host else url_or_host
+
+
+def circuit_for(url_or_host):
+    host = _host(url_or_host)
+    with _circuits_lock:
+        if host not in _circuits:
+            _circuits[host] = HostCircuit(host)
+        return _circuits[host]
+
+
+def check(url):
+    """Raise CircuitOpenError if `url`'s host may not be requested right now."""
+    circuit = circuit_for(url)
+    if not circuit.allow():
+        raise CircuitOpenError(f"Circuit open for {circuit.host}, not requesting {url}")
+
+
+def release(url):
+    """The request to `url` is over: let another one probe if it was the probe and recorded nothing."""
+    circuit_for(url).end_probe()
+
+
+def record(url, ok):
+    circuit = circuit_for(url)
+    if ok:
+        circuit.record_success()
+    else:
+        circuit.record_failure()
+
+
+def open_hosts(hosts):
+    """The hosts among `hosts` whose circuit is currently open."""
+    return [host for host in hosts if circuit_for(host).is_open()]
@@ -0,0 +1,122 @@
+import argparse
+import os
+import sys
+import time
+
+# --- Command line ---
+# Run scraping sources once from the command line and report where the time went.
+#
+#     python -m scraper.cli                     # one pass over every enabled source
+#     python -m scraper.cli sympla "lebillet:*" # only these sources
+#     python -m scraper.cli mapa --dry-run      # scrape, but don't write to Mongo (nor the HTTP cache)
+#     python -m scraper.cli --workers 8 --no-pipeline
+#     python -m scraper.cli sympla --record     # keep every page fetched (scraper/cassette.py)
+#     python -m scraper.cli sympla --replay -n  # run again offline from those pages
+#     python -m scraper.cli --list
+#
+# main.py stays the long-running scheduler. Runs started here are one-offs: they
+# don't read or write the run manifest and page checkpoints (scraper/checkpoint.py).
+# A dry run also leaves the HTTP cache (scraper/http_cache.py) alone, so the next
+# real run doesn't take the pages it looked at for unchanged and skip them.
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m scraper.cli", description="Run scraping sources once.")
+    parser.add_argument("sources", nargs="*",
+                        help="source names or patterns such as 'lebillet:*' (default: every enabled source)")
+    parser.add_argument("-w", "--workers", type=int, help="sources run at the same time (SCRAPER_MAX_WORKERS)")
+    parser.add_argument("-t", "--timeout", type=int, help="seconds before a source is given up on (SCRAPER_SOURCE_TIMEOUT)")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="scrape and count events without writing to Mongo or the HTTP cache")
+    parser.add_argument("--no-pipeline", action="store_true", help="run pipeline sources with their sequential scraper")
+    parser.add_argument("--no-isolation", action="store_true", help="run Selenium sources in this process")
+    parser.add_argument("--list", action="store_true", help="list the selected sources and exit")
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument("--record", action="store_true", help="record every fetched page to the sources' cassettes")
+    cassette.add_argument("--replay", action="store_true", help="serve every page from the sources' cassettes, offline")
+    return parser.parse_args(argv)
+
+
+def _seconds(value):
+    return f"{value:.2f}" if value else "-"
+
+
+def print_report(results):
+    """Per-source table: wall time, fetch/parse/write time and event counts."""
+    header = f"{'source':<28} {'status':<8} {'total':>8} {'fetch':>8} {'parse':>8} {'write':>8} {'events':>7} {'new':>5} {'changed':>7}"
+    print("\n" + header)
+    print("-" * len(header))
+
+    totals = {"seconds": 0.0, "fetch": 0.0, "parse": 0.0, "write": 0.0, "events": 0, "upserted": 0, "modified": 0}
+    for result in results:
+        timings = result.get("timings") or {}
+        writes = result.get("writes") or {}
+        row = {
+            "seconds": result["seconds"],
+            "fetch": timings.get("fetch", 0.0),
+            "parse": timings.get("parse", 0.0),
+            "write": writes.get("seconds", 0.0),
+            "events": writes.get("events", 0),
+            "upserted": writes.get("upserted", 0),
+            "modified": writes.get("modified", 0),
+        }
+        for key, value in row.items():
+            totals[key] += value
+        print(f"{result['name']:<28} {result['status']:<8} {_seconds(row['seconds']):>8} {_seconds(row['fetch']):>8} "
+              f"{_seconds(row['parse']):>8} {_seconds(row['write']):>8} {row['events']:>7} {row['upserted']:>5} {row['modified']:>7}")
+
+    print("-" * len(header))
+    print(f"{'total':<28} {'':<8} {_seconds(totals['seconds']):>8} {_seconds(totals['fetch']):>8} "
+          f"{_seconds(totals['parse']):>8} {_seconds(totals['write']):>8} {totals['events']:>7} {totals['upserted']:>5} {totals['modified']:>7}")
+    print("fetch/parse are summed over threads and only measured for sources that report them; '-' means not measured.")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Settings are read from the environment when scraper.config is imported
+    # (also by the spawned Selenium children), so set them before that happens.
+    os.environ["SCRAPER_CHECKPOINTS"] = "0"
+    if args.no_pipeline:
+        os.environ["SCRAPER_USE_PIPELINE"] = "0"
+    if args.no_isolation:
+        os.environ["SCRAPER_ISOLATE_SELENIUM"] = "0"
+    if args.dry_run:
+        os.environ["SCRAPER_HTTP_CACHE"] = "0"
+    if args.timeout:
+        os.environ["SCRAPER_SOURCE_TIMEOUT"] = str(args.timeout)
+    if args.record or args.replay:
+        os.environ["SCRAPER_CASSETTE"] = "record" if args.record else "replay"
+
+    from database.db_operations import set_event_sink
+    from scraper.runner import run_sources
+    from scraper.sources import enabled_sources, lazy_source, report_import_times, select_sources
+    from scraper.utils import setup_logger
+
+    try:
+        names = select_sources(args.sources) if args.sources else enabled_sources()
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        return 2
+
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    logger = setup_logger("event_scraper_log", "logs/app.log")
+    if args.dry_run:
+        # save_events_bulk still counts the events, it just doesn't write them.
+        set_event_sink(lambda events: None)
+        logger.info("Dry run: events will not be written to the database.")
+
+    logger.info(f"Running {len(names)} sources once: {', '.join(names)}")
+    start = time.monotonic()
+    results = run_sources([lazy_source(name) for name in names], max_workers=args.workers)
+    wall_seconds = time.monotonic() - start
+    report_import_times()
+    print_report(results)
+    print(f"⏱️ {len(names)} sources in {wall_seconds:.2f}s wall time.")
+    return 0 if all(result["status"] == "ok" for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
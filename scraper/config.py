@@ -0,0 +1,179 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Runner settings ---
+# How many sources run at the same time, and how long (in seconds) a single
+# source may run before the runner stops waiting for it. A whole pass, queued
+# time included, ends after PASS_TIMEOUT seconds (0: SOURCE_TIMEOUT for every
+# round of MAX_WORKERS sources).
+MAX_WORKERS = int(os.getenv("SCRAPER_MAX_WORKERS", "4"))
+SOURCE_TIMEOUT = int(os.getenv("SCRAPER_SOURCE_TIMEOUT", "600"))
+PASS_TIMEOUT = int(os.getenv("SCRAPER_PASS_TIMEOUT", "0"))
+
+# --- Run planning ---
+# Start the sources of a pass longest-first, using how long each one took in its
+# last PLAN_HISTORY runs, so a slow source doesn't start last and stretch the pass.
+PLAN_ORDER = os.getenv("SCRAPER_PLAN_ORDER", "1") == "1"
+PLAN_HISTORY = int(os.getenv("SCRAPER_PLAN_HISTORY", "10"))
+
+# --- Source selection ---
+# Comma separated source names from scraper/sources.py (e.g. "sympla,mapa").
+# Empty means every source that is enabled in the registry.
+ENABLED_SOURCES = [name.strip() for name in os.getenv("SCRAPER_SOURCES", "").split(",") if name.strip()]
+
+# --- HTTP client ---
+# Shared connection pool of scraper/http_client.py: default timeouts (seconds),
+# how many hosts keep pooled connections and how many connections per host.
+HTTP_CONNECT_TIMEOUT = float(os.getenv("SCRAPER_HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_READ_TIMEOUT = float(os.getenv("SCRAPER_HTTP_READ_TIMEOUT", "30"))
+HTTP_POOL_HOSTS = int(os.getenv("SCRAPER_HTTP_POOL_HOSTS", "20"))
+HTTP_POOL_PER_HOST = int(os.getenv("SCRAPER_HTTP_POOL_PER_HOST", "4"))
+HTTP_USER_AGENT = os.getenv(
+    "SCRAPER_HTTP_USER_AGENT",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36",
+)
+
+# Stop downloading a page once the container a scraper asked for with
+# until="..." has closed (see scraper/html_stream.py).
+HTTP_EARLY_CUTOFF = os.getenv("SCRAPER_HTTP_EARLY_CUTOFF", "1") == "1"
+
+# Requests in flight at once for scraper/async_fetch.py (per host it uses HTTP_POOL_PER_HOST).
+ASYNC_CONCURRENCY = int(os.getenv("SCRAPER_ASYNC_CONCURRENCY", "32"))
+
+# Fetch threads of a scraper/frontier.py crawl (per host it uses HTTP_POOL_PER_HOST).
+FRONTIER_WORKERS = int(os.getenv("SCRAPER_FRONTIER_WORKERS", "8"))
+
+# HTML parser of scraper/html_parser.py: "auto" (the fastest installed),
+# "selectolax", "lxml" or "bs4".
+HTML_PARSER = os.getenv("SCRAPER_HTML_PARSER", "auto").lower()
+
+# Parse only the container a scraper asked for with only="..." instead of the
+# whole page (see scraper/html_parser.py).
+HTML_PARTIAL_PARSE = os.getenv("SCRAPER_HTML_PARTIAL_PARSE", "1") == "1"
+
+# --- Rate limiting ---
+# Per-host request budget of scraper/rate_limit.py, in requests per second.
+# Each host starts at RATE_INITIAL; fast successful responses add RATE_INCREASE,
+# while 429/5xx answers, errors and slow responses (over RATE_SLOW_SECONDS)
+# multiply it by RATE_DECREASE, always staying between RATE_MIN and RATE_MAX.
+RATE_LIMIT = os.getenv("SCRAPER_RATE_LIMIT", "1") == "1"
+RATE_INITIAL = float(os.getenv("SCRAPER_RATE_INITIAL", "2"))
+RATE_MIN = float(os.getenv("SCRAPER_RATE_MIN", "0.2"))
+RATE_MAX = float(os.getenv("SCRAPER_RATE_MAX", "20"))
+RATE_BURST = float(os.getenv("SCRAPER_RATE_BURST", "2"))
+RATE_INCREASE = float(os.getenv("SCRAPER_RATE_INCREASE", "0.5"))
+RATE_DECREASE = float(os.getenv("SCRAPER_RATE_DECREASE", "0.5"))
+RATE_SLOW_SECONDS = float(os.getenv("SCRAPER_RATE_SLOW_SECONDS", "3"))
+
+# --- Egress proxies ---
+# Comma separated proxy URLs (e.g. "http://10.0.0.2:3128,http://10.0.0.3:3128";
+# "direct" stands for this machine's own address) that requests go out through
+# (see scraper/proxy_pool.py). Each host is spread over PROXIES_PER_HOST of
+# them, each with its own rate budget. A proxy whose error rate goes over
+# PROXY_MAX_ERROR_RATE (after PROXY_MIN_REQUESTS requests) cools down for
+# PROXY_COOLDOWN_SECONDS; after PROXY_MAX_COOLDOWNS cooldowns in a row it is
+# dropped for good. Empty means no proxies.
+HTTP_PROXIES = [proxy.strip() for proxy in os.getenv("SCRAPER_HTTP_PROXIES", "").split(",") if proxy.strip()]
+PROXIES_PER_HOST = int(os.getenv("SCRAPER_PROXIES_PER_HOST", "2"))
+PROXY_MAX_ERROR_RATE = float(os.getenv("SCRAPER_PROXY_MAX_ERROR_RATE", "0.5"))
+PROXY_MIN_REQUESTS = int(os.getenv("SCRAPER_PROXY_MIN_REQUESTS", "5"))
+PROXY_COOLDOWN_SECONDS = float(os.getenv("SCRAPER_PROXY_COOLDOWN_SECONDS", "300"))
+PROXY_MAX_COOLDOWNS = int(os.getenv("SCRAPER_PROXY_MAX_COOLDOWNS", "3"))
+
+# --- Retries and circuit breaker ---
+# A GET that fails with a network error, 429 or 5xx is retried up to HTTP_RETRIES
+# more times, waiting HTTP_BACKOFF * 2^attempt seconds (plus jitter, at most
+# HTTP_BACKOFF_MAX) in between. After CIRCUIT_FAILURES failed requests in a row
+# a host's circuit opens: requests to it fail at once and sources that use it
+# are skipped for CIRCUIT_OPEN_SECONDS, doubling each time it fails again up to
+# CIRCUIT_MAX_OPEN_SECONDS (see scraper/circuit_breaker.py).
+HTTP_RETRIES = int(os.getenv("SCRAPER_HTTP_RETRIES", "3"))
+HTTP_BACKOFF = float(os.getenv("SCRAPER_HTTP_BACKOFF", "1"))
+HTTP_BACKOFF_MAX = float(os.getenv("SCRAPER_HTTP_BACKOFF_MAX", "30"))
+CIRCUIT_FAILURES = int(os.getenv("SCRAPER_CIRCUIT_FAILURES", "5"))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("SCRAPER_CIRCUIT_OPEN_SECONDS", "300"))
+CIRCUIT_MAX_OPEN_SECONDS = float(os.getenv("SCRAPER_CIRCUIT_MAX_OPEN_SECONDS", "3600"))
+
+# --- Browser sources ---
+# Run the Selenium sources in short-lived child processes (1) or in the
+# scheduler process itself (0), and how many of those children may run at once.
+ISOLATE_SELENIUM = os.getenv("SCRAPER_ISOLATE_SELENIUM", "1") == "1"
+BROWSER_PROCESSES = int(os.getenv("SCRAPER_BROWSER_PROCESSES", "2"))
+
+# --- Scheduling ---
+# Interval (in seconds) for sources that don't set their own in scraper/sources.py,
+# and the jitter added to each run as a fraction of the interval.
+DEFAULT_INTERVAL = int(os.getenv("SCRAPER_DEFAULT_INTERVAL", "3600"))
+DEFAULT_JITTER = float(os.getenv("SCRAPER_DEFAULT_JITTER", "0.1"))
+
+# Adaptive intervals: a run that inserts or changes events shrinks the source's
+# interval by ADAPTIVE_SHRINK, a run that changes nothing grows it by ADAPTIVE_GROW.
+# The result stays between MIN_FACTOR and MAX_FACTOR times the registry interval
+# (or the source's own "min_interval"/"max_interval").
+ADAPTIVE_INTERVALS = os.getenv("SCRAPER_ADAPTIVE_INTERVALS", "1") == "1"
+ADAPTIVE_SHRINK = float(os.getenv("SCRAPER_ADAPTIVE_SHRINK", "0.5"))
+ADAPTIVE_GROW = float(os.getenv("SCRAPER_ADAPTIVE_GROW", "1.5"))
+ADAPTIVE_MIN_FACTOR = float(os.getenv("SCRAPER_ADAPTIVE_MIN_FACTOR", "0.25"))
+ADAPTIVE_MAX_FACTOR = float(os.getenv("SCRAPER_ADAPTIVE_MAX_FACTOR", "4"))
+
+# --- State files ---
+# Directory for the JSON files kept between restarts.
+STATE_DIR = os.getenv("SCRAPER_STATE_DIR", "state")
+
+# --- HTTP cache ---
+# Pages fetched with cache=True (see scraper/http_client.py) are kept on disk and
+# revalidated with If-None-Match / If-Modified-Since. Pages from servers that send
+# neither are reused for HTTP_CACHE_TTL seconds. The oldest entries are evicted
+# once the cache grows past HTTP_CACHE_MAX_MB.
+HTTP_CACHE = os.getenv("SCRAPER_HTTP_CACHE", "1") == "1"
+HTTP_CACHE_DIR = os.getenv("SCRAPER_HTTP_CACHE_DIR", os.path.join(STATE_DIR, "http_cache"))
+HTTP_CACHE_TTL = int(os.getenv("SCRAPER_HTTP_CACHE_TTL", "3600"))
+HTTP_CACHE_MAX_MB = int(os.getenv("SCRAPER_HTTP_CACHE_MAX_MB", "200"))
+
+# --- Cassettes ---
+# "record" stores every page a source fetches (HTTP responses and browser page
+# sources) in CASSETTE_DIR/<source>.json.gz; "replay" serves them back from there
+# without touching the network (see scraper/cassette.py). Empty runs live.
+CASSETTE_MODE = os.getenv("SCRAPER_CASSETTE", "").lower()
+CASSETTE_DIR = os.getenv("SCRAPER_CASSETTE_DIR", os.path.join(STATE_DIR, "cassettes"))
+
+# --- Pipeline ---
+# Worker threads per stage of scraper/pipeline.py, the size of the queues
+# between stages and how many events are written to Mongo at a time.
+USE_PIPELINE = os.getenv("SCRAPER_USE_PIPELINE", "1") == "1"
+PIPELINE_FETCH_WORKERS = int(os.getenv("SCRAPER_PIPELINE_FETCH_WORKERS", "8"))
+PIPELINE_PARSE_WORKERS = int(os.getenv("SCRAPER_PIPELINE_PARSE_WORKERS", "2"))
+PIPELINE_NORMALIZE_WORKERS = int(os.getenv("SCRAPER_PIPELINE_NORMALIZE_WORKERS", "1"))
+PIPELINE_PERSIST_WORKERS = int(os.getenv("SCRAPER_PIPELINE_PERSIST_WORKERS", "1"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("SCRAPER_PIPELINE_QUEUE_SIZE", "32"))
+PIPELINE_BATCH_SIZE = int(os.getenv("SCRAPER_PIPELINE_BATCH_SIZE", "100"))
+# Pages of a paginated (stop_on_empty) listing fetched ahead of the last one parsed.
+PIPELINE_PREFETCH = int(os.getenv("SCRAPER_PIPELINE_PREFETCH", "2"))
+
+# With PARSE_PROCESSES above 0, the pipeline parses and normalizes pages in
+# that many worker processes (scraper/parse_pool.py) instead of its parse
+# threads. Pages are sent in batches of about PARSE_BATCH_KB, and a batch that
+# isn't full goes out once no page has come in for PARSE_BATCH_WAIT seconds.
+PARSE_PROCESSES = int(os.getenv("SCRAPER_PARSE_PROCESSES", "0"))
+PARSE_BATCH_KB = int(os.getenv("SCRAPER_PARSE_BATCH_KB", "512"))
+PARSE_BATCH_WAIT = float(os.getenv("SCRAPER_PARSE_BATCH_WAIT", "0.05"))
+
+# --- Checkpoints ---
+# Keep a run manifest and page checkpoints so an interrupted run resumes
+# where it stopped (see scraper/checkpoint.py).
+CHECKPOINTS = os.getenv("SCRAPER_CHECKPOINTS", "1") == "1"
+
+# --- Work queue ---
+# With a backend set ("sqlite", "mongo" or "file"), main.py puts every due source
+# on a shared queue instead of running it, and worker processes started with
+# `python -m scraper.worker` (on this machine or others) claim and run them.
+# A claimed job holds a lease that its worker renews; when a worker dies the
+# lease runs out and the job goes back on the queue (up to QUEUE_MAX_ATTEMPTS runs).
+QUEUE_BACKEND = os.getenv("SCRAPER_QUEUE_BACKEND", "")
+QUEUE_PATH = os.getenv("SCRAPER_QUEUE_PATH", "")  # sqlite/file backends, default under STATE_DIR
+QUEUE_LEASE_SECONDS = int(os.getenv("SCRAPER_QUEUE_LEASE_SECONDS", "120"))
+QUEUE_MAX_ATTEMPTS = int(os.getenv("SCRAPER_QUEUE_MAX_ATTEMPTS", "3"))
+QUEUE_POLL_SECONDS = float(os.getenv("SCRAPER_QUEUE_POLL_SECONDS", "2"))
@@ -1,9 +1,9 @@
 # scraper/event_scraper.py
-import requests
 import urllib3
-from bs4 import BeautifulSoup
 import os
 from database.db_operations import save_events_bulk, event_exists, deduplicate_events
+from scraper import html_parser, http_client
+from scraper.utils import make_soup
 from utils.categorize import categorize_event
 import time # Good for adding pauses if needed
 
@@ -236,15 +236,15 @@ def scrape_craes_events():
     print(f"🔍 Fetching CRAES events from {url}")
     
     try:
-        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, verify=False)
+        response = http_client.get(url, headers={"User-Agent": "Mozilla/5.0"}, verify=False)
         #response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
         response.raise_for_status()
     except Exception as e:
         print(f"❌ Failed to fetch CRAES events: {e}")
         return []
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    event_blocks = soup.select("div.tribe-events-calendar-list__event-row")
+    doc = html_parser.parse(response.content, http_client.page_encoding(response), only="div.tribe-events-calendar-list")
+    event_blocks = doc.select("div.tribe-events-calendar-list__event-row")
 
     if not event_blocks:
         print("⚠️ No events found on CRAES.")
@@ -411,15 +411,14 @@ URL = "https://www.festivaldeinvernodm.com.br/pagina/32/programacao-artistica-co
 def scrape_festival_de_inverno():
     print("⏳ Fetching Festival de Inverno page...")
     try:
-        response = requests.get(URL, timeout=10, verify=False)  # SSL bypass
+        response = http_client.get(URL, timeout=10, verify=False)  # SSL bypass
         response.raise_for_status()
-        html_content = response.text
     except Exception as e:
         print(f"❌ Failed to fetch page: {e}")
         return []
 
     print("🔍 Scraping Festival de Inverno content...")
-    soup = BeautifulSoup(html_content, "html.parser")
+    soup = make_soup(response.content, http_client.page_encoding(response))
     container = soup.select_one("div.container.py-5")
 
     if not container:
@@ -3,20 +3,17 @@ from datetime import datetime
 from bs4 import BeautifulSoup
 import re
 
-from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By # To specify element selection method
 from selenium.webdriver.support.ui import WebDriverWait # To wait for elements to appear
 from selenium.webdriver.support import expected_conditions as EC # Conditions for waiting
 
-from selenium.webdriver.chrome.service import Service
-
 from database.db_operations import save_events_bulk
+from scraper import cassette
 from utils.categorize import categorize_event
 
 
 
-from webdriver_manager.chrome import ChromeDriverManager
 
 import re
 
@@ -78,8 +75,7 @@ def scrape_beacons_with_selenium():
     chrome_options.add_argument("--disable-dev-shm-usage")
 
     # ✅ Sem precisar baixar ou indicar caminho manualmente
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver = cassette.chrome(chrome_options, manage_driver=True)
 
     url = "https://beacons.ai/melhoreseventosdoes?fbclid=PAZXh0bgNhZW0CMTEAAae9mErKM_MpJc1iQscQWA9Dc1Hn7HQ9xAJMNI2PECVPt0aM4qB7DzyCBKOAQQ_aem_ksFKDl5k3XV4l5T4qfSoWQ"
 
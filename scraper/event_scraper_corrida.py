@@ -1,10 +1,11 @@
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
 import re
 import time
 
 from database.db_operations import save_events_bulk
+from scraper import http_client
+from scraper.timing import timed
+from scraper import card_specs
 from utils.categorize import categorize_event
 
 PT_MONTHS = {
@@ -50,91 +51,97 @@ def parse_portuguese_date_range(date_str: str):
         return None, None
 
 
+CORRIDA_URL = "https://brasilquecorre.com/espiritosanto"
+CORRIDA_FETCH_KWARGS = {"headers": {"User-Agent": "Mozilla/5.0"}, "cache": True}
+
+
+def extract_corrida_cards(html, url=None, encoding=None):
+    """Pulls the raw fields of every race box on the BrasilQueCorre ES page (card spec "corrida")."""
+    return card_specs.extract("corrida", html, url, encoding)
+
+
+def normalize_corrida_card(card):
+    """Turns a raw race box into an event, or None for past races."""
+    text_lines = card["text_lines"]
+    date_line = text_lines[0] if text_lines else None
+    location = text_lines[1] if len(text_lines) > 1 else None
+    distances = text_lines[2] if len(text_lines) > 2 else None
+    extra = text_lines[3:] if len(text_lines) > 3 else []
+
+    start_date, end_date = parse_portuguese_date_range(date_line) if date_line else (None, None)
+
+    # Skip past events
+    if end_date and end_date < datetime.now():
+        return None
+
+    event_data = {
+        "title": card["title"],
+        "location": location,
+        "date": start_date.isoformat() if start_date else None,  # usado no banco
+        "end_date": end_date.isoformat() if end_date else None,  # extra opcional
+        "link": card["link"],
+        "image": card["image"],
+        "font": "Brasil Que Corre",
+        "category": "Esporte",
+        "highlighted": False,
+        "UF": "ES",
+        "distances": distances,
+        "extra": extra,
+    }
+
+    print(f"📌 {event_data}")
+    # print(f"📌 {title}")
+    # print(f"🗓️ {date_line}")
+    # print(f"📍 {location}")
+    # print(f"🔗 {link}")
+    # print(f"🖼️ {img_src}")
+    print("-" * 50)
+    return event_data
+
+
+def corrida_pipeline():
+    """Pipeline spec (see scraper/pipeline.py)."""
+    return {
+        "name": "corrida",
+        "urls": [CORRIDA_URL],
+        "fetch_kwargs": CORRIDA_FETCH_KWARGS,
+        "parse": extract_corrida_cards,
+        "normalize": normalize_corrida_card,
+    }
+
+
 def scrape_brasilquecorre_es():
-    url = "https://brasilquecorre.com/espiritosanto"
+    url = CORRIDA_URL
     print(f"🔍 Fetching BrasilQueCorre events from {url}")
 
     try:
-        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
+        response = http_client.get(url, **CORRIDA_FETCH_KWARGS)
         response.raise_for_status()
     except Exception as e:
         print(f"❌ Failed to fetch BrasilQueCorre events: {e}")
         return []
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    event_blocks = soup.select("section.cs-section div.cs-line div.cs-box")
-
-    if not event_blocks:
-        print("⚠️ No events found.")
+    if response.not_modified:
+        print("✅ BrasilQueCorre page unchanged since the last run, nothing to do.")
         return []
 
     events_to_save = []
 
-    for block in event_blocks:
+    with timed("parse"):
+        cards = extract_corrida_cards(response.content, url, http_client.page_encoding(response))
+    for card in cards:
         try:
-            # Title + link
-            title_tag = block.select_one(".cs-text-widget h5 a")
-            title = title_tag.text.strip() if title_tag else None
-            link = title_tag["href"].strip() if title_tag else None
-
-            # Se não tiver título OU link, ignora o bloco
-            if not title or not link:
-                continue
-
-            # Image
-            img_tag = block.select_one(".cs-image-widget img")
-            img_src = img_tag["src"].strip() if img_tag else None
-
-            # Info block (date, location, distances, organizer)
-            text_lines = [p.get_text(strip=True) for p in block.select(".cs-text-widget .text-editor p") if p.get_text(strip=True)]
-
-            date_line = text_lines[0] if text_lines else None
-            location = text_lines[1] if len(text_lines) > 1 else None
-            distances = text_lines[2] if len(text_lines) > 2 else None
-            extra = text_lines[3:] if len(text_lines) > 3 else []
-
-            start_date, end_date = parse_portuguese_date_range(date_line) if date_line else (None, None)
-
-            # Skip past events
-            if end_date and end_date < datetime.now():
-                continue
-
-
-            event_data = {
-                "title": title,
-                "location": location,
-                "date": start_date.isoformat() if start_date else None,  # usado no banco
-                "end_date": end_date.isoformat() if end_date else None,  # extra opcional
-                "link": link,
-                "image": img_src,
-                "font": "Brasil Que Corre",
-                "category": "Esporte",
-                "highlighted": False,
-                "UF": "ES",
-                "distances": distances,
-                "extra": extra,
-            }
-
-      
-
-            events_to_save.append(event_data)
-
-            print(f"📌 {event_data}")
-            # print(f"📌 {title}")
-            # print(f"🗓️ {date_line}")
-            # print(f"📍 {location}")
-            # print(f"🔗 {link}")
-            # print(f"🖼️ {img_src}")
-            print("-" * 50)
-
+            event_data = normalize_corrida_card(card)
         except Exception as e:
             print(f"⚠️ Error parsing event: {e}")
             continue
+        if event_data:
+            events_to_save.append(event_data)
 
     if events_to_save:
         save_events_bulk(events_to_save)
         print(f"✅ Saved {len(events_to_save)} BrasilQueCorre events.")
     else:
         print("⚠️ No future events to save.")
+    http_client.page_saved(url)
 
     return events_to_save
@@ -1,10 +1,11 @@
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
 import time
 import re
 
 from database.db_operations import save_events_bulk
+from scraper import http_client
+from scraper.timing import timed
+from scraper import card_specs
 from utils.categorize import categorize_event
 
 PT_MONTHS = {
@@ -47,72 +48,90 @@ def parse_portuguese_date(date_str):
         print(f"❌ Failed to parse date: '{date_str}' | {e}")
         return None
        
+CRAES_URL = "https://www.craes.org.br/evento/lista/"
+CRAES_FETCH_KWARGS = {"headers": {"User-Agent": "Mozilla/5.0"}, "verify": False, "cache": True}
+
+
+def craes_fetch_kwargs():
+    """CRAES_FETCH_KWARGS, stopping the download once the card spec's container has closed."""
+    return dict(CRAES_FETCH_KWARGS, until=card_specs.spec("craes").only)
+
+
+def extract_craes_cards(html, url=None, encoding=None):
+    """Pulls title, link, image and raw date out of every event row of the CRA-ES list (card spec "craes")."""
+    return card_specs.extract("craes", html, url, encoding)
+
+
+def normalize_craes_card(card):
+    """Turns a raw CRA-ES row into an event, or None for past events."""
+    date_str = card["date_str"]
+    parsed_date = parse_portuguese_date(date_str) if date_str else None
+
+    # Skip past events
+    if parsed_date and parsed_date < datetime.now():
+        return None
+
+    event_data = {
+        "title": card["title"],
+        "location": "CRAES",
+        "date": parsed_date.isoformat() if parsed_date else None,
+        "link": card["link"],
+        "image": card["image"],
+        "font": "CRA-ES",
+        "category": categorize_event(card["title"]),
+        "UF": "ES"
+    }
+
+    print(f"📌 {card['title']} | 🕒 {event_data['date']}")
+    print(f"🔗 {card['link']}")
+    print(f"🖼️ {card['image']}")
+    print("-" * 60)
+    return event_data
+
+
+def craes_pipeline():
+    """Pipeline spec (see scraper/pipeline.py)."""
+    return {
+        "name": "craes",
+        "urls": [CRAES_URL],
+        "fetch_kwargs": craes_fetch_kwargs(),
+        "parse": extract_craes_cards,
+        "normalize": normalize_craes_card,
+    }
+
+
 def scrape_craes_events():
-    url = "https://www.craes.org.br/evento/lista/"
+    url = CRAES_URL
     print(f"🔍 Fetching CRAES events from {url}")
     
     try:
-        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, verify=False)
+        response = http_client.get(url, **craes_fetch_kwargs())
         #response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
         response.raise_for_status()
     except Exception as e:
         print(f"❌ Failed to fetch CRAES events: {e}")
         return []
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    event_blocks = soup.select("div.tribe-events-calendar-list__event-row")
-
-    if not event_blocks:
-        print("⚠️ No events found on CRAES.")
+    if response.not_modified:
+        print("✅ CRAES page unchanged since the last run, nothing to do.")
         return []
 
     events_to_save = []
-    for block in event_blocks:
+    with timed("parse"):
+        cards = extract_craes_cards(response.content, url, http_client.page_encoding(response))
+    for card in cards:
         try:
-            # Title & Link
-            title_tag = block.select_one("h3 a")
-            title = title_tag.text.strip()
-            link = title_tag["href"].strip()
-
-            # Image
-            img_tag = block.select_one("img.tribe-events-calendar-list__event-featured-image")
-            img_src = img_tag["src"].strip() if img_tag else None
-
-            # Raw date
-            date_text_tag = block.select_one("span.tribe-event-date-start")
-            date_str = date_text_tag.text.strip() if date_text_tag else None
-            parsed_date = parse_portuguese_date(date_str) if date_str else None
-
-            # Skip past events
-            if parsed_date and parsed_date < datetime.now():
-                continue
-
-            event_data = {
-                "title": title,
-                "location": "CRAES",
-                "date": parsed_date.isoformat() if parsed_date else None,
-                "link": link,
-                "image": img_src,
-                "font": "CRA-ES",
-                "category": categorize_event(title),
-                "UF": "ES"
-            }
-
-            events_to_save.append(event_data)
-
-            print(f"📌 {title} | 🕒 {event_data['date']}")
-            print(f"🔗 {link}")
-            print(f"🖼️ {img_src}")
-            print("-" * 60)
-
+            event_data = normalize_craes_card(card)
         except Exception as e:
             print(f"⚠️ Error parsing CRAES event: {e}")
             continue
+        if event_data:
+            events_to_save.append(event_data)
 
     if events_to_save:
         save_events_bulk(events_to_save)
         print(f"✅ Saved {len(events_to_save)} CRAES events.")
     else:
         print("⚠️ No future events to save.")
+    http_client.page_saved(url)
 
     return events_to_save
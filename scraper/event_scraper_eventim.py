@@ -3,13 +3,13 @@ from datetime import datetime
 import requests
 
 from database.db_operations import save_events_bulk
+from scraper import cassette
 
 import urllib3
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 import time
@@ -112,7 +112,7 @@ def scrape_eventim_vitoria_selenium():
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("user-agent=Mozilla/5.0 ... Chrome/125")
 
-    driver = webdriver.Chrome(options=options)
+    driver = cassette.chrome(options)
     driver.get("https://www.eventim.com.br/city/vitoria-1747/")
 
     time.sleep(10)  # let content load
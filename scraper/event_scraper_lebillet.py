@@ -1,8 +1,9 @@
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
 from utils.categorize import categorize_event
 from database.db_operations import save_events_bulk
+from scraper import http_client
+from scraper.timing import timed
+from scraper import card_specs
 
 def parse_brazilian_date(date_str: str) -> datetime | None:
     months = {
@@ -59,525 +60,126 @@ def parse_brazilian_date(date_str: str) -> datetime | None:
         return None
 
 
-def scrape_lebillet_events_domingos_martins():
-    print("⏳ Scraping LeBillet for ES events...")
-    try:
-        response = requests.get("https://lebillet.com.br/search?city=45", timeout=10, verify=False)
-        response.raise_for_status()
-    except Exception as e:
-        print(f"❌ Failed to fetch LeBillet page: {e}")
-        return []
-
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    # Restrict to only ES-related section
-    next_shows_section = soup.find("div", class_="next-shows-inner")
-    if not next_shows_section:
-        print("❌ Could not find the 'next-shows-inner' container.")
-        return []
-
-    event_cards = next_shows_section.find_all("div", class_="show-card")
-    future_events = []
-
-    for card in event_cards:
-        try:
-            title = card.select_one("h3.title").text.strip()
-            link = card.select_one("a.card-link")["href"]
-            image = card.select_one("img.image")["src"]
-            location = card.select_one("p.data-text.location").text.strip()
-            date_str = card.select_one("p.data-text.datetime").text.strip()
-
-            parsed_date = parse_brazilian_date(date_str)
-            if not parsed_date or parsed_date < datetime.now():
-                continue  # Skip past or unparseable events
-
-            event_data = {
-                "title": title,
-                "link": link,
-                "image": image,
-                "location": location.replace(", ES", "").strip(),
-                "date": parsed_date.isoformat(),
-                "end_date": parsed_date.isoformat(),
-                "font": "LeBillet",
-                #"category": "Shows e Festas",
-                "category": categorize_event(title + " " + location),
-                "highlighted": False,
-                "UF": "ES"
-            }
-
-            future_events.append(event_data)
-            print(f"✅ Parsed: {title}")
-            print(event_data)
-        except Exception as e:
-            print(f"⚠️ Skipped card due to error: {e}")
-            continue
+# LeBillet search page id of each ES city we follow.
+LEBILLET_CITIES = {
+    "domingos_martins": 45,
+    "cariacica": 29,
+    "guacui": 42,
+    "guarapari": 30,
+    "linhares": 25,
+    "serra": 32,
+    "viana": 114,
+    "vila_velha": 24,
+    "vitoria": 20,
+}
+
+LEBILLET_SEARCH_URL = "https://lebillet.com.br/search?city={city_id}"
+LEBILLET_FETCH_KWARGS = {"timeout": 10, "verify": False, "cache": True}
+
+
+def lebillet_fetch_kwargs():
+    """
+    LEBILLET_FETCH_KWARGS plus "until": only the container of the card spec is
+    read, the download stops once it has closed and only it is parsed. Looked
+    up here rather than on import, so importing the scraper doesn't load the
+    card specs.
+    """
+    return dict(LEBILLET_FETCH_KWARGS, until=card_specs.spec("lebillet").only)
+
+
+def extract_lebillet_cards(html, url=None, encoding=None):
+    """Pulls the raw fields of every show card out of a LeBillet search page (card spec "lebillet")."""
+    return card_specs.extract("lebillet", html, url, encoding)
+
+
+def normalize_lebillet_card(card):
+    """Turns a raw LeBillet card into an event, or None for past/unparseable dates."""
+    parsed_date = parse_brazilian_date(card["date_str"])
+    if not parsed_date or parsed_date < datetime.now():
+        return None  # Skip past or unparseable events
+
+    title = card["title"]
+    location = card["location"]
+    event_data = {
+        "title": title,
+        "link": card["link"],
+        "image": card["image"],
+        "location": location.replace(", ES", "").strip(),
+        "date": parsed_date.isoformat(),
+        "end_date": parsed_date.isoformat(),
+        "font": "LeBillet",
+        #"category": "Shows e Festas",
+        "category": categorize_event(title + " " + location),
+        "highlighted": False,
+        "UF": "ES"
+    }
+    print(f"✅ Parsed: {title}")
+    print(event_data)
+    return event_data
+
+
+def lebillet_pipeline(city):
+    """Pipeline spec (see scraper/pipeline.py) for one city of LEBILLET_CITIES."""
+    return {
+        "name": f"lebillet:{city}",
+        "urls": [LEBILLET_SEARCH_URL.format(city_id=LEBILLET_CITIES[city])],
+        "fetch_kwargs": lebillet_fetch_kwargs(),
+        "parse": extract_lebillet_cards,
+        "normalize": normalize_lebillet_card,
+    }
 
-    print(f"✅ Total events parsed: {len(future_events)}")
-    if future_events:
-        save_events_bulk(future_events)
-        print(f"✅ Saved {len(future_events)} LeBillet events to MongoDB.")
-    return future_events
 
-def scrape_lebillet_events_cariacica():
+def scrape_lebillet_city(city_id):
     print("⏳ Scraping LeBillet for ES events...")
+    url = LEBILLET_SEARCH_URL.format(city_id=city_id)
     try:
-        response = requests.get("https://lebillet.com.br/search?city=29", timeout=10, verify=False)
+        response = http_client.get(url, **lebillet_fetch_kwargs())
         response.raise_for_status()
     except Exception as e:
         print(f"❌ Failed to fetch LeBillet page: {e}")
         return []
-
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    # Restrict to only ES-related section
-    next_shows_section = soup.find("div", class_="next-shows-inner")
-    if not next_shows_section:
-        print("❌ Could not find the 'next-shows-inner' container.")
+    if response.not_modified:
+        print("✅ LeBillet page unchanged since the last run, nothing to do.")
         return []
 
-    event_cards = next_shows_section.find_all("div", class_="show-card")
     future_events = []
-
-    for card in event_cards:
-        try:
-            title = card.select_one("h3.title").text.strip()
-            link = card.select_one("a.card-link")["href"]
-            image = card.select_one("img.image")["src"]
-            location = card.select_one("p.data-text.location").text.strip()
-            date_str = card.select_one("p.data-text.datetime").text.strip()
-
-            parsed_date = parse_brazilian_date(date_str)
-            if not parsed_date or parsed_date < datetime.now():
-                continue  # Skip past or unparseable events
-
-            event_data = {
-                "title": title,
-                "link": link,
-                "image": image,
-                "location": location.replace(", ES", "").strip(),
-                "date": parsed_date.isoformat(),
-                "end_date": parsed_date.isoformat(),
-                "highlighted": False,
-                "font": "LeBillet",
-                "category": categorize_event(title + " " + location),
-                "UF": "ES"
-            }
-
+    with timed("parse"):
+        cards = extract_lebillet_cards(response.content, encoding=http_client.page_encoding(response))
+    for card in cards:
+        event_data = normalize_lebillet_card(card)
+        if event_data:
             future_events.append(event_data)
-            print(f"✅ Parsed: {title}")
-            print(event_data)
-        except Exception as e:
-            print(f"⚠️ Skipped card due to error: {e}")
-            continue
 
     print(f"✅ Total events parsed: {len(future_events)}")
     if future_events:
         save_events_bulk(future_events)
         print(f"✅ Saved {len(future_events)} LeBillet events to MongoDB.")
+    http_client.page_saved(url)
     return future_events
 
-def scrape_lebillet_events_guacui():
-    print("⏳ Scraping LeBillet for ES events...")
-    try:
-        response = requests.get("https://lebillet.com.br/search?city=42", timeout=10, verify=False)
-        response.raise_for_status()
-    except Exception as e:
-        print(f"❌ Failed to fetch LeBillet page: {e}")
-        return []
-
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    # Restrict to only ES-related section
-    next_shows_section = soup.find("div", class_="next-shows-inner")
-    if not next_shows_section:
-        print("❌ Could not find the 'next-shows-inner' container.")
-        return []
-
-    event_cards = next_shows_section.find_all("div", class_="show-card")
-    future_events = []
-
-    for card in event_cards:
-        try:
-            title = card.select_one("h3.title").text.strip()
-            link = card.select_one("a.card-link")["href"]
-            image = card.select_one("img.image")["src"]
-            location = card.select_one("p.data-text.location").text.strip()
-            date_str = card.select_one("p.data-text.datetime").text.strip()
-
-            parsed_date = parse_brazilian_date(date_str)
-            if not parsed_date or parsed_date < datetime.now():
-                continue  # Skip past or unparseable events
-
-            event_data = {
-                "title": title,
-                "link": link,
-                "image": image,
-                "location": location.replace(", ES", "").strip(),
-                "date": parsed_date.isoformat(),
-                "end_date": parsed_date.isoformat(),
-                "highlighted": False,
-                "font": "LeBillet",
-                "category": categorize_event(title + " " + location),
-                "UF": "ES"
-            }
+def scrape_lebillet_events_domingos_martins():
+    return scrape_lebillet_city(LEBILLET_CITIES["domingos_martins"])
 
-            future_events.append(event_data)
-            print(f"✅ Parsed: {title}")
-            print(event_data)
-        except Exception as e:
-            print(f"⚠️ Skipped card due to error: {e}")
-            continue
+def scrape_lebillet_events_cariacica():
+    return scrape_lebillet_city(LEBILLET_CITIES["cariacica"])
 
-    print(f"✅ Total events parsed: {len(future_events)}")
-    if future_events:
-        save_events_bulk(future_events)
-        print(f"✅ Saved {len(future_events)} LeBillet events to MongoDB.")
-    return future_events
+def scrape_lebillet_events_guacui():
+    return scrape_lebillet_city(LEBILLET_CITIES["guacui"])
 
 def scrape_lebillet_events_guarapari():
-    print("⏳ Scraping LeBillet for ES events...")
-    try:
-        response = requests.get("https://lebillet.com.br/search?city=30", timeout=10, verify=False)
-        response.raise_for_status()
-    except Exception as e:
-        print(f"❌ Failed to fetch LeBillet page: {e}")
-        return []
-
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    # Restrict to only ES-related section
-    next_shows_section = soup.find("div", class_="next-shows-inner")
-    if not next_shows_section:
-        print("❌ Could not find the 'next-shows-inner' container.")
-        return []
-
-    event_cards = next_shows_section.find_all("div", class_="show-card")
-    future_events = []
-
-    for card in event_cards:
-        try:
-            title = card.select_one("h3.title").text.strip()
-            link = card.select_one("a.card-link")["href"]
-            image = card.select_one("img.image")["src"]
-            location = card.select_one("p.data-text.location").text.strip()
-            date_str = card.select_one("p.data-text.datetime").text.strip()
-
-            parsed_date = parse_brazilian_date(date_str)
-            if not parsed_date or parsed_date < datetime.now():
-                continue  # Skip past or unparseable events
-
-            event_data = {
-                "title": title,
-                "link": link,
-                "image": image,
-                "location": location.replace(", ES", "").strip(),
-                "date": parsed_date.isoformat(),
-                "end_date": parsed_date.isoformat(),
-                "highlighted": False,
-                "font": "LeBillet",
-                "category": categorize_event(title + " " + location),
-                "UF": "ES"
-            }
-
-            future_events.append(event_data)
-            print(f"✅ Parsed: {title}")
-            print(event_data)
-        except Exception as e:
-            print(f"⚠️ Skipped card due to error: {e}")
-            continue
-
-    print(f"✅ Total events parsed: {len(future_events)}")
-    if future_events:
-        save_events_bulk(future_events)
-        print(f"✅ Saved {len(future_events)} LeBillet events to MongoDB.")
-    return future_events
+    return scrape_lebillet_city(LEBILLET_CITIES["guarapari"])
 
 def scrape_lebillet_events_linhares():
-    print("⏳ Scraping LeBillet for ES events...")
-    try:
-        response = requests.get("https://lebillet.com.br/search?city=25", timeout=10, verify=False)
-        response.raise_for_status()
-    except Exception as e:
-        print(f"❌ Failed to fetch LeBillet page: {e}")
-        return []
-
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    # Restrict to only ES-related section
-    next_shows_section = soup.find("div", class_="next-shows-inner")
-    if not next_shows_section:
-        print("❌ Could not find the 'next-shows-inner' container.")
-        return []
-
-    event_cards = next_shows_section.find_all("div", class_="show-card")
-    future_events = []
-
-    for card in event_cards:
-        try:
-            title = card.select_one("h3.title").text.strip()
-            link = card.select_one("a.card-link")["href"]
-            image = card.select_one("img.image")["src"]
-            location = card.select_one("p.data-text.location").text.strip()
-            date_str = card.select_one("p.data-text.datetime").text.strip()
-
-            parsed_date = parse_brazilian_date(date_str)
-            if not parsed_date or parsed_date < datetime.now():
-                continue  # Skip past or unparseable events
-
-            event_data = {
-                "title": title,
-                "link": link,
-                "image": image,
-                "location": location.replace(", ES", "").strip(),
-                "date": parsed_date.isoformat(),
-                "end_date": parsed_date.isoformat(),
-                "highlighted": False,
-                "font": "LeBillet",
-                "category": categorize_event(title + " " + location),
-                "UF": "ES"
-            }
-
-            future_events.append(event_data)
-            print(f"✅ Parsed: {title}")
-            print(event_data)
-        except Exception as e:
-            print(f"⚠️ Skipped card due to error: {e}")
-            continue
-
-    print(f"✅ Total events parsed: {len(future_events)}")
-    if future_events:
-        save_events_bulk(future_events)
-        print(f"✅ Saved {len(future_events)} LeBillet events to MongoDB.")
-    return future_events
+    return scrape_lebillet_city(LEBILLET_CITIES["linhares"])
 
 def scrape_lebillet_events_serra():
-    print("⏳ Scraping LeBillet for ES events...")
-    try:
-        response = requests.get("https://lebillet.com.br/search?city=32", timeout=10, verify=False)
-        response.raise_for_status()
-    except Exception as e:
-        print(f"❌ Failed to fetch LeBillet page: {e}")
-        return []
-
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    # Restrict to only ES-related section
-    next_shows_section = soup.find("div", class_="next-shows-inner")
-    if not next_shows_section:
-        print("❌ Could not find the 'next-shows-inner' container.")
-        return []
-
-    event_cards = next_shows_section.find_all("div", class_="show-card")
-    future_events = []
-
-    for card in event_cards:
-        try:
-            title = card.select_one("h3.title").text.strip()
-            link = card.select_one("a.card-link")["href"]
-            image = card.select_one("img.image")["src"]
-            location = card.select_one("p.data-text.location").text.strip()
-            date_str = card.select_one("p.data-text.datetime").text.strip()
-
-            parsed_date = parse_brazilian_date(date_str)
-            if not parsed_date or parsed_date < datetime.now():
-                continue  # Skip past or unparseable events
-
-            event_data = {
-                "title": title,
-                "link": link,
-                "image": image,
-                "location": location.replace(", ES", "").strip(),
-                "date": parsed_date.isoformat(),
-                "end_date": parsed_date.isoformat(),
-                "highlighted": False,
-                "font": "LeBillet",
-                "category": categorize_event(title + " " + location),
-                "UF": "ES"
-            }
-
-            future_events.append(event_data)
-            print(f"✅ Parsed: {title}")
-            print(event_data)
-        except Exception as e:
-            print(f"⚠️ Skipped card due to error: {e}")
-            continue
-
-    print(f"✅ Total events parsed: {len(future_events)}")
-    if future_events:
-        save_events_bulk(future_events)
-        print(f"✅ Saved {len(future_events)} LeBillet events to MongoDB.")
-    return future_events
+    return scrape_lebillet_city(LEBILLET_CITIES["serra"])
 
 def scrape_lebillet_events_viana():
-    print("⏳ Scraping LeBillet for ES events...")
-    try:
-        response = requests.get("https://lebillet.com.br/search?city=114", timeout=10, verify=False)
-        response.raise_for_status()
-    except Exception as e:
-        print(f"❌ Failed to fetch LeBillet page: {e}")
-        return []
-
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    # Restrict to only ES-related section
-    next_shows_section = soup.find("div", class_="next-shows-inner")
-    if not next_shows_section:
-        print("❌ Could not find the 'next-shows-inner' container.")
-        return []
-
-    event_cards = next_shows_section.find_all("div", class_="show-card")
-    future_events = []
-
-    for card in event_cards:
-        try:
-            title = card.select_one("h3.title").text.strip()
-            link = card.select_one("a.card-link")["href"]
-            image = card.select_one("img.image")["src"]
-            location = card.select_one("p.data-text.location").text.strip()
-            date_str = card.select_one("p.data-text.datetime").text.strip()
-
-            parsed_date = parse_brazilian_date(date_str)
-            if not parsed_date or parsed_date < datetime.now():
-                continue  # Skip past or unparseable events
-
-            event_data = {
-                "title": title,
-                "link": link,
-                "image": image,
-                "location": location.replace(", ES", "").strip(),
-                "date": parsed_date.isoformat(),
-                "end_date": parsed_date.isoformat(),
-                "highlighted": False,
-                "font": "LeBillet",
-                "category": categorize_event(title + " " + location),
-                "UF": "ES"
-            }
-
-            future_events.append(event_data)
-            print(f"✅ Parsed: {title}")
-            print(event_data)
-        except Exception as e:
-            print(f"⚠️ Skipped card due to error: {e}")
-            continue
-
-    print(f"✅ Total events parsed: {len(future_events)}")
-    if future_events:
-        save_events_bulk(future_events)
-        print(f"✅ Saved {len(future_events)} LeBillet events to MongoDB.")
-    return future_events
+    return scrape_lebillet_city(LEBILLET_CITIES["viana"])
 
 def scrape_lebillet_events_vilha_velha():
-    print("⏳ Scraping LeBillet for ES events...")
-    try:
-        response = requests.get("https://lebillet.com.br/search?city=24", timeout=10, verify=False)
-        response.raise_for_status()
-    except Exception as e:
-        print(f"❌ Failed to fetch LeBillet page: {e}")
-        return []
-
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    # Restrict to only ES-related section
-    next_shows_section = soup.find("div", class_="next-shows-inner")
-    if not next_shows_section:
-        print("❌ Could not find the 'next-shows-inner' container.")
-        return []
-
-    event_cards = next_shows_section.find_all("div", class_="show-card")
-    future_events = []
-
-    for card in event_cards:
-        try:
-            title = card.select_one("h3.title").text.strip()
-            link = card.select_one("a.card-link")["href"]
-            image = card.select_one("img.image")["src"]
-            location = card.select_one("p.data-text.location").text.strip()
-            date_str = card.select_one("p.data-text.datetime").text.strip()
-
-            parsed_date = parse_brazilian_date(date_str)
-            if not parsed_date or parsed_date < datetime.now():
-                continue  # Skip past or unparseable events
-
-            event_data = {
-                "title": title,
-                "link": link,
-                "image": image,
-                "location": location.replace(", ES", "").strip(),
-                "date": parsed_date.isoformat(),
-                "end_date": parsed_date.isoformat(),
-                "highlighted": False,
-                "font": "LeBillet",
-                "category": categorize_event(title + " " + location),
-                "UF": "ES"
-            }
-
-            future_events.append(event_data)
-            print(f"✅ Parsed: {title}")
-            print(event_data)
-        except Exception as e:
-            print(f"⚠️ Skipped card due to error: {e}")
-            continue
-
-    print(f"✅ Total events parsed: {len(future_events)}")
-    if future_events:
-        save_events_bulk(future_events)
-        print(f"✅ Saved {len(future_events)} LeBillet events to MongoDB.")
-    return future_events
+    return scrape_lebillet_city(LEBILLET_CITIES["vila_velha"])
 
 def scrape_lebillet_events_vitoria():
-    print("⏳ Scraping LeBillet for ES events...")
-    try:
-        response = requests.get("https://lebillet.com.br/search?city=20", timeout=10, verify=False)
-        response.raise_for_status()
-    except Exception as e:
-        print(f"❌ Failed to fetch LeBillet page: {e}")
-        return []
-
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    # Restrict to only ES-related section
-    next_shows_section = soup.find("div", class_="next-shows-inner")
-    if not next_shows_section:
-        print("❌ Could not find the 'next-shows-inner' container.")
-        return []
-
-    event_cards = next_shows_section.find_all("div", class_="show-card")
-    future_events = []
-
-    for card in event_cards:
-        try:
-            title = card.select_one("h3.title").text.strip()
-            link = card.select_one("a.card-link")["href"]
-            image = card.select_one("img.image")["src"]
-            location = card.select_one("p.data-text.location").text.strip()
-            date_str = card.select_one("p.data-text.datetime").text.strip()
-
-            parsed_date = parse_brazilian_date(date_str)
-            if not parsed_date or parsed_date < datetime.now():
-                continue  # Skip past or unparseable events
-
-            event_data = {
-                "title": title,
-                "link": link,
-                "image": image,
-                "location": location.replace(", ES", "").strip(),
-                "date": parsed_date.isoformat(),
-                "end_date": parsed_date.isoformat(),
-                "highlighted": False,
-                "font": "LeBillet",
-                "category": categorize_event(title + " " + location),
-                "UF": "ES"
-            }
-
-            future_events.append(event_data)
-            print(f"✅ Parsed: {title}")
-            print(event_data)
-        except Exception as e:
-            print(f"⚠️ Skipped card due to error: {e}")
-            continue
-
-    print(f"✅ Total events parsed: {len(future_events)}")
-    if future_events:
-        save_events_bulk(future_events)
-        print(f"✅ Saved {len(future_events)} LeBillet events to MongoDB.")
-    return future_events
+    return scrape_lebillet_city(LEBILLET_CITIES["vitoria"])
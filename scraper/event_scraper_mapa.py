@@ -1,15 +1,15 @@
-from bs4 import BeautifulSoup
 from datetime import datetime
 import time
 import re
 
-from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By # To specify element selection method
 from selenium.webdriver.support.ui import WebDriverWait # To wait for elements to appear
 from selenium.webdriver.support import expected_conditions as EC # Conditions for waiting
 
 from database.db_operations import save_events_bulk, event_exists, deduplicate_events
+from scraper import card_specs, cassette
+from scraper.timing import timed
 
 from utils.categorize import categorize_event
 
@@ -49,6 +49,37 @@ def parse_mapa_date(date_str):
         return None
 
 
+def extract_mapa_cards(html, url=None, encoding=None):
+    """Pulls the raw fields of every occurrence card out of the fully expanded events page (card spec "mapa")."""
+    return card_specs.extract("mapa", html, url, encoding)
+
+
+def normalize_mapa_card(card):
+    """Turns a raw Mapa Cultural card into an event, or None without a link or for past/unparseable dates."""
+    title, link, location_text = card["title"], card["link"], card["location"]
+    date_text = card["date_text"]
+    parsed_date = parse_mapa_date(date_text) if date_text else None
+
+    if not link or not parsed_date:
+        return None
+
+    if parsed_date < datetime.now():
+        print(f"⏩ Skipped past event: {title} ({parsed_date})")
+        return None
+
+    return {
+        "title": title,
+        "location": location_text,
+        "date": parsed_date.isoformat(),
+        "end_date": parsed_date.isoformat(),
+        "link": link,
+        "image": card["image"],
+        "font": "Mapa Cultural ES",
+        "highlighted": False,
+        "category": categorize_event(card["category_text"]),
+        "UF": "ES"
+    }
+
 
 def scrape_mapa_events():
     print("⏳ Scraping MAPA Cultura with Selenium...")
@@ -58,7 +89,7 @@ def scrape_mapa_events():
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
 
-    driver = webdriver.Chrome(options=chrome_options)
+    driver = cassette.chrome(chrome_options)
     driver.get("https://mapa.cultura.es.gov.br/eventos/#main-app")
 
     try:
@@ -82,56 +113,26 @@ def scrape_mapa_events():
             break  # Button not found or finished
 
     # ⬇️ Only parse after all cards are loaded
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+    html = driver.page_source
     driver.quit()
 
-    event_blocks = soup.select(".entity-card.occurrence-card")
+    with timed("parse"):
+        cards = extract_mapa_cards(html)
     future_events = []
 
-    for card in event_blocks:
+    for card in cards:
         try:
-            title = card.select_one(".user-info h2").text.strip()
-            img_tag = card.select_one(".mc-avatar img")
-            image = img_tag["src"] if img_tag else ""
-            category_text = card.select_one("p.terms").text.strip()
-
-            footer = card.select_one(".entity-card__footer--action a")
-            link = footer["href"] if footer else None
-
-            location = card.select_one(".space-adress__name")
-            location_text = location.text.strip() if location else "Mapa Cultural ES"
-
-            date_element = card.select_one(".entity-card__content--occurrence-data")
-            date_text = date_element.text.strip() if date_element else None
-            parsed_date = parse_mapa_date(date_text) if date_text else None
-
-            if not link or not parsed_date:
+            event_data = normalize_mapa_card(card)
+            if not event_data:
                 continue
 
-            if parsed_date < datetime.now():
-                print(f"⏩ Skipped past event: {title} ({parsed_date})")
-                continue
-
-            event_data = {
-                "title": title,
-                "location": location_text,
-                "date": parsed_date.isoformat(),
-                "end_date": parsed_date.isoformat(),
-                "link": link,
-                "image": image,
-                "font": "Mapa Cultural ES",
-                "highlighted": False,
-                "category": categorize_event(category_text),
-                "UF": "ES"
-            }
-
             if event_exists(event_data["title"], event_data["date"], event_data["link"]):
-                print(f"🔁 Duplicate skipped: {event_data['title']} on {event_data['date']} at {location_text}")
+                print(f"🔁 Duplicate skipped: {event_data['title']} on {event_data['date']} at {event_data['location']}")
                 continue
 
             future_events.append(event_data)
             print(f"✅ Parsed: {event_data}")
-            print(f"✅ Parsed: {link}")
+            print(f"✅ Parsed: {event_data['link']}")
 
         except Exception as e:
             print(f"⚠️ Skipped card due to error: {e}")
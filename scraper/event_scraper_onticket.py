@@ -1,10 +1,10 @@
 
-from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
+from scraper import cassette, http_client
 from datetime import datetime
 import time
 
@@ -34,7 +34,7 @@ def scrape_onticket_with_selenium():
     options.add_argument("--no-sandbox")
     options.add_argument("--window-size=1920,1080")
 
-    driver = webdriver.Chrome(options=options)
+    driver = cassette.chrome(options)
     driver.get(url)
 
     try:
@@ -97,7 +97,7 @@ def scrape_onticket_with_selenium():
     options.add_argument("--headless")
     options.add_argument("--disable-gpu")
 
-    driver = webdriver.Chrome(options=options)
+    driver = cassette.chrome(options)
     driver.get(url)
     time.sleep(5)  # Espera o JS carregar
 
@@ -143,7 +143,7 @@ def scrape_onticket_with_selenium():
     print("⏳ Scraping OnTicket event page...")
     url = "https://onticket.com.br/eventos/5784"  # URL limpa
     try:
-        response = requests.get(url, timeout=10, verify=False)
+        response = http_client.get(url, timeout=10, verify=False)
         response.raise_for_status()
     except Exception as e:
         print(f"❌ Failed to fetch page: {e}")
@@ -197,7 +197,7 @@ def scrape_onticket_with_selenium():
 
     try:
         #response = requests.get(url, timeout=10)
-        response = requests.get(url, timeout=10, verify=False)
+        response = http_client.get(url, timeout=10, verify=False)
         response.raise_for_status()
     except Exception as e:
         print(f"❌ Failed to fetch page: {e}")
@@ -1,9 +1,11 @@
 import requests
 from datetime import datetime
 import re
-from bs4 import BeautifulSoup
 
 from database.db_operations import save_events_bulk
+from scraper import http_client
+from scraper.timing import timed
+from scraper import card_specs
 from utils.categorize import categorize_event
 
 
@@ -33,78 +35,91 @@ def extract_date_from_image(img_url):
     return None
 
 
-def scrape_and_save_patrick_events():
-    url = "https://patrickribeiro.com.br/"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+PATRICK_URL = "https://patrickribeiro.com.br/"
+PATRICK_FETCH_KWARGS = {
+    "headers": {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"},
+    "verify": False,
+    "cache": True,
+}
+
+
+def extract_patrick_cards(html, url=None, encoding=None):
+    """Pulls title, image and link out of every event card on the home page (card spec "patrick")."""
+    return card_specs.extract("patrick", html, url, encoding)
+
+
+def normalize_patrick_card(card):
+    """Turns a raw card into an event (the date comes from the image name), or None if past."""
+    title = card["title"]
+    img_src = card["image"]
+    href = card["link"]
+
+    parsed_date = extract_date_from_image(img_src)
+    if parsed_date and parsed_date < datetime.now():
+        print(f"⏩ Skipping past event: {title} ({parsed_date})")
+        return None
+
+    event_data = {
+        "title": title,
+        "location": "Espaço Patrick Ribeiro",
+        "date": parsed_date.isoformat() if parsed_date else None,
+        "end_date": parsed_date.isoformat() if parsed_date else None,
+        "link": href,
+        "image": img_src,
+        "font": "Espaço Patrick Ribeiro",
+        "highlighted": False,
+        "category": categorize_event(title),
+        "UF": "ES"
     }
 
+    # Output
+    print(f"📌 {title} | 📍 Espaço Patrick Ribeiro | 🕒 None")
+    print(f"🔗 {href}")
+    print(f"🖼️ {img_src}")
+    print("-" * 60)
+    return event_data
+
+
+def patrick_pipeline():
+    """Pipeline spec (see scraper/pipeline.py)."""
+    return {
+        "name": "patrick",
+        "urls": [PATRICK_URL],
+        "fetch_kwargs": PATRICK_FETCH_KWARGS,
+        "parse": extract_patrick_cards,
+        "normalize": normalize_patrick_card,
+    }
+
+
+def scrape_and_save_patrick_events():
     try:
-        response = requests.get(url, headers=headers, verify=False)
+        response = http_client.get(PATRICK_URL, **PATRICK_FETCH_KWARGS)
         response.raise_for_status()
     except requests.RequestException as e:
         print(f"❌ Failed to fetch page: {e}")
         return
-
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    # 🔍 Find ALL event cards directly, not just inside one container
-    event_cards = soup.select('div.e-loop-item[data-elementor-type="loop-item"][data-elementor-id="247"]')
-
-    if not event_cards:
-        print("⚠️ No events found.")
+    if response.not_modified:
+        print("✅ Patrick Ribeiro page unchanged since the last run, nothing to do.")
         return
 
     events_to_save = []
 
-    for i, card in enumerate(event_cards):
+    with timed("parse"):
+        cards = extract_patrick_cards(response.content, PATRICK_URL, http_client.page_encoding(response))
+    for card in cards:
         try:
-            print(f"--- Processing card {i + 1} ---")
-
-            # Title
-            title_tag = card.select_one("h3.elementor-heading-title")
-            title = title_tag.text.strip() if title_tag else None
-
-            # Image
-            img_tag = card.select_one("img")
-            img_src = img_tag["src"].strip() if img_tag and "src" in img_tag.attrs else None
-
-            # Link
-            link_tag = card.select_one("a.elementor-button")
-            href = link_tag["href"].strip() if link_tag and "href" in link_tag.attrs else None
-
-            parsed_date = extract_date_from_image(img_src)
-            if parsed_date and parsed_date < datetime.now():
-                print(f"⏩ Skipping past event: {title} ({parsed_date})")
-                continue
-
-            event_data = {
-                "title": title,
-                "location": "Espaço Patrick Ribeiro",
-                "date": parsed_date.isoformat() if parsed_date else None,
-                "end_date": parsed_date.isoformat() if parsed_date else None,
-                "link": href,
-                "image": img_src,
-                "font": "Espaço Patrick Ribeiro",
-                "highlighted": False,
-                "category": categorize_event(title),
-                "UF": "ES"
-            }
-
-
-            events_to_save.append(event_data)
-
-            # Output
-            print(f"📌 {title} | 📍 Espaço Patrick Ribeiro | 🕒 None")
-            print(f"🔗 {href}")
-            print(f"🖼️ {img_src}")
-            print("-" * 60)
-
+            event_data = normalize_patrick_card(card)
         except Exception as err:
             print(f"⚠️ Error parsing event card: {err}")
+            continue
+        if event_data:
+            events_to_save.append(event_data)
 
     if events_to_save:
         save_events_bulk(events_to_save)
         print(f"✅ Saved {len(events_to_save)} Patrick Ribeiro events to MongoDB.")
     else:
         print("⚠️ No valid events to save.")
+    http_client.page_saved(PATRICK_URL)
+
+    return events_to_save
@@ -10,13 +10,12 @@ import traceback # For detailed error reporting
 
 import re
 
-from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By # To specify element selection method
 from selenium.webdriver.support.ui import WebDriverWait # To wait for elements to appear
 from selenium.webdriver.support import expected_conditions as EC # Conditions for waiting
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+
+from scraper import cassette, checkpoint
 
 COURSE_LIST_URL = "https://www.es.senac.br/cursos?pagina=1&ordem=proximasturmas-desc&per_page=10"
 BASE_URL = "https://www.es.senac.br"
@@ -30,18 +29,22 @@ def parse_date(date_str):
 BASE_URL = "https://www.es.senac.br"
 COURSE_LIST_URL = f"{BASE_URL}/cursos"
 
-def scrape_senac_courses():
+def scrape_senac_courses(checkpoint_name="senac"):
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
 
     # ✅ Sem precisar baixar ou indicar caminho manualmente
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver = cassette.chrome(chrome_options, manage_driver=True)
 
     try:
-        page = 1
+        # Each page is saved as soon as it is parsed, so an interrupted run
+        # can restart after the last saved page.
+        finished_pages = checkpoint.done_pages(checkpoint_name)
+        page = max(finished_pages) + 1 if finished_pages else 1
+        if page > 1:
+            print(f"♻️ Resuming Senac courses at page {page}")
         all_courses = []
 
         while True:
@@ -71,6 +74,7 @@ def scrape_senac_courses():
                 print("📭 No more cards found — stopping.")
                 break
 
+            page_courses = []
             for card in cards:
                 try:
                     title = card.select_one("p.card-lancamento__text__titulo").text.strip()
@@ -110,20 +114,23 @@ def scrape_senac_courses():
                     }
 
                     print(f"📚 {title} | 🗓️ {date} | ⏱️ {duration}h | 🔗 {link}")
-                    all_courses.append(course)
+                    page_courses.append(course)
 
                 except Exception as e:
                     print(f"⚠️ Failed to parse a course: {e}")
                     traceback.print_exc()
 
+            if page_courses:
+                save_events_bulk(page_courses)
+                print(f"✅ Saved {len(page_courses)} Senac courses from page {page} to MongoDB.")
+            all_courses.extend(page_courses)
+            checkpoint.mark_page_done(checkpoint_name, page)
+
             page += 1
 
         print(f"\n✅ Total courses scraped: {len(all_courses)}")
 
-        if all_courses:
-            save_events_bulk(all_courses)
-            print(f"✅ Saved {len(all_courses)} Senac courses to MongoDB.")
-        else:
+        if not all_courses:
             print("⚠️ No valid courses to save.")
 
         return all_courses
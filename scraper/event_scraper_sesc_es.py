@@ -1,10 +1,10 @@
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
-import time
 import re
 
 from database.db_operations import save_events_bulk
+from scraper import http_client
+from scraper.frontier import Frontier
+from scraper.utils import make_soup
 from utils.categorize import categorize_event  # optional, if you have this
 
 # Portuguese months mapping
@@ -44,32 +44,38 @@ def scrape_sesc_es():
     print(f"🔍 Fetching SESC-ES events from {start_url}")
 
     try:
-        response = requests.get(start_url, headers={"User-Agent": "Mozilla/5.0"})
+        response = http_client.get(start_url, headers={"User-Agent": "Mozilla/5.0"})
         response.raise_for_status()
     except Exception as e:
         print(f"❌ Failed to fetch SESC-ES events: {e}")
         return []
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = make_soup(response.content, http_client.page_encoding(response))
 
-    # Find first event link
-    first_event_tag = soup.select_one(".wpem-event-single-image a, .wpem-event-layout-wrapper a.wpem-event-action-url")
-    if not first_event_tag:
+    # Every event page linked from the list goes into the crawl frontier, and so
+    # does the "next event" link of each event page, in case the list doesn't
+    # show them all. The frontier skips links it has already seen.
+    frontier = Frontier()
+    for event_tag in soup.select(".wpem-event-single-image a, .wpem-event-layout-wrapper a.wpem-event-action-url"):
+        if event_tag.get("href"):
+            frontier.put(event_tag["href"])
+    if frontier.idle():
         print("⚠️ No events found.")
         return []
 
-    next_link = first_event_tag.get("href")
     events_to_save = []
 
-    while next_link:
+    for page in frontier.crawl(headers={"User-Agent": "Mozilla/5.0"}):
+        next_link = page["url"]
+        if page["error"]:
+            print(f"⚠️ Error fetching event {next_link}: {page['error']}")
+            continue
         try:
-            ev_resp = requests.get(next_link, headers={"User-Agent": "Mozilla/5.0"})
-            ev_resp.raise_for_status()
-            ev_soup = BeautifulSoup(ev_resp.text, "html.parser")
+            ev_soup = make_soup(page["content"], page["encoding"])
 
             wrapper = ev_soup.select_one(".wpem-single-event-wrapper")
             if not wrapper:
-                break
+                continue
 
             # Title
             title_tag = wrapper.select_one(".wpem-event-title h3")
@@ -122,13 +128,12 @@ def scrape_sesc_es():
 
             # Find next event link
             next_btn = ev_soup.select_one(".post-nav a.next")
-            next_link = next_btn["href"] if next_btn else None
-
-            time.sleep(1)  # polite delay
+            if next_btn and next_btn.get("href"):
+                frontier.put(next_btn["href"])
 
         except Exception as e:
             print(f"⚠️ Error parsing event {next_link}: {e}")
-            break
+            continue
 
     if events_to_save:
         save_events_bulk(events_to_save)
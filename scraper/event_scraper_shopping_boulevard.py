@@ -1,10 +1,10 @@
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
-from urllib.parse import urljoin
 
 from database.db_operations import save_events_bulk
+from scraper import http_client
+from scraper.timing import timed
+from scraper import card_specs
 from utils.categorize import categorize_event  # make sure this function exists
 
 import urllib3
@@ -25,95 +25,87 @@ def get_end_of_next_month():
     end_of_next_month = (first_of_next_month + relativedelta(months=1)) - timedelta(days=1)
     return end_of_next_month
 
-def scrape_boulevard_vila_velha():
-    print(f"🔍 Fetching events from {START_URL}")
+BOULEVARD_FETCH_KWARGS = {"headers": HEADERS, "verify": False, "cache": True}
 
-    try:
-        response = requests.get(START_URL, headers=HEADERS, verify=False)
-        response.raise_for_status()
-    except Exception as e:
-        print(f"❌ Failed to fetch page: {e}")
-        return []
 
-    soup = BeautifulSoup(response.text, "html.parser")
+def boulevard_fetch_kwargs():
+    """BOULEVARD_FETCH_KWARGS with "until" set to the container of the "boulevard" card spec."""
+    return dict(BOULEVARD_FETCH_KWARGS, until=card_specs.spec("boulevard").only)
 
-    # Main container
-    container = soup.select_one("div.flex.w-full.flex-wrap.items-center.justify-center.gap-10.px-6.py-20")
-    if not container:
-        print("⚠️ Event container not found.")
-        return []
 
-    event_cards = [
-        div for div in container.find_all("div", class_="flex")
-        if set(["flex", "w-max", "flex-[0_0_17rem]"]).issubset(div.get("class", []))
-    ]
-    if not event_cards:
-        print("⚠️ No events found.")
-        return []
+def extract_boulevard_cards(html, url=None, encoding=None):
+    """Pulls title, link, raw date and image out of every card in the events container (card spec "boulevard")."""
+    return card_specs.extract("boulevard", html, url, encoding)
 
-    print(f"🔗 Found {len(event_cards)} events")
-    events = []
 
-    for card in event_cards:
+def normalize_boulevard_card(card):
+    """Turns a raw card into an event; cards without a usable date get the end of next month."""
+    title = card["title"]
+    raw_date = card["raw_date"]
+    if raw_date:
         try:
-            # Title and full link
-            link_tag = card.select_one("a.text-lg.font-bold")
-            if link_tag:
-                title = link_tag.get_text(strip=True)
-                link = urljoin(BASE_URL, link_tag["href"])
-            else:
-                title = "Sem título"
-                link = START_URL
-
-            # Date
-            date_tag = card.select_one("p, span")
-            raw_date = date_tag.get_text(strip=True) if date_tag else None
-            if raw_date:
-                try:
-                    event_date = datetime.strptime(raw_date, "%d/%m/%Y")
-                except:
-                    event_date = get_end_of_next_month()
-            else:
-                event_date = get_end_of_next_month()
-            iso_date = event_date.strftime("%Y-%m-%dT00:00:00.000Z")
-
-            # Image
-            img_tag = card.select_one("img")
-            image = urljoin(BASE_URL, img_tag["src"]) if img_tag and img_tag.has_attr("src") else None
-
-            # Category
-            try:
-                category = categorize_event(title)
-            except:
-                category = "Outros"
-
-            event_data = {
-                "title": title,
-                "location": "Boulevard Vila Velha, ES",
-                "date": iso_date,
-                "date_end": iso_date,
-                "link": link,
-                "image": image,
-                "font": "Boulevard Vila Velha",
-                "category": category,
-                "highlighted": False,
-                "UF": "ES",
-            }
-
-            events.append(event_data)
-            print(f"✅ Parsed event Title: {title}")
-            print(f"✅ Parsed event Date: {iso_date}")
-            print(f"✅ Parsed event Category: {category}")
-            print(f"✅ Parsed event Link: {link}")
-            print(f"✅ Parsed event Image: {image}")
-            print("-" * 50)
-
-        except Exception as e:
-            print(f"⚠️ Error parsing event card: {e}")
-            continue
+            event_date = datetime.strptime(raw_date, "%d/%m/%Y")
+        except:
+            event_date = get_end_of_next_month()
+    else:
+        event_date = get_end_of_next_month()
+    iso_date = event_date.strftime("%Y-%m-%dT00:00:00.000Z")
 
+    # Category
+    try:
+        category = categorize_event(title)
+    except:
+        category = "Outros"
+
+    event_data = {
+        "title": title,
+        "location": "Boulevard Vila Velha, ES",
+        "date": iso_date,
+        "date_end": iso_date,
+        "link": card["link"],
+        "image": card["image"],
+        "font": "Boulevard Vila Velha",
+        "category": category,
+        "highlighted": False,
+        "UF": "ES",
+    }
+
+    print(f"✅ Parsed event Title: {title}")
+    print(f"✅ Parsed event Date: {iso_date}")
+    print(f"✅ Parsed event Category: {category}")
+    print(f"✅ Parsed event Link: {card['link']}")
+    print(f"✅ Parsed event Image: {card['image']}")
+    print("-" * 50)
+    return event_data
+
+
+def boulevard_pipeline():
+    """Pipeline spec (see scraper/pipeline.py)."""
+    return {
+        "name": "boulevard",
+        "urls": [START_URL],
+        "fetch_kwargs": boulevard_fetch_kwargs(),
+        "parse": extract_boulevard_cards,
+        "normalize": normalize_boulevard_card,
+    }
 
 
+def scrape_boulevard_vila_velha():
+    print(f"🔍 Fetching events from {START_URL}")
+
+    try:
+        response = http_client.get(START_URL, **boulevard_fetch_kwargs())
+        response.raise_for_status()
+    except Exception as e:
+        print(f"❌ Failed to fetch page: {e}")
+        return []
+    if response.not_modified:
+        print("✅ Boulevard page unchanged since the last run, nothing to do.")
+        return []
+
+    with timed("parse"):
+        cards = extract_boulevard_cards(response.content, START_URL, http_client.page_encoding(response))
+    events = [normalize_boulevard_card(card) for card in cards]
 
     # Save all events at once
     if events:
@@ -121,6 +113,7 @@ def scrape_boulevard_vila_velha():
         print(f"✅ Saved {len(events)} Boulevard Vila Velha events.")
     else:
         print("⚠️ No events saved.")
+    http_client.page_saved(START_URL)
 
     return events
 
@@ -1,12 +1,12 @@
 from urllib.parse import urljoin
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
-import time
 import re
 import urllib3
 
 from database.db_operations import save_events_bulk
+from scraper import http_client
+from scraper.frontier import Frontier
+from scraper import html_parser
 from utils.categorize import categorize_event  # optional
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -48,16 +48,16 @@ def scrape_shopping_vila_velha():
     print(f"🔍 Fetching Shopping Vila Velha events from {start_url}")
 
     try:
-        response = requests.get(start_url, headers=HEADERS, verify=False)
+        response = http_client.get(start_url, headers=HEADERS, verify=False)
         response.raise_for_status()
     except Exception as e:
         print(f"❌ Failed to fetch events page: {e}")
         return []
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    doc = html_parser.parse(response.content, http_client.page_encoding(response), only=".dsa-event-list-container")
 
     # Find main container with events
-    container = soup.select_one(".dsa-event-list-container")
+    container = doc.select_one(".dsa-event-list-container")
     if not container:
         print("⚠️ Event container not found.")
         return []
@@ -71,7 +71,6 @@ def scrape_shopping_vila_velha():
     print(f"🔗 Found {len(event_cards)} events")
     events = []
 
-    # Visit each event detail page
     for card in event_cards:
         try:
             # Title
@@ -95,53 +94,64 @@ def scrape_shopping_vila_velha():
             link_tag = card.select_one("a.dsa-link-primary")
             link = f"{base_url}/{link_tag['href'].lstrip('../')}" if link_tag else start_url
 
-            # Fetch event detail page
-            description, image = None, None
-            if link_tag:
-                try:
-                    detail_resp = requests.get(link, headers=HEADERS, verify=False)
-                    detail_resp.raise_for_status()
-                    detail_soup = BeautifulSoup(detail_resp.text, "html.parser")
-                    desc_tag = detail_soup.select_one(".dsa-text-body")
-                    description = desc_tag.get_text(" ", strip=True) if desc_tag else None
-                    img_tag = detail_soup.select_one("img.dsa-w-full")
-                    relative_src  = img_tag["src"] if img_tag and img_tag.has_attr("src") else None
-                    absolute_url = urljoin(base_url, relative_src)
-                except Exception as e:
-                    print(f"⚠️ Error fetching details for {title}: {e}")
-
-            event_data = {
+            events.append({
                 "title": title,
                 "location": "Shopping Vila Velha",
                 "date": iso_date,
                 "end_date": iso_end_date,
                 "link": link,
-                "image": absolute_url,
+                "image": None,
                 "font": "Shopping Vila Velha",
                 "category": category,
                 "highlighted": False,
                 "UF": "ES",
-                "description": description,
-            }
-
-            events.append(event_data)
-            print(f"✅ Parsed event title: {title}")
-            print(f"✅ Parsed event location: Shopping Vila Velha")
-            print(f"✅ Parsed event date: {iso_date}")
-            print(f"✅ Parsed event date_end: {iso_end_date}")
-            print(f"✅ Parsed event link: {link}")
-            print(f"✅ Parsed event image: {absolute_url}")
-            print(f"✅ Parsed event font: Shopping Vila Velha")
-            print(f"✅ Parsed event category: {category}")
-            print(f"✅ Parsed event Highlighted: false")
-            print(f"✅ Parsed event description: {description}")
-            print("-" * 50)
-            time.sleep(0.5)  # polite delay
+                "description": None,
+            })
 
         except Exception as e:
             print(f"⚠️ Error parsing event card: {e}")
             continue
 
+    # Fetch the event detail pages side by side through the crawl frontier
+    # (see scraper/frontier.py) for the description and image.
+    by_link = {}
+    frontier = Frontier()
+    for event in events:
+        if event["link"] != start_url:
+            by_link.setdefault(event["link"], []).append(event)
+            frontier.put(event["link"])
+
+    for page in frontier.crawl(headers=HEADERS, verify=False):
+        if page["error"]:
+            print(f"⚠️ Error fetching details from {page['url']}: {page['error']}")
+            continue
+        try:
+            detail_doc = html_parser.parse(page["content"], page["encoding"])
+            desc_tag = detail_doc.select_one(".dsa-text-body")
+            description = desc_tag.get_text(" ", strip=True) if desc_tag else None
+            img_tag = detail_doc.select_one("img.dsa-w-full")
+            relative_src  = img_tag["src"] if img_tag and img_tag.has_attr("src") else None
+            absolute_url = urljoin(base_url, relative_src)
+        except Exception as e:
+            print(f"⚠️ Error parsing details from {page['url']}: {e}")
+            continue
+        for event in by_link[page["url"]]:
+            event["description"] = description
+            event["image"] = absolute_url
+
+    for event in events:
+        print(f"✅ Parsed event title: {event['title']}")
+        print(f"✅ Parsed event location: Shopping Vila Velha")
+        print(f"✅ Parsed event date: {event['date']}")
+        print(f"✅ Parsed event date_end: {event['end_date']}")
+        print(f"✅ Parsed event link: {event['link']}")
+        print(f"✅ Parsed event image: {event['image']}")
+        print(f"✅ Parsed event font: Shopping Vila Velha")
+        print(f"✅ Parsed event category: {event['category']}")
+        print(f"✅ Parsed event Highlighted: false")
+        print(f"✅ Parsed event description: {event['description']}")
+        print("-" * 50)
+
     if events:
         save_events_bulk(events)
         print(f"✅ Saved {len(events)} Shopping Vila Velha events.")
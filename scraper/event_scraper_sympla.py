@@ -1,11 +1,19 @@
 
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urljoin
 from utils.categorize import categorize_event
-from bs4 import BeautifulSoup
 from database.db_operations import save_events_bulk
-import requests
+from scraper.frontier import Frontier
+from scraper.timing import timed
+from scraper import card_specs
+import json
 import re
 
+try:
+    import orjson
+except ImportError:  # optional: the standard json module reads the page state too, just slower
+    orjson = None
+
 def parse_sympla_date(date_str):
     try:
         date_str = date_str.lower()
@@ -51,95 +59,224 @@ def parse_sympla_date(date_str):
         print(f"⚠️ Error parsing date '{date_str}': {e}")
         return None
 
-def scrape_and_save_events_sympla(max_pages=20):
-    base_url = "https://www.sympla.com.br/eventos/vitoria-es"
-    headers = {"User-Agent": "Mozilla/5.0"}
+SYMPLA_BASE_URL = "https://www.sympla.com.br/eventos/vitoria-es"
+SYMPLA_HEADERS = {"User-Agent": "Mozilla/5.0"}
 
-    all_events_to_save = []
-    today = datetime.now()
-    page = 1
 
-    while page <= max_pages:
-        url = f"{base_url}?page={page}"
-        print(f"\n🔄 Scraping page {page}: {url}")
+# Sympla's listing pages are rendered from a JSON state blob embedded in the
+# page (Next.js). Its events come with ISO dates, venue, image and URL, so they
+# are read from there without building a DOM or parsing "17 de Ago às 14:00";
+# the cards of the HTML are only walked when a page has no such blob.
+_NEXT_DATA = re.compile(rb'<script[^>]*\bid="__NEXT_DATA__"[^>]*>(.*?)</script>', re.DOTALL)
 
-        try:
-            response = requests.get(url, headers=headers, verify=False)
-            response.raise_for_status()
-        except requests.RequestException as e:
-            print(f"❌ Failed to fetch page {page}: {e}")
-            break
+# Where the listing's own results sit in the state: the search response (a
+# "data" list of events, as from Sympla's search API) under props.pageProps.
+# The state also holds featured carousels, "near you" blocks for other cities
+# and SEO links with the same event shape, so nothing outside these is read;
+# a page without them falls back to the HTML cards.
+_RESULTS_PATHS = (
+    ("props", "pageProps", "searchResult", "data"),
+    ("props", "pageProps", "initialState", "search", "events", "data"),
+)
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        event_cards = soup.select('a.sympla-card')
+# Sympla's dates without an offset are Brasília time, like the dates parsed from the cards.
+_BRASILIA = timezone(timedelta(hours=-3))
 
-        if not event_cards:
-            print("✅ No more event cards found.")
-            break
 
-        for card in event_cards:
-            try:
-                href = card.get("href", "").strip()
-
-                # Title: H3
-                title_tag = card.select_one("h3.pn67h1a") or card.select_one("h3")
-                title = title_tag.text.strip() if title_tag else "Evento sem título"
-
-                # Location: P
-                location_tag = card.select_one("p.pn67h1c") or card.select_one("p")
-                location = location_tag.text.strip() if location_tag else "Local não informado"
-
-                # Image: IMG
-                img_tag = card.select_one("img.pn67h17") or card.select_one("img")
-                img_src = img_tag["src"] if img_tag and img_tag.has_attr("src") else ""
-
-                # Date: Div
-                date_tag = card.select_one("div.qtfy415.qtfy413.qtfy416")
-                date_text = date_tag.text.strip() if date_tag else None
-
-                if not date_text:
-                    print("⚠️ Skipped: Missing date text")
-                    continue
-
-                parsed_dates = parse_sympla_date(date_text)
-                if not parsed_dates:
-                    print(f"⏩ Skipped: Invalid date format '{date_text}'")
-                    continue
-
-                start_date, end_date = parsed_dates
-                if end_date < today:
-                    print(f"⏩ Skipped past event: {title} ({date_text})")
-                    continue
-
-                event_data = {
-                    "title": title,
-                    "location": location,
-                    "date": start_date.isoformat(),
-                    "end_date": end_date.isoformat() if start_date != end_date else None,
-                    "link": href,
-                    "image": img_src,
-                    "font": "Sympla",
-                    "highlighted": False,
-                    "category": categorize_event(title + location),
-                    "UF": "ES"
-                }
+def _load_json(raw):
+    return orjson.loads(raw) if orjson else json.loads(raw)
 
-                all_events_to_save.append(event_data)
 
-                # print(f"📌 {title} | 📍 {location} | 🕒 {start_date} → {end_date}")
-                # print(f"🔗 {href}")
-                # print(f"🖼️ {img_src}")
-                # print("-" * 60)
+def _sympla_datetime(value):
+    """An ISO date from the page state as a naive Brasília time, or None."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed.astimezone(_BRASILIA).replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def _sympla_location(location):
+    if isinstance(location, str):
+        return location.strip()
+    if not isinstance(location, dict):
+        return ""
+    place = ", ".join(part for part in (location.get("city"), location.get("state")) if part)
+    name = (location.get("name") or "").strip()
+    return f"{name} - {place}" if name and place else name or place
+
+
+def _sympla_image(images):
+    if isinstance(images, str):
+        return images
+    if isinstance(images, dict):
+        return images.get("original") or images.get("lg") or next(
+            (value for value in images.values() if isinstance(value, str)), "")
+    return ""
+
+
+def _listing_results(state):
+    """The list of events at the first of _RESULTS_PATHS the state has, or None."""
+    for path in _RESULTS_PATHS:
+        node = state
+        for key in path:
+            node = node.get(key) if isinstance(node, dict) else None
+        if isinstance(node, list):
+            return node
+    return None
+
+
+def extract_sympla_next_data(html, url=None, encoding=None):
+    """
+    The raw fields of every event in a listing page's search results
+    (__NEXT_DATA__ state), with "start"/"end" datetimes instead of
+    "date_text". None when the page has no state blob or no results in it.
+    """
+    raw = html.encode(encoding or "utf-8") if isinstance(html, str) else html
+    match = _NEXT_DATA.search(raw)
+    if not match:
+        return None
+    blob = match.group(1)
+    if encoding and encoding.lower().replace("-", "") not in ("utf8", "ascii"):
+        blob = blob.decode(encoding).encode("utf-8")
+    try:
+        state = _load_json(blob)
+    except ValueError as e:
+        print(f"⚠️ Could not read Sympla's page state: {e}")
+        return None
 
-                print(f"event_data: {event_data}")  # Debugging output
+    results = _listing_results(state)
+    if results is None:
+        return None
 
-            except Exception as err:
-                print(f"⚠️ Error parsing event card: {err}")
-                print(card.prettify())  # Useful for debugging
-        # Optional: full HTML for debug
+    cards, seen = [], set()
+    for node in results:
+        if not (isinstance(node, dict) and isinstance(node.get("name"), str)
+                and isinstance(node.get("url"), str) and node.get("start_date")):
+            continue
+        link = urljoin("https://www.sympla.com.br/", node["url"])
+        start = _sympla_datetime(node["start_date"])
+        if start and link not in seen:
+            seen.add(link)
+            cards.append({
+                "title": node["name"].strip() or "Evento sem título",
+                "location": _sympla_location(node.get("location")) or "Local não informado",
+                "image": _sympla_image(node.get("images") or node.get("image")),
+                "link": link,
+                "date_text": None,
+                "start": start,
+                "end": _sympla_datetime(node.get("end_date")) or start,
+            })
+    return cards or None
+
+
+def extract_sympla_cards(html, url=None, encoding=None):
+    """
+    Pulls the raw fields of every event on a listing page: from the search
+    results in the embedded page state when there are some, otherwise from
+    the a.sympla-card elements (card spec "sympla").
+    """
+    cards = extract_sympla_next_data(html, url, encoding)
+    if cards is not None:
+        return cards
+    return card_specs.extract("sympla", html, url, encoding)
+
+
+def normalize_sympla_card(card):
+    """Turns a raw Sympla card into an event, or None when it should be skipped."""
+    title = card["title"]
+    location = card["location"]
+    date_text = card["date_text"]
+
+    if card.get("start"):
+        # Read from the page state: the dates are already parsed.
+        start_date, end_date = card["start"], card["end"]
+        date_text = start_date.isoformat()
+    elif not date_text:
+        print("⚠️ Skipped: Missing date text")
+        return None
+    else:
+        parsed_dates = parse_sympla_date(date_text)
+        if not parsed_dates:
+            print(f"⏩ Skipped: Invalid date format '{date_text}'")
+            return None
+        start_date, end_date = parsed_dates
+    if end_date < datetime.now():
+        print(f"⏩ Skipped past event: {title} ({date_text})")
+        return None
+
+    event_data = {
+        "title": title,
+        "location": location,
+        "date": start_date.isoformat(),
+        "end_date": end_date.isoformat() if start_date != end_date else None,
+        "link": card["link"],
+        "image": card["image"],
+        "font": "Sympla",
+        "highlighted": False,
+        "category": categorize_event(title + location),
+        "UF": "ES"
+    }
+
+    # print(f"📌 {title} | 📍 {location} | 🕒 {start_date} → {end_date}")
+    # print(f"🔗 {href}")
+    # print(f"🖼️ {img_src}")
+    # print("-" * 60)
+
+    print(f"event_data: {event_data}")  # Debugging output
+    return event_data
+
+
+def sympla_page_urls(max_pages=20):
+    for page in range(1, max_pages + 1):
+        yield f"{SYMPLA_BASE_URL}?page={page}"
+
+
+def sympla_pipeline(max_pages=20):
+    """Pipeline spec (see scraper/pipeline.py); pages stop at the first empty one."""
+    return {
+        "name": "sympla",
+        "urls": sympla_page_urls(max_pages),
+        "fetch_kwargs": {"headers": SYMPLA_HEADERS, "verify": False},
+        "parse": extract_sympla_cards,
+        "normalize": normalize_sympla_card,
+        "stop_on_empty": True,
+    }
+
+
+def scrape_and_save_events_sympla(max_pages=20):
+    all_events_to_save = []
+
+    # Pages go through the crawl frontier in page order, as many at a time as the
+    # host allows; once a page comes back empty the ones after it are dropped.
+    frontier = Frontier()
+    for number, url in enumerate(sympla_page_urls(max_pages), start=1):
+        frontier.put(url, item=number, priority=number)
+
+    last_page = max_pages
+    for page in frontier.crawl(headers=SYMPLA_HEADERS, verify=False):
+        if page["item"] > last_page:
+            continue
+        if page["error"]:
+            print(f"❌ Failed to fetch {page['url']}: {page['error']}")
+            last_page = page["item"]
+            frontier.clear()
+            continue
+        print(f"\n🔄 Scraped page: {page['url']}")
+
+        with timed("parse"):
+            event_cards = extract_sympla_cards(page["content"], page["url"], page["encoding"])
 
+        if not event_cards:
+            print(f"✅ No more event cards found ({page['url']}).")
+            last_page = page["item"]
+            frontier.clear()
+            continue
 
-        page += 1
+        for card in event_cards:
+            event_data = normalize_sympla_card(card)
+            if event_data:
+                all_events_to_save.append(event_data)
 
     if all_events_to_save:
         save_events_bulk(all_events_to_save)
@@ -147,6 +284,8 @@ def scrape_and_save_events_sympla(max_pages=20):
     else:
         print("⚠️ No events to save.")
 
+    return all_events_to_save
+
 
 
 # def scrape_and_save_events_sympla_shows_e_festas(max_pages=20):
@@ -233,7 +372,7 @@ def scrape_and_save_events_sympla(max_pages=20):
 
 #             except Exception as err:
 #                 print(f"⚠️ Error parsing event card: {err}")
-#                 print(card.prettify())  # Useful for debugging
+#                 print(card)  # Useful for debugging
 #         # Optional: full HTML for debug
 
 
@@ -329,7 +468,7 @@ def scrape_and_save_events_sympla(max_pages=20):
 
 #             except Exception as err:
 #                 print(f"⚠️ Error parsing event card: {err}")
-#                 print(card.prettify())  # Useful for debugging
+#                 print(card)  # Useful for debugging
 #         # Optional: full HTML for debug
 
 
@@ -425,7 +564,7 @@ def scrape_and_save_events_sympla(max_pages=20):
 
 #             except Exception as err:
 #                 print(f"⚠️ Error parsing event card: {err}")
-#                 print(card.prettify())  # Useful for debugging
+#                 print(card)  # Useful for debugging
 #         # Optional: full HTML for debug
 
 
@@ -521,7 +660,7 @@ def scrape_and_save_events_sympla(max_pages=20):
 
 #             except Exception as err:
 #                 print(f"⚠️ Error parsing event card: {err}")
-#                 print(card.prettify())  # Useful for debugging
+#                 print(card)  # Useful for debugging
 #         # Optional: full HTML for debug
 
 
@@ -617,7 +756,7 @@ def scrape_and_save_events_sympla(max_pages=20):
 
 #             except Exception as err:
 #                 print(f"⚠️ Error parsing event card: {err}")
-#                 print(card.prettify())  # Useful for debugging
+#                 print(card)  # Useful for debugging
 #         # Optional: full HTML for debug
 
 
@@ -713,7 +852,7 @@ def scrape_and_save_events_sympla(max_pages=20):
 
 #             except Exception as err:
 #                 print(f"⚠️ Error parsing event card: {err}")
-#                 print(card.prettify())  # Useful for debugging
+#                 print(card)  # Useful for debugging
 #         # Optional: full HTML for debug
 
 
@@ -809,7 +948,7 @@ def scrape_and_save_events_sympla(max_pages=20):
 
 #             except Exception as err:
 #                 print(f"⚠️ Error parsing event card: {err}")
-#                 print(card.prettify())  # Useful for debugging
+#                 print(card)  # Useful for debugging
 #         # Optional: full HTML for debug
 
 
@@ -905,7 +1044,7 @@ def scrape_and_save_events_sympla(max_pages=20):
 
 #             except Exception as err:
 #                 print(f"⚠️ Error parsing event card: {err}")
-#                 print(card.prettify())  # Useful for debugging
+#                 print(card)  # Useful for debugging
 #         # Optional: full HTML for debug
 
 
@@ -1001,7 +1140,7 @@ def scrape_and_save_events_sympla(max_pages=20):
 
 #             except Exception as err:
 #                 print(f"⚠️ Error parsing event card: {err}")
-#                 print(card.prettify())  # Useful for debugging
+#                 print(card)  # Useful for debugging
 #         # Optional: full HTML for debug
 
 
@@ -1097,7 +1236,7 @@ def scrape_and_save_events_sympla(max_pages=20):
 
 #             except Exception as err:
 #                 print(f"⚠️ Error parsing event card: {err}")
-#                 print(card.prettify())  # Useful for debugging
+#                 print(card)  # Useful for debugging
 #         # Optional: full HTML for debug
 
 
@@ -1193,7 +1332,7 @@ def scrape_and_save_events_sympla(max_pages=20):
 
 #             except Exception as err:
 #                 print(f"⚠️ Error parsing event card: {err}")
-#                 print(card.prettify())  # Useful for debugging
+#                 print(card)  # Useful for debugging
 #         # Optional: full HTML for debug
 
 
@@ -1289,7 +1428,7 @@ def scrape_and_save_events_sympla(max_pages=20):
 
 #             except Exception as err:
 #                 print(f"⚠️ Error parsing event card: {err}")
-#                 print(card.prettify())  # Useful for debugging
+#                 print(card)  # Useful for debugging
 #         # Optional: full HTML for debug
 
 
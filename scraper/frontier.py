@@ -0,0 +1,166 @@
+import contextvars
+import heapq
+import itertools
+import queue
+import threading
+import time
+from urllib.parse import urlsplit
+
+from scraper import http_client, proxy_pool
+from scraper.config import FRONTIER_WORKERS, HTTP_POOL_PER_HOST
+from scraper.timing import add_timings
+
+# --- Crawl frontier ---
+# URLs waiting to be fetched, kept in one queue per host. get() hands out the
+# URL of whichever host may be requested soonest (scraper/rate_limit.py, through
+# any of its proxies with scraper/proxy_pool.py), so the workers keep busy on
+# the hosts that are ready instead of all sleeping on the one whose rate is used up. No host gets more than HTTP_POOL_PER_HOST
+# requests in flight. Within a host, URLs go out by priority (lower first),
+# then in the order they were added. A URL that was already added is ignored.
+#
+# Scrapers crawl through it and may add the links they find on the way:
+#
+#     frontier = Frontier()
+#     frontier.put(listing_url)
+#     for page in frontier.crawl(headers=HEADERS):
+#         soup = make_soup(page["content"], page["encoding"])
+#         for link in soup.select("a.event"):
+#             frontier.put(link["href"], item=...)
+#
+# Pages are dicts like those of scraper/async_fetch.py (url, status, content,
+# encoding, not_modified, error, seconds) plus the `item` given to put().
+#
+# scraper/pipeline.py uses the same queue (put/get/done/close) for its fetch stage.
+
+
+def _host(url):
+    return urlsplit(url).netloc
+
+
+class Frontier:
+    def __init__(self, maxsize=0, per_host=None):
+        self.maxsize = maxsize
+        self.per_host = per_host or HTTP_POOL_PER_HOST
+        self._queues = {}      # host -> heap of (priority, order, url, item)
+        self._in_flight = {}   # host -> requests handed out and not done yet
+        self._seen = set()
+        self._size = 0
+        self._order = itertools.count()
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def put(self, url, item=None, priority=0):
+        """Queue `url` (blocks while `maxsize` URLs are waiting). Returns False if it was already added."""
+        with self._cond:
+            if url in self._seen:
+                return False
+            while self.maxsize and self._size >= self.maxsize and not self._closed:
+                self._cond.wait()
+            self._seen.add(url)
+            heapq.heappush(self._queues.setdefault(_host(url), []), (priority, next(self._order), url, item))
+            self._size += 1
+            self._cond.notify_all()
+            return True
+
+    def get(self):
+        """
+        The next (url, item) to fetch, waiting until a host is ready. Returns
+        None once the frontier is closed and empty. Call done(url) after fetching.
+        """
+        with self._cond:
+            while True:
+                hosts = [host for host, waiting in self._queues.items()
+                         if waiting and self._in_flight.get(host, 0) < self.per_host]
+                if not hosts:
+                    if self._closed and not self._size:
+                        return None
+                    self._cond.wait()
+                    continue
+
+                delays = {host: proxy_pool.ready_in(self._queues[host][0][2]) for host in hosts}
+                host = min(hosts, key=lambda h: (delays[h], self._queues[h][0][:2]))
+                if delays[host] > 0:
+                    # Wake up early if a URL for another host comes in.
+                    self._cond.wait(delays[host])
+                    continue
+
+                _, _, url, item = heapq.heappop(self._queues[host])
+                self._size -= 1
+                self._in_flight[host] = self._in_flight.get(host, 0) + 1
+                self._cond.notify_all()
+                return url, item
+
+    def done(self, url):
+        with self._cond:
+            self._in_flight[_host(url)] -= 1
+            self._cond.notify_all()
+
+    def close(self):
+        """No more URLs are coming: get() returns None once the queued ones are handed out."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def clear(self):
+        """Drop every URL still waiting (the ones in flight finish normally)."""
+        with self._cond:
+            self._queues.clear()
+            self._size = 0
+            self._cond.notify_all()
+
+    def idle(self):
+        with self._cond:
+            return not self._size and not any(self._in_flight.values())
+
+    def crawl(self, workers=None, **kwargs):
+        """
+        Fetch the queued URLs, and those put() while crawling, on `workers`
+        threads (default FRONTIER_WORKERS) and yield each page (see above) as it
+        completes. Ends when nothing is left to fetch; stopping the iteration
+        early drops the URLs still waiting. Keyword arguments are those of
+        http_client.get. The time spent fetching is added to the caller's
+        "fetch" timing.
+        """
+        out = queue.Queue()
+
+        def work():
+            while True:
+                next_url = self.get()
+                if next_url is None:
+                    return
+                url, item = next_url
+                start = time.perf_counter()
+                page = {"url": url, "item": item, "status": None, "content": None, "encoding": None,
+                        "not_modified": False, "error": None}
+                try:
+                    response = http_client.get(url, **kwargs)
+                    page["status"], page["content"] = response.status_code, response.content
+                    page["encoding"], page["not_modified"] = http_client.page_encoding(response), response.not_modified
+                    if response.status_code >= 400:
+                        page["error"] = f"HTTP {response.status_code}"
+                except Exception as e:
+                    page["error"] = f"{type(e).__name__}: {e}"
+                page["seconds"] = time.perf_counter() - start
+                # Handing the page over and finishing the URL happen under the
+                # frontier's lock, so idle() never sees the URL done with its
+                # page not queued yet, or the page queued with its URL in flight.
+                with self._cond:
+                    out.put(page)
+                    self.done(url)
+
+        # Copied contexts keep the requests on the calling source's cassette.
+        threads = [threading.Thread(target=contextvars.copy_context().run, args=(work,), name="frontier", daemon=True)
+                   for _ in range(workers or FRONTIER_WORKERS)]
+        for thread in threads:
+            thread.start()
+
+        fetch_seconds = 0.0
+        try:
+            while not (self.idle() and out.empty()):
+                page = out.get()
+                fetch_seconds += page["seconds"]
+                yield page
+        finally:
+            self.clear()
+            self.close()
+            add_timings({"fetch": fetch_seconds})
@@ -0,0 +1,405 @@
+import abc
+import contextlib
+import contextvars
+import functools
+import logging
+import threading
+
+from scraper import html_stream
+from scraper.config import HTML_PARSER, HTML_PARTIAL_PARSE
+
+logger = logging.getLogger("event_scraper_log")
+
+# --- HTML parser backends ---
+# Scrapers parse a listing page, select its cards, then select a handful of
+# fields inside each card. parse() does the first step on the fastest backend
+# installed, and every backend answers the same few calls:
+#
+#     doc = html_parser.parse(html, encoding)
+#     for card in doc.select("a.sympla-card"):
+#         title_tag = card.select_one("h3")
+#         title = title_tag.text.strip() if title_tag else None
+#         link = card.get("href")
+#
+# Nodes have select(css), select_one(css), .text, get_text(separator, strip),
+# get(name, default), node[name] and .attrs, with BeautifulSoup's meaning
+# ("class" is a list, selectors only match below the node, the text of <script>
+# and <style> elements is left out of a node's text). With bs4 the
+# BeautifulSoup tree itself is returned, so code written against it keeps working.
+#
+# Backends, fastest first:
+#   selectolax  lexbor through selectolax (pip install selectolax)
+#   lxml        libxml2 with CSS compiled to XPath (pip install lxml cssselect)
+#   bs4         BeautifulSoup's html.parser, always available
+#
+# SCRAPER_HTML_PARSER picks one ("auto" takes the fastest installed).
+# Selectors beyond plain CSS (e.g. soupsieve's :contains) are bs4-only: code
+# that needs them keeps using scraper.utils.make_soup.
+#
+# Most listing pages keep what a scraper reads in one container (or in a run
+# of cards). parse(..., only="div.next-shows-inner") cuts the page down to the
+# elements matching that simple selector first (scraper/html_stream.py), so
+# the rest of the page is never tokenized or built into a tree. The elements
+# themselves are kept: selecting the container still finds it. Pages where
+# nothing matches are parsed whole.
+#
+# Code that runs the same selectors over many cards can compile them once
+# with compile(css) and call selector.select(node) / selector.select_one(node).
+#
+# Compare the backends on recorded pages with `python -m scraper.parse_bench`.
+
+BACKENDS = ("selectolax", "lxml", "bs4")
+
+
+def _installed(backend):
+    try:
+        if backend == "selectolax":
+            import selectolax.lexbor  # noqa: F401
+        elif backend == "lxml":
+            import lxml.html  # noqa: F401
+            import cssselect  # noqa: F401
+        else:
+            import bs4  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def available_backends():
+    return [backend for backend in BACKENDS if _installed(backend)]
+
+
+@functools.lru_cache(maxsize=None)
+def default_backend():
+    """The backend SCRAPER_HTML_PARSER asks for, or the fastest installed one."""
+    if HTML_PARSER in ("", "auto"):
+        return available_backends()[0]
+    if HTML_PARSER not in BACKENDS:
+        raise ValueError(f"Unknown SCRAPER_HTML_PARSER '{HTML_PARSER}' (expected auto, {', '.join(BACKENDS)})")
+    if not _installed(HTML_PARSER):
+        logger.warning(f"HTML parser '{HTML_PARSER}' is not installed, using '{available_backends()[0]}'.")
+        return available_backends()[0]
+    return HTML_PARSER
+
+
+_backend = contextvars.ContextVar("html_parser_backend", default=None)
+
+
+@contextlib.contextmanager
+def use(backend):
+    """parse() with `backend` inside the block (e.g. to compare backends)."""
+    token = _backend.set(backend)
+    try:
+        yield
+    finally:
+        _backend.reset(token)
+
+
+def current_backend():
+    return _backend.get() or default_backend()
+
+
+def parse(markup, encoding=None, backend=None, only=None):
+    """
+    Parse a page into a node (see above). Raw page bytes are decoded as
+    `encoding` (see http_client.page_encoding); text, e.g. a Selenium
+    page_source, is parsed as is. With `only`, just the elements matching
+    that simple selector are parsed (see above).
+    """
+    if only and HTML_PARTIAL_PARSE:
+        sliced = html_stream.slice_containers(markup, only)
+        if sliced is not None:
+            markup = sliced
+    backend = backend or current_backend()
+    if backend == "selectolax":
+        return _parse_selectolax(markup, encoding)
+    if backend == "lxml":
+        return _parse_lxml(markup, encoding)
+    from scraper.utils import make_soup
+    return make_soup(markup, encoding)
+
+
+def _decode(markup, encoding):
+    if isinstance(markup, bytes):
+        return markup.decode(encoding or "utf-8", errors="replace")
+    return markup
+
+
+def _join_strings(strings, separator, strip):
+    if strip:
+        strings = [string.strip() for string in strings]
+        strings = [string for string in strings if string]
+    return separator.join(strings)
+
+
+# bs4 leaves the text of these out of .text and get_text() (unless asked for
+# the element's own text).
+_RAW_TEXT_TAGS = ("script", "style")
+
+
+def _attrs(attributes):
+    attrs = {name: value if value is not None else "" for name, value in attributes.items()}
+    if "class" in attrs:
+        attrs["class"] = attrs["class"].split()
+    return attrs
+
+
+class Node(abc.ABC):
+    """The part of BeautifulSoup's Tag API the scrapers use."""
+
+    __slots__ = ("_node",)
+
+    def __init__(self, node):
+        self._node = node
+
+    @abc.abstractmethod
+    def select(self, css):
+        """Every element below this one matching `css`, as nodes."""
+
+    @abc.abstractmethod
+    def select_one(self, css):
+        """The first element below this one matching `css`, or None."""
+
+    @abc.abstractmethod
+    def _strings(self):
+        """The text nodes below this one, in document order (no script/style text)."""
+
+    @property
+    @abc.abstractmethod
+    def attrs(self):
+        """The attributes as a dict, "class" split into a list like bs4's."""
+
+    @property
+    def text(self):
+        return "".join(self._strings())
+
+    def get_text(self, separator="", strip=False):
+        return _join_strings(list(self._strings()), separator, strip)
+
+    def get(self, name, default=None):
+        return self.attrs.get(name, default)
+
+    def __getitem__(self, name):
+        value = self.get(name)
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def has_attr(self, name):
+        return self.get(name) is not None
+
+    __contains__ = has_attr
+
+
+# --- selectolax (lexbor) ---
+
+def _lexbor_strings(node):
+    if node.tag in _RAW_TEXT_TAGS or node.css_first("script, style") is None:
+        # \x00 never shows up in page text: it marks the text node boundaries.
+        return node.text(separator="\x00").split("\x00")
+    return [text.text_content for text in node.traverse(include_text=True)
+            if text.tag == "-text" and text.parent.tag not in _RAW_TEXT_TAGS]
+
+
+def _lexbor_text(node):
+    if node.tag in _RAW_TEXT_TAGS or node.css_first("script, style") is None:
+        return node.text()
+    return "".join(_lexbor_strings(node))
+
+
+class LexborNode(Node):
+    __slots__ = ()
+
+    def select(self, css):
+        # lexbor matches the node itself too; bs4 only looks below it.
+        return [LexborNode(node) for node in self._node.css(css) if node.mem_id != self._node.mem_id]
+
+    def select_one(self, css):
+        node = self._node.css_first(css)
+        if node is not None and node.mem_id == self._node.mem_id:
+            found = self.select(css)
+            return found[0] if found else None
+        return LexborNode(node) if node is not None else None
+
+    def _strings(self):
+        return _lexbor_strings(self._node)
+
+    @property
+    def text(self):
+        return _lexbor_text(self._node)
+
+    @property
+    def attrs(self):
+        return _attrs(self._node.attributes)
+
+    def get(self, name, default=None):
+        attributes = self._node.attrs
+        if name not in attributes:
+            return default
+        value = attributes[name] or ""
+        return value.split() if name == "class" else value
+
+    def __str__(self):
+        return self._node.html
+
+
+class LexborDocument(LexborNode):
+    """The whole page: unlike a node, its selectors may match the <html> element."""
+
+    __slots__ = ()
+
+    def select(self, css):
+        return [LexborNode(node) for node in self._node.css(css)]
+
+    def select_one(self, css):
+        node = self._node.css_first(css)
+        return LexborNode(node) if node is not None else None
+
+    def _strings(self):
+        root = self._node.root
+        return _lexbor_strings(root) if root is not None else []
+
+    @property
+    def text(self):
+        root = self._node.root
+        return _lexbor_text(root) if root is not None else ""
+
+    @property
+    def attrs(self):
+        return {}
+
+    def get(self, name, default=None):
+        return default
+
+
+def _parse_selectolax(markup, encoding):
+    from selectolax.lexbor import LexborHTMLParser
+    return LexborDocument(LexborHTMLParser(_decode(markup, encoding)))
+
+
+# --- lxml ---
+
+@functools.lru_cache(maxsize=1024)
+def _xpath(css):
+    """CSS compiled once into an XPath that, like bs4, only matches below the node."""
+    from cssselect import HTMLTranslator
+    from lxml import etree
+    return etree.XPath(HTMLTranslator().css_to_xpath(css, prefix="descendant::"))
+
+
+@functools.lru_cache(maxsize=1)
+def _lxml_text():
+    """The text nodes below a node, as bs4 sees them: no comments, no script or style."""
+    from lxml import etree
+    skipped = " or ".join(f"parent::{tag}" for tag in _RAW_TEXT_TAGS)
+    return etree.XPath(f"descendant::text()[not({skipped})]", smart_strings=False)
+
+
+class LxmlNode(Node):
+    __slots__ = ()
+
+    def select(self, css):
+        return [LxmlNode(element) for element in _xpath(css)(self._node)]
+
+    def select_one(self, css):
+        found = _xpath(css)(self._node)
+        return LxmlNode(found[0]) if found else None
+
+    def _strings(self):
+        if self._node.tag in _RAW_TEXT_TAGS:
+            return self._node.itertext()
+        return _lxml_text()(self._node)
+
+    @property
+    def attrs(self):
+        return _attrs(self._node.attrib)
+
+    def get(self, name, default=None):
+        value = self._node.get(name)
+        if value is None:
+            return default
+        return value.split() if name == "class" else value
+
+    def __str__(self):
+        from lxml import html
+        return html.tostring(self._node, encoding="unicode", with_tail=False)
+
+
+_lxml_parsers = threading.local()
+
+
+def _lxml_parser(encoding):
+    """lxml parsers are not shared between threads: one per thread and encoding."""
+    from lxml import html
+    parsers = _lxml_parsers.__dict__
+    if encoding not in parsers:
+        parsers[encoding] = html.HTMLParser(encoding=encoding)
+    return parsers[encoding]
+
+
+def _parse_lxml(markup, encoding):
+    from lxml import etree, html
+    if isinstance(markup, bytes):
+        parser = _lxml_parser(encoding or "utf-8")
+    else:
+        parser = _lxml_parser(None)
+        # lxml refuses text that still declares its encoding.
+        if markup.lstrip().startswith("<?xml"):
+            markup = markup.encode("utf-8")
+            parser = _lxml_parser("utf-8")
+    try:
+        root = html.document_fromstring(markup, parser=parser)
+    except etree.ParserError:  # empty document
+        root = html.document_fromstring("<html></html>")
+    return LxmlNode(root.getroottree().getroot())
+
+
+# --- Compiled selectors ---
+
+class Selector:
+    """A CSS selector, compiled once for each backend it is run on."""
+
+    __slots__ = ("css", "_xpath", "_soupsieve")
+
+    def __init__(self, css):
+        self.css = css
+        self._xpath = None
+        self._soupsieve = None
+
+    def __repr__(self):
+        return f"Selector({self.css!r})"
+
+    def select(self, node):
+        if isinstance(node, LxmlNode):
+            if self._xpath is None:
+                self._xpath = _xpath(self.css)
+            return [LxmlNode(element) for element in self._xpath(node._node)]
+        if isinstance(node, Node):
+            return node.select(self.css)  # lexbor has no compiled form
+        return self._soup_selector().select(node)
+
+    def select_one(self, node):
+        if isinstance(node, LxmlNode):
+            found = self.select(node)
+            return found[0] if found else None
+        if isinstance(node, Node):
+            return node.select_one(self.css)
+        return self._soup_selector().select_one(node)
+
+    def _soup_selector(self):
+        if self._soupsieve is None:
+            import soupsieve
+            self._soupsieve = soupsieve.compile(self.css)
+        return self._soupsieve
+
+
+def compile(css):
+    """
+    A Selector for `css`, checked right away on every installed backend so a
+    typo fails when it is compiled rather than on the first page.
+    """
+    selector = Selector(css)
+    for backend in available_backends():
+        selector.select(parse("<html></html>", backend=backend))
+    return selector
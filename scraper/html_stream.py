@@ -0,0 +1,202 @@
+import bisect
+import functools
+import re
+from html.parser import HTMLParser
+
+# --- Early cut-off ---
+# Many listing pages keep everything a scraper needs in one container element,
+# followed by footers, inline scripts and tracking markup. read_until() reads a
+# streamed response chunk by chunk, runs the chunks through an incremental
+# HTML tokenizer and stops reading as soon as the container has closed. The
+# body kept is the page up to that point, which parses just like the full page
+# as far as the container is concerned.
+#
+# Containers are given as a simple selector: a tag name and/or classes and an
+# id, e.g. "div.next-shows-inner", "section#events" or ".dsa-event-list".
+#
+# slice_containers() does the same on a page already downloaded: it cuts the
+# page down to the matching elements, so a parser only tokenizes and builds
+# the part a scraper reads (see html_parser.parse's `only`).
+
+CHUNK_SIZE = 16 * 1024
+
+_SELECTOR = re.compile(r"^([\w-]*)((?:[.#][^.#\s]+)*)$")
+
+
+def parse_selector(selector):
+    """'div.a.b#c' -> ("div", {"a", "b"}, "c"); the tag is None in '.a'."""
+    match = _SELECTOR.match(selector.strip())
+    if not match or not any(match.groups()):
+        raise ValueError(f"Unsupported container selector '{selector}' (expected tag.class or tag#id)")
+    tag, rest = match.groups()
+    classes = set(re.findall(r"\.([^.#]+)", rest))
+    ids = re.findall(r"#([^.#]+)", rest)
+    return tag.lower() or None, classes, ids[0] if ids else None
+
+
+class ContainerWatcher(HTMLParser):
+    """Tokenizes the page as it arrives and notices when the container element closes."""
+
+    def __init__(self, selector):
+        super().__init__(convert_charrefs=False)
+        self.tag, self.classes, self.id = parse_selector(selector)
+        self.depth = 0  # open container tags (nested tags of the same name count too)
+        self.closed = False
+
+    def _matches(self, attrs):
+        attrs = dict(attrs)
+        if self.id and attrs.get("id") != self.id:
+            return False
+        return self.classes <= set((attrs.get("class") or "").split())
+
+    def handle_starttag(self, tag, attrs):
+        if self.closed or (self.tag and tag != self.tag):
+            return
+        if self.depth:
+            self.depth += 1
+        elif self._matches(attrs):
+            self.tag = tag  # a selector without a tag takes the one it matched
+            self.depth = 1
+
+    def handle_startendtag(self, tag, attrs):
+        pass  # <div/> doesn't open anything
+
+    def handle_endtag(self, tag):
+        if self.depth and tag == self.tag:
+            self.depth -= 1
+            self.closed = self.depth == 0
+
+
+def read_until(response, selector):
+    """
+    Read a streamed (stream=True) 200 response until the `selector` container
+    has closed, then drop the rest of the download. Sets response.content to the
+    bytes read and response.cut_off to whether the download was stopped early.
+    Other responses are read in full.
+    """
+    response.cut_off = False
+    if response.status_code != 200:
+        response.content  # reads the body and frees the connection
+        return
+
+    watcher = ContainerWatcher(selector)
+    chunks = []
+    for chunk in response.iter_content(CHUNK_SIZE):
+        chunks.append(chunk)
+        # Tag and class names are ASCII: latin-1 keeps them intact whatever the
+        # page's charset, and never fails on a multi-byte character split
+        # between two chunks.
+        watcher.feed(chunk.decode("latin-1"))
+        if watcher.closed:
+            response.cut_off = True
+            break
+
+    response._content = b"".join(chunks)
+    response._content_consumed = True
+    if response.cut_off:
+        # The rest of the page is still on the connection: close it rather
+        # than hand it back to the pool.
+        response.raw.close()
+    response.close()
+
+
+# --- Container slices ---
+
+_ATTR = re.compile(r"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+_OPEN_TAG = re.compile(r"<([a-zA-Z][\w-]*)([^>]*)>")
+_RAW_TEXT = re.compile(r"<(?:(script|style)(?=[\s>])|!--)", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=256)
+def _boundaries(tag):
+    """Opening and closing tags named `tag`."""
+    return re.compile(rf"<(/?){re.escape(tag)}(?=[\s>/])", re.IGNORECASE)
+
+
+def _attributes(text):
+    return {match.group(1).lower(): next(value for value in match.groups()[1:] if value is not None)
+            for match in _ATTR.finditer(text)}
+
+
+def _raw_text_spans(text):
+    """(start, end) of every script, style and comment: tags in there are not tags."""
+    spans = []
+    position = 0
+    while True:
+        match = _RAW_TEXT.search(text, position)
+        if not match:
+            return spans
+        if match.group(1):
+            closing = re.compile(rf"</{match.group(1)}\s*>", re.IGNORECASE).search(text, match.end())
+            end = closing.end() if closing else len(text)
+        else:
+            end = text.find("-->", match.end())
+            end = end + 3 if end != -1 else len(text)
+        spans.append((match.start(), end))
+        position = end
+
+
+def _word_start(text, position):
+    return position == 0 or not (text[position - 1].isalnum() or text[position - 1] in "-_")
+
+
+def slice_containers(markup, selector):
+    """
+    The part of `markup` (bytes or text) from the first element matching the
+    simple `selector` to the end of the last one, or None when none matches.
+    Whatever sits between two matches (e.g. between cards) is kept.
+
+    Tags are found by scanning, not parsing: only scripts, styles and comments
+    are skipped, so badly nested markup may end the slice early or late.
+    """
+    tag, classes, id_ = parse_selector(selector)
+    # latin-1 maps every byte to one character: offsets into `text` are byte offsets.
+    text = markup.decode("latin-1") if isinstance(markup, bytes) else markup
+    raw = _raw_text_spans(text)
+    raw_starts = [start for start, _ in raw]
+
+    def in_raw_text(position):
+        index = bisect.bisect_right(raw_starts, position) - 1
+        return index >= 0 and position < raw[index][1]
+
+    def opening_tag(start):
+        """The matching element's opening tag at `start`, or None."""
+        if start == -1 or in_raw_text(start):
+            return None
+        opening = _OPEN_TAG.match(text, start)
+        if not opening or (tag and opening.group(1).lower() != tag):
+            return None
+        attrs = _attributes(opening.group(2))
+        if (id_ and attrs.get("id") != id_) or not classes <= set(attrs.get("class", "").split()):
+            return None
+        return opening
+
+    def element_end(opening):
+        """Walk the tags of the same name until the element closes."""
+        depth = 1
+        for boundary in _boundaries(opening.group(1).lower()).finditer(text, opening.end()):
+            if in_raw_text(boundary.start()):
+                continue
+            depth += -1 if boundary.group(1) else 1
+            if not depth:
+                close = text.find(">", boundary.end())
+                return close + 1 if close != -1 else len(text)
+        return len(text)
+
+    # Candidate opening tags: found through the id or a class when there is
+    # one (the regex engine jumps straight to a literal), otherwise by the tag name.
+    key = id_ or min(classes, key=len, default=None)
+    if key:
+        hits = [text.rfind("<", 0, match.start())
+                for match in re.finditer(rf"{re.escape(key)}(?![\w-])", text) if _word_start(text, match.start())]
+    else:
+        hits = [match.start() for match in _boundaries(tag).finditer(text) if not match.group(1)]
+
+    first = next((opening for opening in map(opening_tag, hits) if opening), None)
+    if first is None:
+        return None
+    last = next(opening for opening in map(opening_tag, reversed(hits)) if opening)
+    end = element_end(first)
+    if last.start() >= end:
+        end = element_end(last)
+    return markup[first.start():end]
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import threading
+import time
+
+from scraper.config import HTTP_CACHE_DIR, HTTP_CACHE_MAX_MB, HTTP_CACHE_TTL
+from scraper.utils import load_json_state, save_json_state
+
+# --- HTTP response cache ---
+# One entry per URL in HTTP_CACHE_DIR: <key>.body holds the page bytes and
+# <key>.json its metadata (url, etag, last_modified, encoding, headers, stored_at).
+# The metadata file is written last, so an entry without it is just ignored.
+#
+# A page is stored as pending when it is fetched and confirmed once its events
+# are saved (http_client.page_saved). Pending entries are ignored by lookup(),
+# so a page whose parse or save failed, or whose run died, is fetched and
+# processed in full next time instead of coming back as not modified.
+# Used by scraper/http_client.py; scrapers don't call this module directly.
+
+# Response headers kept with the body, so a cached page can stand in for a fresh one.
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Date")
+
+_evict_lock = threading.Lock()
+
+
+def _paths(url):
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    base = os.path.join(HTTP_CACHE_DIR, key)
+    return base + ".json", base + ".body"
+
+
+def lookup(url):
+    """The cached (meta, body) for `url`, or None."""
+    meta_path, body_path = _paths(url)
+    meta = load_json_state(meta_path)
+    if not meta or meta.get("url") != url or meta.get("pending"):
+        return None
+    try:
+        with open(body_path, "rb") as body_file:
+            body = body_file.read()
+    except FileNotFoundError:
+        return None
+    return meta, body
+
+
+def has_validators(meta):
+    return bool(meta.get("etag") or meta.get("last_modified"))
+
+
+def is_fresh(meta):
+    """Entries without validators can't be revalidated; they are reused until their TTL runs out."""
+    return not has_validators(meta) and time.time() - meta["stored_at"] < HTTP_CACHE_TTL
+
+
+def conditional_headers(meta):
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+def store(url, response, pending=False):
+    """Cache a 200 response (unless the server said no-store); a pending one is used once confirm()ed."""
+    if response.status_code != 200 or "no-store" in response.headers.get("Cache-Control", ""):
+        return
+    meta_path, body_path = _paths(url)
+    os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+
+    tmp_path = f"{body_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as body_file:
+        body_file.write(response.content)
+    os.replace(tmp_path, body_path)
+
+    save_json_state(meta_path, {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "encoding": response.encoding,
+        "headers": {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+        "stored_at": time.time(),
+        "size": len(response.content),
+        "pending": pending,
+    })
+    _evict()
+
+
+def confirm(url):
+    """Make a pending entry usable: its page has been processed."""
+    meta_path, _ = _paths(url)
+    meta = load_json_state(meta_path)
+    if meta and meta.get("url") == url and meta.get("pending"):
+        meta["pending"] = False
+        save_json_state(meta_path, meta)
+
+
+def touch(url):
+    """Mark an entry as just used (eviction drops the least recently used first)."""
+    meta_path, body_path = _paths(url)
+    for path in (meta_path, body_path):
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+
+def _evict():
+    """Remove the least recently used entries until the cache fits in HTTP_CACHE_MAX_MB."""
+    limit = HTTP_CACHE_MAX_MB * 1024 * 1024
+    with _evict_lock:
+        entries = []
+        total = 0
+        for file_name in os.listdir(HTTP_CACHE_DIR):
+            if not file_name.endswith(".body"):
+                continue
+            path = os.path.join(HTTP_CACHE_DIR, file_name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        for _, size, body_path in sorted(entries):
+            if total <= limit:
+                break
+            for path in (body_path[:-len(".body")] + ".json", body_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total -= size
@@ -0,0 +1,255 @@
+import random
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from scraper import cassette, circuit_breaker, html_stream, http_cache, proxy_pool, rate_limit
+from scraper.config import (
+    HTTP_BACKOFF,
+    HTTP_BACKOFF_MAX,
+    HTTP_CACHE,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_EARLY_CUTOFF,
+    HTTP_POOL_HOSTS,
+    HTTP_POOL_PER_HOST,
+    HTTP_READ_TIMEOUT,
+    HTTP_RETRIES,
+    HTTP_USER_AGENT,
+)
+from scraper.timing import timed
+
+# --- Shared HTTP client ---
+# Every requests-based scraper fetches through get() below instead of calling
+# requests.get directly. All of them share one Session, so connections (and TLS
+# handshakes) are kept alive and reused across pages and sources, and every
+# request gets a timeout and the common headers.
+#
+# The pool keeps connections to HTTP_POOL_HOSTS hosts, at most HTTP_POOL_PER_HOST
+# per host; a thread that needs another connection to a busy host waits for
+# one to be free instead of opening more.
+#
+# Failed GETs (network errors, 429, 5xx) are retried with exponential backoff
+# and jitter, and hosts that keep failing are cut off for a while by
+# scraper/circuit_breaker.py.
+#
+# With SCRAPER_HTTP_PROXIES set, each attempt goes out through a proxy picked by
+# scraper/proxy_pool.py; a proxy error or a 403/407 then is retried too, as another proxy may
+# get through.
+#
+# With cache=True the page goes through the disk cache (scraper/http_cache.py).
+# Every response then has a `not_modified` attribute: True when the server
+# answered 304 (or the cached copy is still within its TTL). The response still
+# carries the cached body, but a scraper can skip parsing and saving the page.
+# A freshly downloaded page is only cached for good once the scraper calls
+# page_saved(url) after saving its events: until then the next run gets the
+# full page again, so events lost to a failed parse or write are not skipped.
+#
+# With until="div.some-class" the body is streamed and the download stops once
+# that element has closed (scraper/html_stream.py); response.content then holds
+# the page up to there. The cut-off connection is closed, not reused.
+#
+# Scrapers hand the raw body (response.content) to the parser together with
+# page_encoding(response) instead of using response.text: when the server names
+# no charset, response.text runs charset detection over the whole body first.
+#
+# In cassette mode (scraper/cassette.py) every response is recorded, or served
+# from the recording without any network access; the disk cache is bypassed.
+
+DEFAULT_HEADERS = {
+    "User-Agent": HTTP_USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7",
+}
+
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+# Answers worth trying again: throttling and server-side trouble.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Where pages name their charset: <meta charset="..."> or the http-equiv form.
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)""", re.IGNORECASE)
+_HEADER_CHARSET = re.compile(r"""charset\s*=\s*["']?([\w.:-]+)""", re.IGNORECASE)
+
+# How far into the body to look for the <meta> tag (it belongs in the <head>).
+_SNIFF_BYTES = 4096
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """The shared Session, created on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_PER_HOST,
+                                      pool_block=True)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update(DEFAULT_HEADERS)
+                _session = session
+    return _session
+
+
+def _from_cache(url, meta, body):
+    """A 200 response built from a cache entry, flagged as not modified."""
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = body
+    response.encoding = meta.get("encoding")
+    response.headers = CaseInsensitiveDict(meta.get("headers", {}))
+    response.not_modified = True
+    return response
+
+
+def encoding_from(content_type, body):
+    """
+    The charset named by a Content-Type header or, failing that, by a <meta>
+    tag near the top of `body`. UTF-8 when neither names one; nothing is
+    guessed from the body's bytes.
+    """
+    match = _HEADER_CHARSET.search(content_type or "")
+    if match:
+        return match.group(1)
+    match = _META_CHARSET.search(body[:_SNIFF_BYTES])
+    return match.group(1).decode("ascii") if match else "utf-8"
+
+
+def page_encoding(response):
+    """The encoding to decode response.content with (see encoding_from)."""
+    return encoding_from(response.headers.get("Content-Type"), response.content)
+
+
+def retry_delay(attempt, retry_after=None):
+    """Seconds before retry number `attempt` (0-based): exponential backoff with jitter."""
+    delay = min(HTTP_BACKOFF_MAX, HTTP_BACKOFF * 2 ** attempt)
+    return max(random.uniform(delay / 2, delay), retry_after or 0)
+
+
+def _send(url, kwargs):
+    """
+    GET on the shared session, paced by the host's rate limiter and retried
+    on network errors and RETRY_STATUSES. Raises CircuitOpenError without
+    sending anything if the host's circuit is open.
+    """
+    circuit_breaker.check(url)
+    try:
+        return _send_attempts(url, kwargs)
+    finally:
+        circuit_breaker.release(url)
+
+
+def _send_attempts(url, kwargs):
+    proxy = None
+    for attempt in range(HTTP_RETRIES + 1):
+        proxy = proxy_pool.choose(url, avoid=proxy)
+        via = proxy_pool.label(proxy) if proxy else None
+        rate_limit.wait(url, via)
+        start = time.perf_counter()
+        error = response = None
+        try:
+            response = get_session().get(url, proxies=proxy_pool.requests_proxies(proxy), **kwargs)
+        except requests.RequestException as e:
+            rate_limit.record(url, error=True, via=via)
+            if isinstance(e, requests.exceptions.ProxyError):
+                proxy_pool.record(proxy, error=True)
+            error = e
+        else:
+            seconds = time.perf_counter() - start
+            rate_limit.record(url, response.status_code, seconds, response.headers, via=via)
+            proxy_pool.record(proxy, seconds, response.status_code)
+            retry_statuses = RETRY_STATUSES | proxy_pool.PROXY_ERROR_STATUSES if proxy else RETRY_STATUSES
+            if response.status_code not in retry_statuses:
+                circuit_breaker.record(url, ok=True)
+                return response
+
+        if attempt < HTTP_RETRIES:
+            if response is not None:
+                response.close()  # frees the connection of a streamed response
+            retry_after = rate_limit.parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+            delay = retry_delay(attempt, retry_after)
+            print(f"🔁 Retrying {url} in {delay:.1f}s ({error or f'HTTP {response.status_code}'})")
+            time.sleep(delay)
+
+    # 429 (or a proxy being turned away) means the host is up: only 5xx and
+    # errors reaching it count against it.
+    if response is not None:
+        host_failed = response.status_code >= 500
+    else:
+        host_failed = not isinstance(error, requests.exceptions.ProxyError)
+    if host_failed:
+        circuit_breaker.record(url, ok=False)
+    if error:
+        raise error
+    return response
+
+
+def get(url, cache=False, until=None, **kwargs):
+    """
+    requests.get through the shared pool. Takes the same arguments; headers are
+    merged over DEFAULT_HEADERS and `timeout` defaults to DEFAULT_TIMEOUT.
+    Waits for the host's rate limit (scraper/rate_limit.py) before sending and
+    retries transient failures (see above); the last response is returned,
+    whatever its status.
+    The time spent, waiting included, is added to the source's "fetch" timing
+    (scraper/timing.py).
+
+    cache=True revalidates against the disk cache, and until="tag.class" stops
+    the download once that element is complete (see above).
+    """
+    if cassette.replaying():
+        return cassette.replay_response(url, kwargs.get("params"))
+    response = _get(url, cache and HTTP_CACHE and not cassette.recording(),
+                    until if HTTP_EARLY_CUTOFF else None, kwargs)
+    if cassette.recording():
+        cassette.record_response(url, kwargs.get("params"), response)
+    return response
+
+
+def _get(url, cache, until, kwargs):
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    if until:
+        kwargs["stream"] = True
+
+    cached = http_cache.lookup(url) if cache else None
+    if cached and http_cache.is_fresh(cached[0]):
+        http_cache.touch(url)
+        return _from_cache(url, *cached)
+    if cached:
+        kwargs["headers"] = {**kwargs.get("headers", {}), **http_cache.conditional_headers(cached[0])}
+
+    with timed("fetch"):
+        response = _send(url, kwargs)
+        if until:
+            html_stream.read_until(response, until)
+    response.not_modified = False
+
+    if cached and response.status_code == 304:
+        http_cache.touch(url)
+        return _from_cache(url, *cached)
+    if cache and response.ok:
+        try:
+            http_cache.store(url, response, pending=True)
+        except OSError as e:
+            print(f"⚠️ Could not cache {url}: {e}")
+    return response
+
+
+def page_saved(url):
+    """
+    The events of the page fetched from `url` with cache=True are saved: its
+    cached copy may now answer "not modified" (see above).
+    """
+    if not HTTP_CACHE:
+        return
+    try:
+        http_cache.confirm(url)
+    except OSError as e:
+        print(f"⚠️ Could not cache {url}: {e}")
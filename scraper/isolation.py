@@ -0,0 +1,165 @@
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+from scraper.config import BROWSER_PROCESSES, SOURCE_TIMEOUT
+
+logger = logging.getLogger("event_scraper_log")
+
+# "spawn" gives every child a fresh interpreter: no inherited Mongo client,
+# threads or browser handles, and all of its memory goes back to the OS on exit.
+_context = multiprocessing.get_context("spawn")
+
+# Caps how many browser children run at once (each one starts its own Chrome).
+_browser_slots = threading.BoundedSemaphore(BROWSER_PROCESSES)
+
+# Time a child gets to exit on its own after sending its result.
+_EXIT_GRACE_SECONDS = 10
+
+
+def _child_main(name, conn):
+    """
+    Entry point of the child process: runs one source with Mongo writes
+    redirected to the parent. Every save_events_bulk call is sent up the pipe
+    right away, so events saved before a kill are not lost, and returns once
+    the parent says they are written (raising if they aren't), so a scraper
+    that checkpoints a page after saving it never gets ahead of the database.
+    """
+    if hasattr(os, "setpgrp"):
+        # Own process group, so a kill also takes down Chrome and chromedriver.
+        os.setpgrp()
+
+    from database.db_operations import set_event_sink
+    from scraper import cassette
+    from scraper.sources import load_source
+    from scraper.timing import get_timings, reset_timings
+
+    def save_in_parent(events):
+        conn.send(("events", events))
+        try:
+            kind, error = conn.recv()
+        except EOFError:
+            raise RuntimeError("parent process went away before saving the events") from None
+        if kind != "saved":
+            raise RuntimeError(f"parent process could not save the events: {error}")
+
+    set_event_sink(save_in_parent)
+    reset_timings()
+    try:
+        try:
+            with cassette.use(name):
+                load_source(name)()
+            status = ("ok", None)
+        except Exception as e:
+            status = ("error", f"{type(e).__name__}: {e}")
+        conn.send(("timings", get_timings()))
+        conn.send(status)
+    finally:
+        conn.close()
+
+
+def _kill(process):
+    """Kill the child and everything it started."""
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    process.kill()
+    process.join()
+
+
+def run_isolated(name, timeout=None):
+    """
+    Runs a source in a short-lived child process and saves its events from here.
+
+    The child is killed (with its browser) if it hasn't finished within
+    `timeout` seconds, counted from the call (so including the wait for a
+    browser slot); events it sent before that are still saved. Raises
+    TimeoutError or RuntimeError so the runner records the failure like any
+    other source error.
+
+    Returns:
+        list[dict]: The events the source produced.
+    """
+    from database.db_operations import save_events_bulk
+    from scraper.timing import add_timings
+
+    timeout = timeout or SOURCE_TIMEOUT
+    events = []
+    save_errors = []
+
+    def save(batch):
+        if batch:
+            save_events_bulk(batch)
+            events.extend(batch)
+
+    def drain(receiver):
+        """Save whatever the child sent before it died."""
+        while receiver.poll(0):
+            try:
+                kind, payload = receiver.recv()
+            except EOFError:
+                return
+            if kind == "events":
+                try:
+                    save(payload)
+                except Exception as e:
+                    save_errors.append(f"{type(e).__name__}: {e}")
+
+    # The wait for a browser slot counts against the timeout, as it does in
+    # the runner: the child only gets what is left of it.
+    deadline = time.monotonic() + timeout
+    if not _browser_slots.acquire(timeout=timeout):
+        raise TimeoutError(f"Source '{name}' got no browser slot within {timeout}s")
+    try:
+        # Duplex: the child waits for each batch of events to be acknowledged.
+        receiver, sender = _context.Pipe()
+        process = _context.Process(target=_child_main, args=(name, sender), name=f"source-{name}", daemon=True)
+        process.start()
+        sender.close()
+
+        status = error = None
+        try:
+            while status is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not receiver.poll(remaining):
+                    _kill(process)
+                    drain(receiver)
+                    raise TimeoutError(f"Source '{name}' killed after {timeout}s")
+                try:
+                    kind, payload = receiver.recv()
+                except EOFError:
+                    _kill(process)
+                    raise RuntimeError(f"Source '{name}' exited with code {process.exitcode} without a result") from None
+                if kind == "events":
+                    try:
+                        save(payload)
+                    except Exception as e:
+                        save_errors.append(f"{type(e).__name__}: {e}")
+                        receiver.send(("failed", save_errors[-1]))
+                    else:
+                        receiver.send(("saved", None))
+                elif kind == "timings":
+                    add_timings(payload)
+                else:
+                    status, error = kind, payload
+        finally:
+            receiver.close()
+
+        process.join(_EXIT_GRACE_SECONDS)
+        if process.is_alive():
+            logger.warning(f"Source '{name}' did not exit after sending its result, killing it.")
+        # Also sweeps any browser the scraper forgot to quit.
+        _kill(process)
+    finally:
+        _browser_slots.release()
+
+    if status != "ok":
+        raise RuntimeError(f"Source '{name}' failed in child process: {error}")
+    if save_errors:
+        raise RuntimeError(f"Could not save the events of source '{name}': {save_errors[0]}")
+    return events
@@ -0,0 +1,118 @@
+import argparse
+import time
+
+from scraper import cassette, html_parser, http_client, parse_pool, sources
+
+# --- Parser benchmark ---
+# Times each HTML parser backend (scraper/html_parser.py) on the pages recorded
+# in the sources' cassettes (scraper/cassette.py), running the source's own card
+# extraction, so the numbers are parse + select for real pages:
+#
+#     python -m scraper.cli sympla mapa --record -n   # record the pages once
+#     python -m scraper.parse_bench sympla mapa
+#     python -m scraper.parse_bench sympla --repeat 20 --backend lxml --backend bs4
+#
+# With --processes, the recorded pages of all the sources are parsed and
+# normalized together, once in this process and once on the parse processes
+# (scraper/parse_pool.py, SCRAPER_PARSE_PROCESSES workers), to compare the two:
+#
+#     SCRAPER_PARSE_PROCESSES=4 python -m scraper.parse_bench sympla 'lebillet:*' mapa --processes
+#
+# Only sources with a page parser (a pipeline spec or a "parser" entry in
+# scraper/sources.py) can be benchmarked.
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m scraper.parse_bench",
+                                     description="Compare HTML parser backends on recorded pages.")
+    parser.add_argument("sources", nargs="+", help="source names or patterns such as 'lebillet:*'")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="times each page is parsed per backend")
+    parser.add_argument("-b", "--backend", action="append", choices=html_parser.BACKENDS,
+                        help="backend to time (default: every installed one)")
+    parser.add_argument("-p", "--processes", action="store_true",
+                        help="compare parsing in this process with the parse processes")
+    return parser.parse_args(argv)
+
+
+def recorded_pages(name):
+    """(url, body, encoding) of the source's recorded pages, with a warning when there are none."""
+    pages = [(url, body, http_client.encoding_from(content_type, body) if isinstance(body, bytes) else None)
+             for url, body, content_type in cassette.recorded_pages(name)]
+    if not pages:
+        print(f"⚠️ No recorded pages for {name} (record them with `python -m scraper.cli {name} --record -n`).")
+    return pages
+
+
+def bench_source(name, backends, repeat):
+    """{backend: (milliseconds per page, cards found)} for one source's recorded pages."""
+    extract = sources.load_parser(name)
+    if extract is None:
+        print(f"⚠️ {name} has no page parser to benchmark.")
+        return {}
+    pages = recorded_pages(name)
+    if not pages:
+        return {}
+
+    results = {}
+    for backend in backends:
+        with html_parser.use(backend):
+            cards = sum(len(extract(body, url, encoding)) for url, body, encoding in pages)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for url, body, encoding in pages:
+                    extract(body, url, encoding)
+            elapsed = time.perf_counter() - start
+        results[backend] = (elapsed * 1000 / (repeat * len(pages)), cards)
+    print(f"📄 {name}: {len(pages)} pages")
+    return results
+
+
+def bench_processes(names, repeat):
+    """Seconds to parse and normalize every page of `names` (`repeat` times) here, then on the parse processes."""
+    pages = [(name, *page) for name in names if parse_pool.can_parse(name) for page in recorded_pages(name)]
+    if not pages:
+        raise SystemExit("No recorded pages of sources with a page parser and a normalizer.")
+    pages *= repeat
+    print(f"📄 {len(pages) // repeat} pages x {repeat}, {sum(len(page[2]) for page in pages) // 1024} KB")
+
+    start = time.perf_counter()
+    for page in pages:
+        parse_pool.parse_page(*page)
+    here = time.perf_counter() - start
+
+    parse_pool.submit([]).result()  # start the processes before timing them
+    start = time.perf_counter()
+    events = sum(len(result["events"]) for _, result in parse_pool.parse_pages(pages))
+    pooled = time.perf_counter() - start
+    parse_pool.shutdown()
+
+    print(f"\n{'in this process':<28} {here:>8.2f}s")
+    print(f"{f'{parse_pool.PARSE_PROCESSES} parse processes':<28} {pooled:>8.2f}s  ({events} events)")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.processes:
+        if not parse_pool.enabled():
+            raise SystemExit("Set SCRAPER_PARSE_PROCESSES to the number of parse processes to compare.")
+        bench_processes(sources.select_sources(args.sources), args.repeat)
+        return
+    backends = args.backend or html_parser.available_backends()
+    missing = [backend for backend in backends if backend not in html_parser.available_backends()]
+    if missing:
+        raise SystemExit(f"Not installed: {', '.join(missing)}")
+
+    rows = []
+    for name in sources.select_sources(args.sources):
+        for backend, (ms, cards) in bench_source(name, backends, args.repeat).items():
+            rows.append((name, backend, ms, cards))
+
+    header = f"{'source':<28} {'backend':<12} {'ms/page':>9} {'cards':>7}"
+    print("\n" + header)
+    print("-" * len(header))
+    for name, backend, ms, cards in rows:
+        print(f"{name:<28} {backend:<12} {ms:>9.2f} {cards:>7}")
+
+
+if __name__ == "__main__":
+    main()
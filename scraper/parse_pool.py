@@ -0,0 +1,162 @@
+import concurrent.futures
+import logging
+import multiprocessing
+import threading
+import time
+
+from scraper.config import PARSE_BATCH_KB, PARSE_PROCESSES
+
+logger = logging.getLogger("event_scraper_log")
+
+# --- Parse processes ---
+# Building a page's tree, walking its cards and categorizing every event is
+# pure Python and holds the GIL, so parse threads take turns on one core. With
+# SCRAPER_PARSE_PROCESSES set, pages are parsed and normalized in a pool of
+# worker processes instead: the raw page bytes and the source's name go in,
+# the events (and the number of cards) come back.
+#
+#     for (source, url), result in parse_pool.parse_pages(pages):
+#         ...  # pages: (source, url, body, encoding); result: see parse_page
+#
+# A worker finds the source's parse and normalize functions through the
+# registry (scraper/sources.py), so only registered sources with both can be
+# sent. Each task carries a batch of pages of about PARSE_BATCH_KB, so the
+# cost of a trip between processes is paid per batch rather than per page;
+# a page bigger than that (Mapa Cultural's) goes on its own.
+#
+# scraper/pipeline.py sends its pages here when the pool is enabled.
+
+# Fresh interpreters, as in scraper/isolation.py: nothing inherited from the
+# parent's threads or connections.
+_context = multiprocessing.get_context("spawn")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def enabled():
+    return PARSE_PROCESSES > 0
+
+
+def executor():
+    """The shared process pool (started on first use, PARSE_PROCESSES workers)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=max(PARSE_PROCESSES, 1), mp_context=_context)
+        return _executor
+
+
+def shutdown():
+    """Stop the worker processes (a later submit starts new ones)."""
+    global _executor
+    with _executor_lock:
+        pool, _executor = _executor, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def can_parse(source):
+    """True if `source` is registered with both a page parser and a normalizer."""
+    from scraper import sources
+    return source in sources.SOURCES and _handlers(source) is not None
+
+
+# --- In the worker processes ---
+
+_loaded = {}
+
+
+def _handlers(source):
+    """(parse, normalize) of a source, loaded once per process; None if it lacks either."""
+    if source not in _loaded:
+        from scraper import sources
+        parse, normalize = sources.load_parser(source), sources.load_normalizer(source)
+        _loaded[source] = (parse, normalize) if parse and normalize else None
+    return _loaded[source]
+
+
+def parse_page(source, url, body, encoding):
+    """
+    One page's result: a dict with the number of raw cards, the events they
+    normalized to, the seconds it took and the error that stopped it (or None).
+    """
+    start = time.perf_counter()
+    result = {"cards": 0, "events": [], "seconds": 0.0, "error": None}
+    try:
+        handlers = _handlers(source)
+        if handlers is None:
+            raise ValueError(f"{source} has no page parser and normalizer to run in a parse process")
+        parse, normalize = handlers
+        cards = parse(body, url, encoding)
+        result["cards"] = len(cards)
+        for card in cards:
+            try:
+                event = normalize(card)
+            except Exception as e:
+                print(f"⚠️ [{source}] normalize error: {e}")
+                continue
+            if event:
+                result["events"].append(event)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def _parse_batch(batch):
+    """Entry point of a task: the result of every (source, url, body, encoding) in the batch."""
+    return [parse_page(*page) for page in batch]
+
+
+# --- In the calling process ---
+
+def submit(batch):
+    """Send a batch of (source, url, body, encoding) pages; the future gives one result per page."""
+    return executor().submit(_parse_batch, list(batch))
+
+
+def batches(pages, batch_kb=None):
+    """Group pages into lists of about `batch_kb` (default PARSE_BATCH_KB) kilobytes of page bytes."""
+    limit = (batch_kb or PARSE_BATCH_KB) * 1024
+    batch, size = [], 0
+    for page in pages:
+        batch.append(page)
+        size += len(page[2] or b"")
+        if size >= limit:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+
+def parse_pages(pages, batch_kb=None):
+    """
+    Parse and normalize (source, url, body, encoding) pages in the worker
+    processes and yield ((source, url), result) as batches complete (see
+    parse_page for the result). At most two batches per process are in
+    flight, so a long generator of pages isn't read all at once.
+    """
+    in_flight = {}
+    limit = 2 * max(PARSE_PROCESSES, 1)
+
+    def finished(futures):
+        for future in futures:
+            batch = in_flight.pop(future)
+            try:
+                results = future.result()
+            except Exception as e:  # e.g. a worker process died
+                error = f"{type(e).__name__}: {e}"
+                results = [{"cards": 0, "events": [], "seconds": 0.0, "error": error} for _ in batch]
+            for (source, url, _, _), result in zip(batch, results):
+                yield (source, url), result
+
+    for batch in batches(pages, batch_kb):
+        if len(in_flight) >= limit:
+            done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+            yield from finished(done)
+        in_flight[submit(batch)] = batch
+    while in_flight:
+        done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+        yield from finished(done)
@@ -0,0 +1,430 @@
+import contextvars
+import logging
+import queue
+import threading
+import time
+
+from database.db_operations import add_write_stats, get_write_stats, reset_write_stats, save_events_bulk
+from scraper import http_client, parse_pool
+from scraper.frontier import Frontier
+from scraper.config import (
+    PIPELINE_BATCH_SIZE,
+    PIPELINE_FETCH_WORKERS,
+    PIPELINE_NORMALIZE_WORKERS,
+    PIPELINE_PARSE_WORKERS,
+    PIPELINE_PERSIST_WORKERS,
+    PIPELINE_PREFETCH,
+    PIPELINE_QUEUE_SIZE,
+    PARSE_BATCH_KB,
+    PARSE_BATCH_WAIT,
+    PARSE_PROCESSES,
+)
+from scraper.timing import add_timings
+
+logger = logging.getLogger("event_scraper_log")
+
+# --- Staged scraping pipeline ---
+# fetch -> parse -> normalize -> persist, each stage with its own worker threads,
+# connected by bounded queues. While one page is being downloaded another can be
+# parsed and a batch of events written, and a slow stage makes the ones before
+# it wait (backpressure) instead of piling pages up in memory.
+#
+# The fetch stage takes its URLs from a crawl frontier (scraper/frontier.py):
+# with several specs in one run the fetchers go to whichever host may be
+# requested next instead of queueing up behind one slow or throttled site.
+#
+# A source takes part by describing itself with a pipeline spec (a dict):
+#   name:          source name, used in logs and results
+#   urls:          iterable of page URLs to fetch (may be a generator)
+#   fetch_kwargs:  extra keyword arguments for http_client.get (headers, verify, timeout...)
+#   parse:         parse(html, url, encoding) -> list of raw cards (dicts); html is the
+#                  raw page bytes and encoding the charset to decode them with
+#                  (see http_client.page_encoding)
+#   normalize:     normalize(card) -> event dict, or None to drop the card
+#   stop_on_empty: stop queuing URLs once a page has no cards (paginated listings);
+#                  such a spec only has PIPELINE_PREFETCH pages queued or in flight
+#                  whose cards aren't known yet, so it stops close to the empty page
+#   skip_urls:     optional, URLs already done in an interrupted run (scraper/checkpoint.py)
+#   on_page_done:  optional, on_page_done(url) once every event of that page is saved
+#
+# A page counts as done once every event it produced is saved (or it had none);
+# only then is its copy in the HTTP cache confirmed (http_client.page_saved),
+# so a page whose events were not all written is processed again next run.
+#
+# With SCRAPER_PARSE_PROCESSES set, one thread takes the place of the parse
+# workers: it batches the fetched pages and sends them to the parse processes
+# (scraper/parse_pool.py), which parse and normalize them, and hands the events
+# straight to the persist stage. Only specs named after a registered source can
+# be parsed there (the processes look the functions up by name); the pages of
+# other specs are parsed on that thread as usual.
+
+_DONE = object()
+
+
+def _bump(job, key, amount=1):
+    with job["lock"]:
+        job[key] += amount
+
+
+def _settle(job):
+    """One of the job's pages has been parsed (or won't be): the feed may queue another."""
+    with job["settled"]:
+        job["ahead"] -= 1
+        job["settled"].notify_all()
+
+
+def _fetch(job, url):
+    spec = job["spec"]
+    start = time.perf_counter()
+    try:
+        response = http_client.get(url, **spec.get("fetch_kwargs", {}))
+        response.raise_for_status()
+    except Exception as e:
+        _bump(job, "fetch_seconds", time.perf_counter() - start)
+        print(f"❌ [{spec['name']}] Failed to fetch {url}: {e}")
+        _bump(job, "errors")
+        if spec.get("stop_on_empty"):
+            job["exhausted"] = True
+        _settle(job)
+        return
+    _bump(job, "fetch_seconds", time.perf_counter() - start)
+    _bump(job, "pages")
+    if response.not_modified:
+        # Same page as last run (HTTP cache): nothing new to parse or save.
+        _bump(job, "unchanged")
+        _settle(job)
+        return
+    yield url, response.content, http_client.page_encoding(response)
+
+
+def _page_progress(job, url, amount=1):
+    """Count down a page's unsaved cards; report the page done when none are left."""
+    with job["lock"]:
+        job["unsaved"][url] -= amount
+        page_done = job["unsaved"][url] == 0
+    if page_done:
+        _page_done(job, url)
+
+
+def _page_done(job, url):
+    if job["spec"].get("fetch_kwargs", {}).get("cache"):
+        http_client.page_saved(url)
+    if job["spec"].get("on_page_done"):
+        job["spec"]["on_page_done"](url)
+
+
+def _parse(job, page):
+    url, html, encoding = page
+    start = time.perf_counter()
+    cards = None
+    try:
+        cards = job["spec"]["parse"](html, url, encoding)
+    finally:
+        _bump(job, "parse_seconds", time.perf_counter() - start)
+        if cards is not None and not cards and job["spec"].get("stop_on_empty"):
+            job["exhausted"] = True
+        _settle(job)
+    _bump(job, "cards", len(cards))
+    with job["lock"]:
+        job["unsaved"][url] = len(cards)
+    if not cards:
+        _page_done(job, url)
+    for card in cards:
+        yield url, card
+
+
+def _normalize(job, item):
+    url, card = item
+    event = None
+    try:
+        event = job["spec"]["normalize"](card)
+    finally:
+        if not event:
+            # Dropped (or failed) cards have nothing left to save.
+            _page_progress(job, url)
+    if not event:
+        return
+    with job["lock"]:
+        job["events"].append(event)
+    yield url, event
+
+
+def _pooled_results(job, url, result):
+    """The events of a page parsed in a parse process, with the bookkeeping _parse and _normalize do."""
+    _bump(job, "parse_seconds", result["seconds"])
+    if result["error"]:
+        _settle(job)
+        print(f"⚠️ [{job['spec']['name']}] parse error: {result['error']}")
+        _bump(job, "errors")
+        return
+    cards, events = result["cards"], result["events"]
+    if not cards and job["spec"].get("stop_on_empty"):
+        job["exhausted"] = True
+    _settle(job)
+    _bump(job, "cards", cards)
+    with job["lock"]:
+        job["unsaved"][url] = cards
+        job["events"].extend(events)
+    if not cards:
+        _page_done(job, url)
+    elif cards > len(events):
+        _page_progress(job, url, cards - len(events))
+    for event in events:
+        yield url, event
+
+
+def _process_parse_worker(inbox, normalize_queue, persist_queue):
+    """
+    The parse stage on the parse processes: batches of pages go out once they
+    hold PARSE_BATCH_KB or nothing new came in for PARSE_BATCH_WAIT seconds.
+    Two batches per process are in flight at most, which holds the fetchers
+    back when the processes fall behind.
+    """
+    in_flight = 2 * PARSE_PROCESSES
+    slots = threading.BoundedSemaphore(in_flight)
+
+    def deliver(future, batch):
+        try:
+            try:
+                results = future.result()
+            except Exception as e:  # e.g. a parse process died
+                results = [{"cards": 0, "events": [], "seconds": 0.0, "error": f"{type(e).__name__}: {e}"}
+                           for _ in batch]
+            for (job, (url, _, _)), result in zip(batch, results):
+                for output in _pooled_results(job, url, result):
+                    persist_queue.put((job, output))
+        finally:
+            slots.release()
+
+    def send(batch):
+        slots.acquire()
+        try:
+            future = parse_pool.submit((job["spec"]["name"], *page) for job, page in batch)
+        except Exception as e:  # the pool could not be started or is broken
+            slots.release()
+            for job, _ in batch:
+                print(f"⚠️ [{job['spec']['name']}] parse error: {e}")
+                _bump(job, "errors")
+            return
+        future.add_done_callback(lambda done: deliver(done, batch))
+
+    batch, size = [], 0
+    while True:
+        try:
+            item = inbox.get(timeout=PARSE_BATCH_WAIT) if batch else inbox.get()
+        except queue.Empty:
+            item = None
+        if item is not None and item is not _DONE:
+            job, page = item
+            if job["pooled"]:
+                batch.append(item)
+                size += len(page[1] or b"")
+            else:
+                try:
+                    for output in _parse(job, page):
+                        normalize_queue.put((job, output))
+                except Exception as e:
+                    print(f"⚠️ [{job['spec']['name']}] parse error: {e}")
+                    _bump(job, "errors")
+        if batch and (item is None or item is _DONE or size >= PARSE_BATCH_KB * 1024):
+            send(batch)
+            batch, size = [], 0
+        if item is _DONE:
+            break
+
+    # Every slot back means every batch sent has been delivered.
+    for _ in range(in_flight):
+        slots.acquire()
+
+
+def _stage_worker(stage_name, fn, inbox, outbox):
+    while True:
+        item = inbox.get()
+        if item is _DONE:
+            return
+        job, payload = item
+        try:
+            for output in fn(job, payload):
+                outbox.put((job, output))
+        except Exception as e:
+            print(f"⚠️ [{job['spec']['name']}] {stage_name} error: {e}")
+            _bump(job, "errors")
+
+
+def _fetch_worker(frontier, outbox):
+    while True:
+        next_url = frontier.get()
+        if next_url is None:
+            return
+        url, job = next_url
+        try:
+            for output in _fetch(job, url):
+                outbox.put((job, output))
+        except Exception as e:
+            print(f"⚠️ [{job['spec']['name']}] fetch error: {e}")
+            _bump(job, "errors")
+            _settle(job)
+        finally:
+            frontier.done(url)
+
+
+def _persist_worker(inbox, persist, batch_size, write_totals, totals_lock):
+    reset_write_stats()
+    batch = []
+    while True:
+        item = inbox.get()
+        if item is not _DONE:
+            job, (url, event) = item
+            batch.append((job, url, event))
+        if batch and (item is _DONE or len(batch) >= batch_size):
+            try:
+                persist([event for _, _, event in batch])
+            except Exception as e:
+                # Their pages stay not done, so they are fetched again next run.
+                print(f"❌ Failed to persist {len(batch)} events: {e}")
+                for job in {id(job): job for job, _, _ in batch}.values():
+                    _bump(job, "errors")
+            else:
+                for job, url, _ in batch:
+                    _page_progress(job, url)
+            batch = []
+        if item is _DONE:
+            break
+
+    with totals_lock:
+        for key, value in get_write_stats().items():
+            write_totals[key] = write_totals.get(key, 0) + value
+
+
+def _start(count, target, *args):
+    # Each thread runs in a copy of the caller's context, so its requests stay
+    # on the calling source's cassette (scraper/cassette.py).
+    threads = [threading.Thread(target=contextvars.copy_context().run, args=(target, *args), daemon=True)
+               for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def _finish(threads, downstream, downstream_workers):
+    """Wait for a stage to drain, then tell every worker of the next stage to stop."""
+    for thread in threads:
+        thread.join()
+    for _ in range(downstream_workers):
+        downstream.put(_DONE)
+
+
+def run_pipeline(specs, persist=None, fetch_workers=None, parse_workers=None,
+                 normalize_workers=None, persist_workers=None, queue_size=None, batch_size=None):
+    """
+    Runs one or more pipeline specs through the shared stages.
+
+    Args:
+        specs (list[dict]): Pipeline specs (see the comment at the top of this module).
+        persist (callable, optional): Receives each batch of events. Defaults to save_events_bulk.
+        *_workers / queue_size / batch_size: Override the PIPELINE_* settings in scraper/config.py.
+
+    Returns:
+        list[dict]: Per spec: name, pages, unchanged (pages the HTTP cache says are
+        the same as last run), cards, errors, seconds, fetch_seconds and
+        parse_seconds (summed over the worker threads) and the events list.
+    """
+    persist = persist or save_events_bulk
+    fetch_workers = fetch_workers or PIPELINE_FETCH_WORKERS
+    parse_workers = parse_workers or PIPELINE_PARSE_WORKERS
+    normalize_workers = normalize_workers or PIPELINE_NORMALIZE_WORKERS
+    persist_workers = persist_workers or PIPELINE_PERSIST_WORKERS
+    queue_size = queue_size or PIPELINE_QUEUE_SIZE
+    batch_size = batch_size or PIPELINE_BATCH_SIZE
+
+    settled = threading.Condition()
+    jobs = [
+        {"spec": spec, "exhausted": False, "pages": 0, "cards": 0, "errors": 0,
+         "unchanged": 0, "fetch_seconds": 0.0, "parse_seconds": 0.0, "events": [], "unsaved": {},
+         "pooled": PARSE_PROCESSES > 0 and parse_pool.can_parse(spec["name"]), "lock": threading.Lock(),
+         "ahead": 0, "settled": settled}
+        for spec in specs
+    ]
+
+    frontier = Frontier(maxsize=queue_size)
+    parse_queue, normalize_queue, persist_queue = (
+        queue.Queue(maxsize=queue_size) for _ in range(3)
+    )
+    write_totals = {}
+    totals_lock = threading.Lock()
+    start = time.monotonic()
+
+    fetchers = _start(fetch_workers, _fetch_worker, frontier, parse_queue)
+    if PARSE_PROCESSES > 0:
+        parse_workers = 1
+        parsers = _start(1, _process_parse_worker, parse_queue, normalize_queue, persist_queue)
+    else:
+        parsers = _start(parse_workers, _stage_worker, "parse", _parse, parse_queue, normalize_queue)
+    normalizers = _start(normalize_workers, _stage_worker, "normalize", _normalize, normalize_queue, persist_queue)
+    persisters = _start(persist_workers, _persist_worker, persist_queue, persist, batch_size, write_totals, totals_lock)
+
+    # Feed the URLs from here; put() blocks while the fetchers are busy, so a
+    # long URL generator is consumed only as fast as pages are downloaded.
+    # The specs take turns, so every host has URLs waiting in the frontier.
+    # A stop_on_empty spec waits while PIPELINE_PREFETCH of its pages are
+    # still unparsed, so it doesn't queue the pages past the empty one.
+    feeds = [(job, iter(job["spec"]["urls"])) for job in jobs]
+    while feeds:
+        queued = False
+        for feed in list(feeds):
+            job, urls = feed
+            if job["exhausted"]:
+                feeds.remove(feed)
+                continue
+            if job["spec"].get("stop_on_empty") and job["ahead"] >= PIPELINE_PREFETCH:
+                continue
+            url = next(urls, None)
+            if url is None:
+                feeds.remove(feed)
+                continue
+            queued = True
+            if url not in job["spec"].get("skip_urls", ()):
+                with settled:
+                    job["ahead"] += 1
+                if not frontier.put(url, job):
+                    # Already in the frontier (this spec or another): it
+                    # won't be fetched again, so it never settles.
+                    with settled:
+                        job["ahead"] -= 1
+        if feeds and not queued:
+            with settled:
+                settled.wait_for(lambda: any(job["exhausted"] or job["ahead"] < PIPELINE_PREFETCH
+                                             for job, _ in feeds), timeout=1)
+    frontier.close()
+
+    _finish(fetchers, parse_queue, parse_workers)
+    _finish(parsers, normalize_queue, normalize_workers)
+    _finish(normalizers, persist_queue, persist_workers)
+    _finish(persisters, None, 0)
+
+    # The work happened on the stage threads; credit it to the caller so the
+    # runner sees it like any other source's writes and timings.
+    add_write_stats(write_totals)
+    add_timings({
+        "fetch": sum(job["fetch_seconds"] for job in jobs),
+        "parse": sum(job["parse_seconds"] for job in jobs),
+    })
+
+    elapsed = round(time.monotonic() - start, 2)
+    results = []
+    for job in jobs:
+        name = job["spec"]["name"]
+        logger.info(f"Pipeline '{name}': {job['pages']} pages ({job['unchanged']} unchanged), {job['cards']} cards, "
+                    f"{len(job['events'])} events, {job['errors']} errors in {elapsed}s.")
+        results.append({
+            "name": name,
+            "pages": job["pages"],
+            "unchanged": job["unchanged"],
+            "cards": job["cards"],
+            "errors": job["errors"],
+            "seconds": elapsed,
+            "fetch_seconds": round(job["fetch_seconds"], 2),
+            "parse_seconds": round(job["parse_seconds"], 2),
+            "events": job["events"],
+        })
+    return results
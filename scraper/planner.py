@@ -0,0 +1,68 @@
+import heapq
+import os
+import statistics
+import threading
+
+from scraper.config import PLAN_HISTORY, STATE_DIR
+from scraper.utils import load_json_state, save_json_state
+
+# --- Run planning ---
+# With N workers, a pass ends when the busiest worker is done (the makespan).
+# Starting the longest sources first (LPT: longest processing time first) keeps
+# a long one, like Mapa's "Carregar mais" loop, from starting last while the
+# other workers sit idle. Durations come from each source's last PLAN_HISTORY
+# runs, kept in STATE_DIR/source_durations.json.
+
+HISTORY_PATH = os.path.join(STATE_DIR, "source_durations.json")
+
+_lock = threading.Lock()
+
+
+def load_history(path=None):
+    return load_json_state(path or HISTORY_PATH, {})
+
+
+def record_durations(results, path=None):
+    """Add the seconds of each runner result to its source's rolling history."""
+    path = path or HISTORY_PATH
+    with _lock:
+        history = load_history(path)
+        for result in results:
+            if result["status"] == "skipped" or not result.get("started", True):  # never really ran
+                continue
+            # Failed and timed-out runs held a worker just as long, so they count too.
+            runs = history.setdefault(result["name"], [])
+            runs.append(result["seconds"])
+            del runs[:-PLAN_HISTORY]
+        save_json_state(path, history)
+
+
+def estimate(name, history):
+    """Expected seconds for `name`: the median of its recent runs, or None if it never ran."""
+    runs = history.get(name)
+    return statistics.median(runs) if runs else None
+
+
+def plan(names, workers, history=None):
+    """
+    Order `names` longest first and simulate handing them out to `workers` in
+    that order (each to the first free worker, as the thread pool does).
+
+    Sources without history are treated as the longest known one, so they start
+    early and can't end up stretching the pass.
+
+    Returns:
+        tuple: (ordered names, planned makespan in seconds)
+    """
+    history = load_history() if history is None else history
+    expected = {name: estimate(name, history) for name in names}
+    fallback = max((seconds for seconds in expected.values() if seconds is not None), default=0.0)
+    expected = {name: fallback if seconds is None else seconds for name, seconds in expected.items()}
+
+    # sorted() is stable, so equal estimates keep the caller's order.
+    ordered = sorted(names, key=lambda name: expected[name], reverse=True)
+
+    finish_times = [0.0] * max(1, min(workers, len(names)))
+    for name in ordered:
+        heapq.heapreplace(finish_times, finish_times[0] + expected[name])
+    return ordered, max(finish_times, default=0.0)
@@ -0,0 +1,204 @@
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+from scraper import rate_limit
+from scraper.config import (
+    HTTP_PROXIES,
+    PROXIES_PER_HOST,
+    PROXY_COOLDOWN_SECONDS,
+    PROXY_MAX_COOLDOWNS,
+    PROXY_MAX_ERROR_RATE,
+    PROXY_MIN_REQUESTS,
+)
+
+logger = logging.getLogger("event_scraper_log")
+
+# --- Egress proxy pool ---
+# With SCRAPER_HTTP_PROXIES set, scraper/http_client.py sends every request
+# through one of these proxies ("direct" means no proxy). Throughput then grows
+# with the number of addresses the sites see instead of being capped by one:
+#
+#   - each host is given PROXIES_PER_HOST proxies, preferring the ones serving
+#     the fewest hosts, and a request goes through whichever of those its
+#     rate limiter (one bucket per host and proxy) lets through soonest;
+#   - every proxy is scored by its latency and error rate (moving averages).
+#     Errors are failures to reach or get through the proxy (requests'
+#     ProxyError, 407) and 403/429 answers, which usually mean the address got
+#     blocked or throttled. Timeouts and connection errors of the site itself
+#     say nothing about the proxy and are not counted;
+#   - a proxy whose error rate passes PROXY_MAX_ERROR_RATE cools down for
+#     PROXY_COOLDOWN_SECONDS and loses its hosts; after PROXY_MAX_COOLDOWNS
+#     cooldowns in a row it is evicted for the rest of the process.
+#
+# Without proxies, choose() returns None and requests go out directly. With
+# them, requests never fall back to this machine's address on their own: when
+# every proxy is cooling down or evicted, choose() raises NoProxyAvailable
+# (list "direct" among the proxies to allow direct requests).
+
+DIRECT = "direct"
+
+# Statuses that say more about the address than about the site.
+PROXY_ERROR_STATUSES = {403, 407, 429}
+
+# Weight of the newest request in the moving averages.
+_SMOOTHING = 0.2
+
+
+class NoProxyAvailable(requests.exceptions.ProxyError):
+    """Raised instead of sending a request directly when every proxy is cooling down or evicted."""
+
+
+def label(proxy):
+    """The proxy without credentials, for logs and rate-limit buckets."""
+    if proxy == DIRECT:
+        return DIRECT
+    parts = urlsplit(proxy)
+    return f"{parts.scheme}://{parts.hostname}:{parts.port}" if parts.hostname else proxy
+
+
+class ProxyStats:
+    def __init__(self, proxy):
+        self.proxy = proxy
+        self.label = label(proxy)
+        self.requests = 0
+        self.latency = 0.0
+        self.error_rate = 0.0
+        self.cooldowns = 0
+        self.cooling_until = 0.0
+        self.evicted = False
+
+    def available(self, now):
+        return not self.evicted and now >= self.cooling_until
+
+    def score(self):
+        """Lower is better: average latency, inflated by the error rate (a second per 100% of it at least)."""
+        return self.latency * (1 + 4 * self.error_rate) + self.error_rate
+
+
+class ProxyPool:
+    def __init__(self, proxies):
+        self.proxies = {proxy: ProxyStats(proxy) for proxy in proxies}
+        self._hosts = {}  # host -> list of assigned proxies
+        self._lock = threading.Lock()
+
+    def _assigned(self, host, now):
+        """The host's usable proxies, topping its share up from the least busy ones."""
+        assigned = [proxy for proxy in self._hosts.get(host, []) if self.proxies[proxy].available(now)]
+        if len(assigned) < PROXIES_PER_HOST:
+            load = {proxy: 0 for proxy in self.proxies}
+            for proxies in self._hosts.values():
+                for proxy in proxies:
+                    load[proxy] += 1
+            candidates = sorted(
+                (stats for proxy, stats in self.proxies.items() if stats.available(now) and proxy not in assigned),
+                key=lambda stats: (load[stats.proxy], stats.score()),
+            )
+            assigned += [stats.proxy for stats in candidates[:PROXIES_PER_HOST - len(assigned)]]
+        self._hosts[host] = assigned
+        return assigned
+
+    def choose(self, url, avoid=None):
+        """
+        The proxy to send `url` through. Raises NoProxyAvailable if every proxy
+        is cooling down or evicted. A retry passes the proxy that just failed as
+        `avoid` to try another one.
+        """
+        host = urlsplit(url).netloc
+        with self._lock:
+            assigned = self._assigned(host, time.monotonic())
+            stats = [self.proxies[proxy] for proxy in assigned if proxy != avoid or len(assigned) == 1]
+        if not stats:
+            raise NoProxyAvailable(f"Every proxy is cooling down or evicted, not requesting {url}")
+        return min(stats, key=lambda s: (rate_limit.ready_in(url, via=s.label), s.score())).proxy
+
+    def ready_in(self, url):
+        """Seconds until one of the host's proxies may send `url`."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            assigned = self._assigned(host, time.monotonic())
+            labels = [self.proxies[proxy].label for proxy in assigned]
+        if not labels:
+            return rate_limit.ready_in(url)
+        return min(rate_limit.ready_in(url, via=proxy_label) for proxy_label in labels)
+
+    def record(self, proxy, seconds=None, status=None, error=False):
+        """Update the proxy's score from one request and cool it down if it keeps failing."""
+        failed = error or status in PROXY_ERROR_STATUSES
+        with self._lock:
+            stats = self.proxies[proxy]
+            stats.requests += 1
+            stats.error_rate += _SMOOTHING * ((1.0 if failed else 0.0) - stats.error_rate)
+            if seconds is not None and not failed:
+                stats.latency = seconds if stats.requests == 1 else stats.latency + _SMOOTHING * (seconds - stats.latency)
+            if not failed:
+                stats.cooldowns = 0
+                return
+            if stats.requests < PROXY_MIN_REQUESTS or stats.error_rate <= PROXY_MAX_ERROR_RATE:
+                return
+
+            stats.cooldowns += 1
+            stats.requests = 0
+            stats.error_rate = 0.0
+            for proxies in self._hosts.values():
+                if proxy in proxies:
+                    proxies.remove(proxy)
+            if stats.cooldowns >= PROXY_MAX_COOLDOWNS:
+                stats.evicted = True
+            else:
+                stats.cooling_until = time.monotonic() + PROXY_COOLDOWN_SECONDS
+            evicted, cooldowns = stats.evicted, stats.cooldowns
+
+        if evicted:
+            logger.warning(f"Proxy {stats.label} evicted after {cooldowns} cooldowns.")
+        else:
+            logger.warning(f"Proxy {stats.label} cooling down for {PROXY_COOLDOWN_SECONDS:.0f}s (too many errors).")
+
+    def report(self):
+        """Score, error rate and state of every proxy."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                stats.label: {
+                    "latency": round(stats.latency, 3),
+                    "error_rate": round(stats.error_rate, 2),
+                    "state": "evicted" if stats.evicted else "cooling" if not stats.available(now) else "ok",
+                }
+                for stats in self.proxies.values()
+            }
+
+
+_pool = ProxyPool(HTTP_PROXIES) if HTTP_PROXIES else None
+
+
+def enabled():
+    return _pool is not None
+
+
+def choose(url, avoid=None):
+    """The proxy for a request to `url`: a proxy URL, DIRECT, or None without a pool (see ProxyPool.choose)."""
+    return _pool.choose(url, avoid) if _pool else None
+
+
+def ready_in(url):
+    """Seconds until `url` may be requested without waiting (through any of its proxies)."""
+    return _pool.ready_in(url) if _pool else rate_limit.ready_in(url)
+
+
+def record(proxy, seconds=None, status=None, error=False):
+    if _pool and proxy:
+        _pool.record(proxy, seconds, status, error)
+
+
+def requests_proxies(proxy):
+    """The `proxies` argument of requests for `proxy`."""
+    if not proxy or proxy == DIRECT:
+        return None
+    return {"http": proxy, "https": proxy}
+
+
+def report():
+    return _pool.report() if _pool else {}
@@ -0,0 +1,141 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from scraper.config import (
+    RATE_BURST,
+    RATE_DECREASE,
+    RATE_INCREASE,
+    RATE_INITIAL,
+    RATE_LIMIT,
+    RATE_MAX,
+    RATE_MIN,
+    RATE_SLOW_SECONDS,
+)
+
+logger = logging.getLogger("event_scraper_log")
+
+# --- Per-host rate limiting ---
+# Every request made through scraper/http_client.py or scraper/async_fetch.py
+# takes a token from its host's bucket first, so all sources and threads hitting
+# the same site share one budget. The bucket's rate adapts AIMD style
+# (additive increase, multiplicative decrease): it creeps up while the host
+# answers quickly and is halved on 429/5xx, errors and slow answers. A
+# Retry-After header pauses the host for as long as it asks.
+#
+# With egress proxies (scraper/proxy_pool.py) every host/proxy pair has its own
+# bucket: each address the site sees gets its own budget.
+#
+# reserve() takes the token right away and returns how long the caller must
+# wait before sending, so threads sleep and coroutines await the same amount.
+
+
+class HostBucket:
+    """Token bucket of one host."""
+
+    def __init__(self, host, rate=None):
+        self.host = host
+        self.rate = rate or RATE_INITIAL
+        self.tokens = RATE_BURST
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return the seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(RATE_BURST, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(delay, self.paused_until - now)
+
+    def ready_in(self):
+        """Seconds until a token is free, without taking it."""
+        with self._lock:
+            now = time.monotonic()
+            tokens = min(RATE_BURST, self.tokens + (now - self.updated) * self.rate)
+            delay = (1 - tokens) / self.rate if tokens < 1 else 0.0
+            return max(delay, self.paused_until - now)
+
+    def record(self, status=None, seconds=None, retry_after=None, error=False):
+        """Adjust the rate from how the host answered one request."""
+        with self._lock:
+            previous = self.rate
+            throttled = error or status == 429 or (status is not None and status >= 500)
+            if throttled or (seconds is not None and seconds > RATE_SLOW_SECONDS):
+                self.rate = max(RATE_MIN, self.rate * RATE_DECREASE)
+            else:
+                self.rate = min(RATE_MAX, self.rate + RATE_INCREASE)
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+        if self.rate < previous:
+            logger.info(f"Rate for {self.host} lowered to {self.rate:.2f} req/s "
+                        f"({'error' if error else status}{f', retry after {retry_after:.0f}s' if retry_after else ''}).")
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def bucket_for(url, via=None):
+    host = urlsplit(url).netloc
+    if via:
+        host = f"{host} via {via}"
+    with _buckets_lock:
+        if host not in _buckets:
+            _buckets[host] = HostBucket(host)
+        return _buckets[host]
+
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds or an HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def reserve(url, via=None):
+    """Seconds to wait before requesting `url` (through proxy `via`); 0 with SCRAPER_RATE_LIMIT=0."""
+    if not RATE_LIMIT:
+        return 0.0
+    return bucket_for(url, via).reserve()
+
+
+def ready_in(url, via=None):
+    """Seconds until `url`'s host may be requested without waiting."""
+    if not RATE_LIMIT:
+        return 0.0
+    return bucket_for(url, via).ready_in()
+
+
+def wait(url, via=None):
+    """Block until `url`'s host may be requested."""
+    delay = reserve(url, via)
+    if delay > 0:
+        time.sleep(delay)
+
+
+def record(url, status=None, seconds=None, headers=None, error=False, via=None):
+    if not RATE_LIMIT:
+        return
+    retry_after = parse_retry_after((headers or {}).get("Retry-After"))
+    bucket_for(url, via).record(status, seconds, retry_after, error)
+
+
+def rates():
+    """Current requests per second of every host seen so far."""
+    with _buckets_lock:
+        return {host: round(bucket.rate, 2) for host, bucket in _buckets.items()}
@@ -0,0 +1,174 @@
+import logging
+import math
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from database.db_operations import get_write_stats, reset_write_stats
+from scraper import cassette, planner
+from scraper.config import MAX_WORKERS, PASS_TIMEOUT, PLAN_ORDER, SOURCE_TIMEOUT
+from scraper.timing import get_timings, reset_timings
+
+logger = logging.getLogger("event_scraper_log")
+
+class SourceSkipped(Exception):
+    """Raised by a source that decides not to run this time (e.g. its site is down)."""
+
+
+def _as_named_source(source):
+    """Accepts either a callable or a (name, callable) pair."""
+    if isinstance(source, tuple):
+        return source
+    return getattr(source, "__name__", repr(source)), source
+
+
+def run_sources(sources, max_workers=None, timeout=None, on_result=None, plan_order=None, pass_timeout=None):
+    """
+    Runs scraping sources, at most `max_workers` at a time.
+
+    A source that raises is logged and recorded, the others keep running.
+    A source that runs longer than `timeout` seconds is reported as timed out
+    and the runner stops waiting for it (Python threads can't be killed, so
+    the call itself is left to finish in the background); its slot goes to
+    the next queued source. Once `pass_timeout` seconds have passed since the
+    pass started, the runner stops waiting altogether: sources still running
+    or never started are reported as timed out.
+
+    Args:
+        sources (list): Callables or (name, callable) pairs.
+        max_workers (int, optional): Pool size. Defaults to config.MAX_WORKERS.
+        timeout (float, optional): Per-source limit in seconds. Defaults to config.SOURCE_TIMEOUT.
+        pass_timeout (float, optional): Limit for the whole pass in seconds. Defaults to
+            config.PASS_TIMEOUT, or `timeout` for every round of `max_workers` sources.
+        on_result (callable, optional): Called with each result as soon as the source ends.
+        plan_order (bool, optional): Start the sources longest-first (see scraper/planner.py).
+            Defaults to config.PLAN_ORDER.
+
+    Returns:
+        list[dict]: One result per source, in the same order as `sources`, with
+        the keys name, status ("ok", "error", "timeout" or "skipped"), seconds, result, error,
+        writes (the save_events_bulk totals of the run, see db_operations.get_write_stats),
+        timings (seconds spent fetching and parsing, see scraper/timing.py) and
+        started (False for a source the pass timed out on before it could start).
+    """
+    max_workers = max_workers or MAX_WORKERS
+    timeout = timeout or SOURCE_TIMEOUT
+    plan_order = PLAN_ORDER if plan_order is None else plan_order
+
+    named_sources = [_as_named_source(source) for source in sources]
+    pass_timeout = pass_timeout or PASS_TIMEOUT or timeout * math.ceil(len(named_sources) / max_workers)
+    results = [None] * len(named_sources)
+    started_at = {}
+
+    def call(index, fn):
+        reset_write_stats()
+        reset_timings()
+        with cassette.use(named_sources[index][0]):
+            result = fn()
+        return result, get_write_stats(), get_timings()
+
+    def record(index, status, result=None, error=None, writes=None, timings=None):
+        name = named_sources[index][0]
+        seconds = time.monotonic() - started_at.get(index, time.monotonic())
+        results[index] = {
+            "name": name,
+            "status": status,
+            "seconds": round(seconds, 2),
+            "result": result,
+            "error": error,
+            "writes": writes,
+            "timings": timings,
+            "started": index in started_at,
+        }
+        if on_result:
+            try:
+                on_result(results[index])
+            except Exception as e:
+                logger.error(f"on_result callback failed for '{name}': {e}", exc_info=True)
+
+    # Sources start in this order, so putting them longest-first is all the
+    # planning needs.
+    submit_order = list(range(len(named_sources)))
+    planned_makespan = None
+    if plan_order and len(named_sources) > 1:
+        ordered, planned_makespan = planner.plan([name for name, _ in named_sources], max_workers)
+        position = {name: rank for rank, name in enumerate(ordered)}
+        submit_order.sort(key=lambda index: position[named_sources[index][0]])
+
+    pass_start = time.monotonic()
+    pass_deadline = pass_start + pass_timeout
+    # A source that times out keeps its thread until it returns on its own, so
+    # the pool has a thread for every source; `running` is what caps them at
+    # max_workers, and a timed-out source leaves it.
+    executor = ThreadPoolExecutor(max_workers=max(len(named_sources), 1), thread_name_prefix="source")
+    queued = deque(submit_order)
+    futures = {}
+    running = set()
+
+    def start_queued():
+        while queued and len(running) < max_workers and time.monotonic() < pass_deadline:
+            index = queued.popleft()
+            started_at[index] = time.monotonic()
+            future = executor.submit(call, index, named_sources[index][1])
+            futures[future] = index
+            running.add(future)
+
+    try:
+        start_queued()
+        while running:
+            done, running = wait(running, timeout=_next_wait(running, futures, started_at, timeout, pass_deadline),
+                                 return_when=FIRST_COMPLETED)
+
+            for future in done:
+                index = futures[future]
+                name = named_sources[index][0]
+                try:
+                    result, writes, timings = future.result()
+                except SourceSkipped as e:
+                    record(index, "skipped", error=str(e))
+                    logger.warning(f"Source '{name}' skipped: {e}")
+                except Exception as e:
+                    logger.error(f"Source '{name}' failed: {e}", exc_info=True)
+                    record(index, "error", error=str(e))
+                else:
+                    record(index, "ok", result=result, writes=writes, timings=timings)
+                    logger.info(f"Source '{name}' finished in {results[index]['seconds']}s.")
+
+            now = time.monotonic()
+            for future in list(running):
+                index = futures[future]
+                if now - started_at[index] >= timeout:
+                    running.discard(future)
+                    record(index, "timeout", error=f"timed out after {timeout}s")
+                    logger.error(f"Source '{named_sources[index][0]}' timed out after {timeout}s.")
+                elif now >= pass_deadline:
+                    running.discard(future)
+                    record(index, "timeout", error=f"pass timed out after {pass_timeout}s")
+                    logger.error(f"Source '{named_sources[index][0]}' still running when the pass timed out.")
+            start_queued()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    for index in queued:
+        record(index, "timeout", error=f"never started: pass timed out after {pass_timeout}s")
+        logger.error(f"Source '{named_sources[index][0]}' never started before the pass timed out.")
+
+    makespan = time.monotonic() - pass_start
+    failed = sum(1 for r in results if r["status"] in ("error", "timeout"))
+    skipped = sum(1 for r in results if r["status"] == "skipped")
+    logger.info(f"Ran {len(results)} sources in {makespan:.1f}s "
+                f"({failed} failed or timed out, {skipped} skipped).")
+    if planned_makespan:  # 0 when none of the sources has a history yet
+        logger.info(f"Makespan on {max_workers} workers: planned {planned_makespan:.1f}s, actual {makespan:.1f}s.")
+
+    try:
+        planner.record_durations(results)
+    except Exception as e:
+        logger.error(f"Could not record source durations: {e}")
+    return results
+
+
+def _next_wait(running, futures, started_at, timeout, pass_deadline):
+    """Seconds until the earliest running source, or the pass, hits its deadline."""
+    deadlines = [started_at[futures[f]] + timeout for f in running]
+    return max(0.0, min(deadlines + [pass_deadline]) - time.monotonic())
@@ -0,0 +1,162 @@
+import heapq
+import logging
+import os
+import random
+import time
+
+from scraper.config import (
+    ADAPTIVE_GROW,
+    ADAPTIVE_INTERVALS,
+    ADAPTIVE_MAX_FACTOR,
+    ADAPTIVE_MIN_FACTOR,
+    ADAPTIVE_SHRINK,
+    DEFAULT_INTERVAL,
+    DEFAULT_JITTER,
+    STATE_DIR,
+)
+from scraper.sources import get_source
+from scraper.utils import load_json_state, save_json_state
+
+logger = logging.getLogger("event_scraper_log")
+
+
+class SourceScheduler:
+    """
+    Runs each source on its own interval.
+
+    Next-run times live in a min-heap, so the loop sleeps exactly until the
+    earliest due source instead of polling. A random jitter is added to every
+    interval (and to the first run) so sources with the same interval drift
+    apart rather than firing together.
+
+    With adaptive intervals on, every run's result moves the source's interval:
+    a run that inserted or changed events shrinks it, a run that changed
+    nothing grows it, within the source's bounds. What was learned (interval
+    and change rate per source) is kept in STATE_DIR/source_stats.json.
+
+    Args:
+        names (list[str]): Source names from scraper/sources.py.
+        run_batch (callable): Called with a list of due names; runs them and
+            returns the runner results (see scraper/runner.py).
+        clock / sleep: Injected for tests; default to time.monotonic / time.sleep.
+        stats_path (str, optional): Where learned intervals are kept.
+        adaptive (bool, optional): Defaults to config.ADAPTIVE_INTERVALS.
+    """
+
+    def __init__(self, names, run_batch, clock=time.monotonic, sleep=time.sleep,
+                 stats_path=None, adaptive=None):
+        self._run_batch = run_batch
+        self._adaptive = ADAPTIVE_INTERVALS if adaptive is None else adaptive
+        self._stats_path = stats_path or os.path.join(STATE_DIR, "source_stats.json")
+        self._stats = load_json_state(self._stats_path, {}) if self._adaptive else {}
+        self._clock = clock
+        self._sleep = sleep
+        self._heap = []
+        self._sequence = 0  # tie-breaker so the heap never compares names
+
+        now = self._clock()
+        for name in names:
+            # Spread the first runs over each source's jitter window.
+            self._push(name, now + random.uniform(0, self.jitter(name)))
+
+    def base_interval(self, name):
+        return get_source(name).get("interval", DEFAULT_INTERVAL)
+
+    def interval_bounds(self, name):
+        source = get_source(name)
+        base = self.base_interval(name)
+        return (source.get("min_interval", base * ADAPTIVE_MIN_FACTOR),
+                source.get("max_interval", base * ADAPTIVE_MAX_FACTOR))
+
+    def interval(self, name):
+        """Current interval: the learned one if there is one, else the registry's."""
+        learned = self._stats.get(name, {}).get("interval")
+        if learned is None:
+            return self.base_interval(name)
+        low, high = self.interval_bounds(name)
+        return min(max(learned, low), high)
+
+    def jitter(self, name):
+        source = get_source(name)
+        if "jitter" in source:
+            return source["jitter"]
+        return self.interval(name) * DEFAULT_JITTER
+
+    def record_result(self, name, result):
+        """
+        Learn from one run. Failed runs say nothing about the source's change
+        rate, so only successful ones move the interval.
+        """
+        if not self._adaptive or not result or result["status"] != "ok":
+            return
+
+        writes = result.get("writes") or {}
+        changed = writes.get("upserted", 0) + writes.get("modified", 0) > 0
+
+        stats = self._stats.setdefault(name, {"runs": 0, "changed_runs": 0, "change_rate": None})
+        stats["runs"] += 1
+        stats["changed_runs"] += int(changed)
+        # Moving average, so the rate follows how the source behaves lately.
+        previous_rate = stats["change_rate"]
+        stats["change_rate"] = float(changed) if previous_rate is None else round(0.8 * previous_rate + 0.2 * changed, 3)
+
+        low, high = self.interval_bounds(name)
+        factor = ADAPTIVE_SHRINK if changed else ADAPTIVE_GROW
+        stats["interval"] = round(min(max(self.interval(name) * factor, low), high))
+
+        logger.info(f"Source '{name}' {'changed' if changed else 'unchanged'} "
+                    f"(change rate {stats['change_rate']:.2f}), interval now {stats['interval'] / 60:.0f} min.")
+        save_json_state(self._stats_path, self._stats)
+
+    def _push(self, name, when):
+        self._sequence += 1
+        heapq.heappush(self._heap, (when, self._sequence, name))
+
+    def reschedule(self, name):
+        """Queue the next run of `name` one interval (plus jitter) from now."""
+        delay = self.interval(name) + random.uniform(0, self.jitter(name))
+        self._push(name, self._clock() + delay)
+        return delay
+
+    def seconds_until_next(self):
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - self._clock())
+
+    def pop_due(self):
+        """Remove and return every source whose next run time has passed."""
+        now = self._clock()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[2])
+        return due
+
+    def run_once(self):
+        """Sleep until the next source is due, run everything due, reschedule it."""
+        wait_for = self.seconds_until_next()
+        if wait_for is None:
+            raise RuntimeError("No sources to schedule.")
+        if wait_for > 0:
+            self._sleep(wait_for)
+
+        due = self.pop_due()
+        if not due:
+            return []
+
+        results = []
+        try:
+            results = self._run_batch(due) or []
+            by_name = {result["name"]: result for result in results}
+            for name in due:
+                self.record_result(name, by_name.get(name))
+        finally:
+            # Reschedule even if the batch blew up, or the sources would be lost.
+            for name in due:
+                delay = self.reschedule(name)
+                logger.info(f"Next run of '{name}' in {delay / 60:.1f} min.")
+        return results
+
+    def run_forever(self):
+        logger.info(f"Scheduler started with {len(self._heap)} sources.")
+        while True:
+            self.run_once()
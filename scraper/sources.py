@@ -0,0 +1,210 @@
+import fnmatch
+import importlib
+import logging
+import threading
+import time
+
+from scraper.config import ENABLED_SOURCES, ISOLATE_SELENIUM, USE_PIPELINE
+
+logger = logging.getLogger("event_scraper_log")
+
+# --- Source registry ---
+# Every scraping source is declared here by name. Its module is only imported
+# when the source is actually run, so a scheduler that runs a few sources
+# doesn't pay for Selenium, webdriver_manager or the Mongo connection of the others.
+#
+# module:   dotted path of the scraper module
+# function: the scrape function inside it (takes no arguments)
+# selenium: True when the source drives a Chrome browser
+# enabled:  False keeps the source out of the default pass
+# interval: seconds between runs (static pages that rarely change get longer ones)
+# jitter:   optional, seconds of random delay added to each run
+# pipeline: optional, function in the module returning a scraper/pipeline.py spec
+#           (called with "pipeline_args"); such sources run through the staged pipeline
+# hosts:    optional, the hosts the source fetches from; while one of them has its
+#           circuit open (scraper/circuit_breaker.py) the source is skipped
+# parser:   optional, function in the module that pulls the raw cards out of one
+#           page (html, url, encoding) when the source has no pipeline spec
+# normalize: optional, function in the module that turns one of those cards into
+#           an event (or None), for sources without a pipeline spec
+HOUR = 3600
+
+SOURCES = {
+    "boulevard": {"module": "scraper.event_scraper_shopping_boulevard", "function": "scrape_boulevard_vila_velha", "pipeline": "boulevard_pipeline", "interval": 12 * HOUR, "hosts": ["www.boulevardvilavelha.com.br"]},
+    "shopping_vila_velha": {"module": "scraper.event_scraper_shopping_vila_velha", "function": "scrape_shopping_vila_velha", "interval": 12 * HOUR, "hosts": ["shoppingvilavelha.com.br"]},
+    "sesc": {"module": "scraper.event_scraper_sesc_es", "function": "scrape_sesc_es", "interval": 6 * HOUR, "hosts": ["sesc-es.com.br"]},
+    "corrida": {"module": "scraper.event_scraper_corrida", "function": "scrape_brasilquecorre_es", "pipeline": "corrida_pipeline", "interval": 12 * HOUR, "hosts": ["brasilquecorre.com"]},
+    "sympla": {"module": "scraper.event_scraper_sympla", "function": "scrape_and_save_events_sympla", "pipeline": "sympla_pipeline", "interval": 1 * HOUR, "hosts": ["www.sympla.com.br"]},
+    "patrick": {"module": "scraper.event_scraper_patrick_ribeiro", "function": "scrape_and_save_patrick_events", "pipeline": "patrick_pipeline", "interval": 12 * HOUR, "hosts": ["patrickribeiro.com.br"]},
+    "mapa": {"module": "scraper.event_scraper_mapa", "function": "scrape_mapa_events", "parser": "extract_mapa_cards", "normalize": "normalize_mapa_card", "selenium": True, "interval": 6 * HOUR},
+    "craes": {"module": "scraper.event_scraper_craes", "function": "scrape_craes_events", "pipeline": "craes_pipeline", "interval": 24 * HOUR, "hosts": ["www.craes.org.br"]},
+    "zig": {"module": "scraper.event_scraper", "function": "scrape_zig_tickets", "selenium": True, "enabled": False, "interval": 6 * HOUR},
+    "beacons": {"module": "scraper.event_scraper_beacons", "function": "scrape_beacons_with_selenium", "selenium": True, "interval": 12 * HOUR},
+    "senac": {"module": "scraper.event_scraper_senac", "function": "scrape_senac_courses", "selenium": True, "interval": 24 * HOUR},
+    "festival_inverno": {"module": "scraper.event_scraper", "function": "scrape_festival_de_inverno", "enabled": False, "interval": 24 * HOUR, "hosts": ["www.festivaldeinvernodm.com.br"]},
+    "lebillet:domingos_martins": {"module": "scraper.event_scraper_lebillet", "function": "scrape_lebillet_events_domingos_martins", "pipeline": "lebillet_pipeline", "pipeline_args": ["domingos_martins"], "interval": 6 * HOUR, "hosts": ["lebillet.com.br"]},
+    "lebillet:cariacica": {"module": "scraper.event_scraper_lebillet", "function": "scrape_lebillet_events_cariacica", "pipeline": "lebillet_pipeline", "pipeline_args": ["cariacica"], "interval": 6 * HOUR, "hosts": ["lebillet.com.br"]},
+    "lebillet:guacui": {"module": "scraper.event_scraper_lebillet", "function": "scrape_lebillet_events_guacui", "pipeline": "lebillet_pipeline", "pipeline_args": ["guacui"], "interval": 6 * HOUR, "hosts": ["lebillet.com.br"]},
+    "lebillet:guarapari": {"module": "scraper.event_scraper_lebillet", "function": "scrape_lebillet_events_guarapari", "pipeline": "lebillet_pipeline", "pipeline_args": ["guarapari"], "interval": 6 * HOUR, "hosts": ["lebillet.com.br"]},
+    "lebillet:linhares": {"module": "scraper.event_scraper_lebillet", "function": "scrape_lebillet_events_linhares", "pipeline": "lebillet_pipeline", "pipeline_args": ["linhares"], "interval": 6 * HOUR, "hosts": ["lebillet.com.br"]},
+    "lebillet:serra": {"module": "scraper.event_scraper_lebillet", "function": "scrape_lebillet_events_serra", "pipeline": "lebillet_pipeline", "pipeline_args": ["serra"], "interval": 6 * HOUR, "hosts": ["lebillet.com.br"]},
+    "lebillet:viana": {"module": "scraper.event_scraper_lebillet", "function": "scrape_lebillet_events_viana", "pipeline": "lebillet_pipeline", "pipeline_args": ["viana"], "interval": 6 * HOUR, "hosts": ["lebillet.com.br"]},
+    "lebillet:vila_velha": {"module": "scraper.event_scraper_lebillet", "function": "scrape_lebillet_events_vilha_velha", "pipeline": "lebillet_pipeline", "pipeline_args": ["vila_velha"], "interval": 6 * HOUR, "hosts": ["lebillet.com.br"]},
+    "lebillet:vitoria": {"module": "scraper.event_scraper_lebillet", "function": "scrape_lebillet_events_vitoria", "pipeline": "lebillet_pipeline", "pipeline_args": ["vitoria"], "interval": 6 * HOUR, "hosts": ["lebillet.com.br"]},
+    "eventim": {"module": "scraper.event_scraper_eventim", "function": "scrape_eventim_vitoria_selenium", "selenium": True, "interval": 6 * HOUR},
+    "onticket": {"module": "scraper.event_scraper_onticket", "function": "scrape_onticket_with_selenium", "selenium": True, "enabled": False, "interval": 6 * HOUR},
+}
+
+# Seconds spent importing each source's module, filled in by load_source().
+# A module shared by several sources is only charged to the first one loaded.
+IMPORT_TIMES = {}
+_reported = set()
+_import_lock = threading.Lock()
+
+
+def get_source(name):
+    """Return the registry entry for `name`, raising KeyError with the known names."""
+    try:
+        return SOURCES[name]
+    except KeyError:
+        raise KeyError(f"Unknown source '{name}'. Known sources: {', '.join(SOURCES)}") from None
+
+
+def enabled_sources():
+    """
+    Names of the sources that run in the default pass, in registry order.
+    SCRAPER_SOURCES in the environment overrides the registry's enabled flags.
+    """
+    if ENABLED_SOURCES:
+        for name in ENABLED_SOURCES:
+            get_source(name)  # fail fast on a typo
+        return list(ENABLED_SOURCES)
+    return [name for name, source in SOURCES.items() if source.get("enabled", True)]
+
+
+def select_sources(patterns):
+    """
+    Names matching any of `patterns`, in registry order. A plain name selects
+    that source even if it is disabled; wildcards ("lebillet:*", "*") only
+    match enabled sources.
+    """
+    selected = []
+    for pattern in patterns:
+        if not any(char in pattern for char in "*?["):
+            get_source(pattern)  # fail fast on a typo
+            matches = [pattern]
+        else:
+            matches = [name for name in enabled_sources() if fnmatch.fnmatchcase(name, pattern)]
+            if not matches:
+                raise KeyError(f"No enabled source matches '{pattern}'.")
+        selected.extend(name for name in matches if name not in selected)
+    return [name for name in SOURCES if name in selected]
+
+
+def load_source(name):
+    """Import the source's module (if needed) and return its scrape function."""
+    source = get_source(name)
+    start = time.perf_counter()
+    module = importlib.import_module(source["module"])
+    elapsed = time.perf_counter() - start
+
+    with _import_lock:
+        if name not in IMPORT_TIMES:
+            IMPORT_TIMES[name] = elapsed
+    return getattr(module, source["function"])
+
+
+def load_pipeline_spec(name):
+    """Build the pipeline spec of a source that declares one."""
+    source = get_source(name)
+    module = importlib.import_module(source["module"])
+    return getattr(module, source["pipeline"])(*source.get("pipeline_args", []))
+
+
+def load_parser(name):
+    """The function that pulls the raw cards out of one of the source's pages, or None."""
+    source = get_source(name)
+    if "parser" in source:
+        module = importlib.import_module(source["module"])
+        return getattr(module, source["parser"])
+    if "pipeline" in source:
+        return load_pipeline_spec(name)["parse"]
+    return None
+
+
+def load_normalizer(name):
+    """The function that turns one of the source's raw cards into an event, or None."""
+    source = get_source(name)
+    if "normalize" in source:
+        module = importlib.import_module(source["module"])
+        return getattr(module, source["normalize"])
+    if "pipeline" in source:
+        return load_pipeline_spec(name)["normalize"]
+    return None
+
+
+def lazy_source(name, isolated=None):
+    """
+    Returns a (name, callable) pair for the runner. The module is imported the
+    first time the callable runs, not when the pair is built.
+
+    A source whose hosts are cooling down after repeated failures raises
+    SourceSkipped instead of running.
+
+    Selenium sources run in a child process (see scraper/isolation.py) unless
+    `isolated` or SCRAPER_ISOLATE_SELENIUM says otherwise. Sources with a
+    pipeline spec run through scraper/pipeline.py when SCRAPER_USE_PIPELINE is on.
+    """
+    source = get_source(name)
+    if isolated is None:
+        isolated = ISOLATE_SELENIUM and source.get("selenium", False)
+
+    if isolated:
+        def run():
+            from scraper.isolation import run_isolated
+            return run_isolated(name)
+    elif USE_PIPELINE and "pipeline" in source:
+        def run():
+            from scraper.pipeline import run_pipeline
+            from scraper import checkpoint
+            load_source(name)  # records the import time like the other sources
+            spec = load_pipeline_spec(name)
+            spec["skip_urls"] = checkpoint.done_pages(name)
+            spec["on_page_done"] = lambda url: checkpoint.mark_page_done(name, url)
+            result = run_pipeline([spec])[0]
+            if result["errors"] and not result["cards"] and not result["unchanged"]:
+                # Nothing came out and something failed: a broken source, not an unchanged one.
+                raise RuntimeError(f"every page failed ({result['errors']} errors)")
+            return result["events"]
+    else:
+        def run():
+            return load_source(name)()
+
+    hosts = source.get("hosts")
+    if hosts:
+        scrape = run
+
+        def run():
+            from scraper import circuit_breaker
+            from scraper.runner import SourceSkipped
+            down = circuit_breaker.open_hosts(hosts)
+            if down:
+                raise SourceSkipped(f"{', '.join(down)} cooling down after repeated failures")
+            return scrape()
+
+    run.__name__ = name
+    return name, run
+
+
+def report_import_times():
+    """
+    Log the import time of the sources loaded since the last report, slowest first.
+    Returns every import time recorded so far.
+    """
+    with _import_lock:
+        new_times = {name: seconds for name, seconds in IMPORT_TIMES.items() if name not in _reported}
+        _reported.update(new_times)
+
+    for name, seconds in sorted(new_times.items(), key=lambda item: item[1], reverse=True):
+        logger.info(f"Import time {name:<28} {seconds * 1000:8.1f} ms")
+    return dict(IMPORT_TIMES)
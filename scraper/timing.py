@@ -0,0 +1,49 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# --- Stage timings ---
+# Per-thread totals of the seconds a source spends fetching and parsing pages,
+# kept the same way as the write totals in database/db_operations.py: the
+# runner resets them before a source runs and reads them back afterwards.
+#
+#   with timed("fetch"):
+#       response = requests.get(url)
+#
+# Work done on other threads or processes (scraper/pipeline.py, scraper/isolation.py)
+# is credited back to the source's thread with add_timings().
+
+STAGES = ("fetch", "parse")
+
+_timings = threading.local()
+
+
+def reset_timings():
+    """Zero the current thread's stage timings."""
+    _timings.seconds = dict.fromkeys(STAGES, 0.0)
+
+
+def get_timings():
+    """Seconds per stage on the current thread since the last reset_timings()."""
+    seconds = getattr(_timings, "seconds", None)
+    if seconds is None:
+        return dict.fromkeys(STAGES, 0.0)
+    return dict(seconds)
+
+
+def add_timings(timings):
+    """Add stage timings measured elsewhere to the current thread's."""
+    seconds = get_timings()
+    for stage, value in timings.items():
+        seconds[stage] = seconds.get(stage, 0.0) + value
+    _timings.seconds = seconds
+
+
+@contextmanager
+def timed(stage):
+    """Add the time spent inside the block to `stage`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timings({stage: time.perf_counter() - start})
@@ -203,4 +203,60 @@ def normalize_url(url):
         query_params = parse_qs(query)
         sorted_query = urlencode(sorted(query_params.items()), doseq=True)
         return urlunparse(parsed_url._replace(query=sorted_query, fragment=''))
-    return urlunparse(parsed_url._replace(fragment=''))
\ No newline at end of file
+    return urlunparse(parsed_url._replace(fragment=''))
+
+# --- 6. State Files ---
+# Small JSON files the scheduler and runner keep between restarts
+# (learned intervals, run checkpoints, durations...).
+def load_json_state(path, default=None):
+    """
+    Loads a JSON state file, returning `default` if it is missing or unreadable.
+    """
+    import json
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ Could not read state file '{path}': {e}")
+        return default
+
+
+def save_json_state(path, data):
+    """
+    Writes a JSON state file atomically (temp file + rename), so a crash mid-write
+    never leaves a half-written file behind. Every call writes its own temp
+    file, so threads or processes saving the same path don't share one.
+    """
+    import json
+    import tempfile
+    state_dir = os.path.dirname(path)
+    if state_dir and not os.path.exists(state_dir):
+        os.makedirs(state_dir, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=state_dir or ".", prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+# --- 7. HTML Parsing ---
+def make_soup(markup, encoding=None):
+    """
+    Parses a page with BeautifulSoup's html.parser.
+
+    Raw page bytes are decoded as `encoding` (see http_client.page_encoding),
+    so bs4 only falls back to guessing the charset if that one fails.
+    Text (e.g. a Selenium page_source) is parsed as is.
+    """
+    from bs4 import BeautifulSoup
+    if isinstance(markup, bytes):
+        return BeautifulSoup(markup, "html.parser", from_encoding=encoding)
+    return BeautifulSoup(markup, "html.parser")
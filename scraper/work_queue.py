@@ -0,0 +1,436 @@
+import fcntl
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+
+from scraper.config import (
+    QUEUE_BACKEND,
+    QUEUE_LEASE_SECONDS,
+    QUEUE_MAX_ATTEMPTS,
+    QUEUE_PATH,
+    QUEUE_POLL_SECONDS,
+    SOURCE_TIMEOUT,
+    STATE_DIR,
+)
+from scraper.sources import get_source
+from scraper.utils import load_json_state, save_json_state
+
+logger = logging.getLogger("event_scraper_log")
+
+# --- Work queue ---
+# A source run becomes a job in a shared backend. Workers (scraper/worker.py)
+# claim a job by taking a lease on it, renew the lease while the source runs
+# and store the result when it ends. A lease that runs out means the worker
+# died, so the job is queued again for someone else.
+#
+# A job is a dict:
+#   id, name, kind ("selenium" or "http", so workers can split the sources),
+#   status ("queued", "leased" or "done"), attempts, worker, lease_expires,
+#   enqueued_at, finished_at, result (the runner result, see scraper/runner.py)
+#
+# Backends, all with the same methods:
+#   SQLiteQueue: one file, for worker processes on one machine (or a shared disk)
+#   MongoQueue:  a collection next to the events, for workers on several machines
+#   FileQueue:   a locked JSON file, a dependency-free stand-in for tests
+#
+# Lease times are wall-clock timestamps, so machines sharing a queue need
+# roughly synchronised clocks.
+
+# Runner result keys stored with a finished job (the events themselves are not).
+RESULT_KEYS = ("name", "status", "seconds", "error", "writes", "timings")
+
+
+def job_kind(name):
+    return "selenium" if get_source(name).get("selenium") else "http"
+
+
+def _new_job(name):
+    return {
+        "id": uuid.uuid4().hex,
+        "name": name,
+        "kind": job_kind(name),
+        "status": "queued",
+        "attempts": 0,
+        "worker": None,
+        "lease_expires": None,
+        "enqueued_at": time.time(),
+        "finished_at": None,
+        "result": None,
+    }
+
+
+def _expired_result(job):
+    return {"name": job["name"], "status": "error", "seconds": 0, "writes": None, "timings": None,
+            "error": f"lease expired {job['attempts']} times (last worker: {job['worker']})"}
+
+
+class SQLiteQueue:
+    """Work queue in a SQLite file. Every call opens its own connection, so it is thread and process safe."""
+
+    def __init__(self, path=None, max_attempts=None):
+        self.path = path or os.path.join(STATE_DIR, "work_queue.db")
+        self.max_attempts = max_attempts or QUEUE_MAX_ATTEMPTS
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, name TEXT, kind TEXT, status TEXT, attempts INTEGER,"
+                " worker TEXT, lease_expires REAL, enqueued_at REAL, finished_at REAL, result TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, enqueued_at)")
+
+    @contextmanager
+    def _transaction(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            # IMMEDIATE takes the write lock up front, so two workers can't
+            # both read the same queued job and claim it.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_job(row):
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def enqueue(self, name):
+        """Queue a run of `name`; if one is already queued or running, return that job's id."""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT id FROM jobs WHERE name = ? AND status != 'done'", (name,)).fetchone()
+            if row:
+                return row["id"]
+            job = _new_job(name)
+            conn.execute(
+                "INSERT INTO jobs (id, name, kind, status, attempts, enqueued_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job["id"], job["name"], job["kind"], job["status"], job["attempts"], job["enqueued_at"]),
+            )
+            return job["id"]
+
+    def claim(self, worker, kinds=None, lease_seconds=None):
+        """Lease the oldest queued job (of one of `kinds`) to `worker`, or return None."""
+        lease_seconds = lease_seconds or QUEUE_LEASE_SECONDS
+        query = "SELECT * FROM jobs WHERE status = 'queued'"
+        params = []
+        if kinds:
+            query += f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            params.extend(kinds)
+        query += " ORDER BY enqueued_at LIMIT 1"
+
+        with self._transaction() as conn:
+            row = conn.execute(query, params).fetchone()
+            if not row:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                (worker, time.time() + lease_seconds, row["id"]),
+            )
+            return self._to_job(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+
+    def heartbeat(self, job_id, worker, lease_seconds=None):
+        """Extend the lease. False means the job is no longer this worker's."""
+        lease_seconds = lease_seconds or QUEUE_LEASE_SECONDS
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + lease_seconds, job_id, worker),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id, worker, result):
+        """Store the result of a leased job. False if the lease was lost in the meantime."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', finished_at = ?, result = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time(), json.dumps(result), job_id, worker),
+            )
+            return cursor.rowcount == 1
+
+    def requeue_expired(self):
+        """Put jobs with an expired lease back on the queue (or give up on them). Returns how many."""
+        now = time.time()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'leased' AND lease_expires < ?", (now,)
+            ).fetchall()
+            for row in rows:
+                job = self._to_job(row)
+                if job["attempts"] >= self.max_attempts:
+                    conn.execute("UPDATE jobs SET status = 'done', finished_at = ?, result = ? WHERE id = ?",
+                                 (now, json.dumps(_expired_result(job)), job["id"]))
+                else:
+                    conn.execute("UPDATE jobs SET status = 'queued', worker = NULL, lease_expires = NULL WHERE id = ?",
+                                 (job["id"],))
+            return len(rows)
+
+    def get(self, job_ids):
+        if not job_ids:
+            return []
+        with self._transaction() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM jobs WHERE id IN ({', '.join('?' for _ in job_ids)})", list(job_ids)
+            ).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def remove(self, job_ids, status):
+        """Delete the jobs among `job_ids` that are in `status` ("queued" or "leased" to cancel, "done" to clean up)."""
+        if not job_ids:
+            return
+        with self._transaction() as conn:
+            conn.execute(
+                f"DELETE FROM jobs WHERE status = ? AND id IN ({', '.join('?' for _ in job_ids)})",
+                [status, *job_ids],
+            )
+
+
+class MongoQueue:
+    """Work queue in a Mongo collection of the events database (see database/db_operations.py)."""
+
+    def __init__(self, collection=None, max_attempts=None):
+        from database.db_operations import get_database
+
+        self.collection = collection if collection is not None else get_database()["scrape_jobs"]
+        self.max_attempts = max_attempts or QUEUE_MAX_ATTEMPTS
+        self.collection.create_index([("status", 1), ("kind", 1), ("enqueued_at", 1)])
+        self.collection.create_index([("name", 1), ("status", 1)])
+
+    @staticmethod
+    def _to_job(document):
+        if document is None:
+            return None
+        job = dict(document)
+        job["id"] = job.pop("_id")
+        return job
+
+    def enqueue(self, name):
+        active = self.collection.find_one({"name": name, "status": {"$ne": "done"}}, {"_id": 1})
+        if active:
+            return active["_id"]
+        job = _new_job(name)
+        job["_id"] = job.pop("id")
+        self.collection.insert_one(job)
+        return job["_id"]
+
+    def claim(self, worker, kinds=None, lease_seconds=None):
+        from pymongo import ReturnDocument
+
+        lease_seconds = lease_seconds or QUEUE_LEASE_SECONDS
+        query = {"status": "queued"}
+        if kinds:
+            query["kind"] = {"$in": list(kinds)}
+        # find_one_and_update is atomic, so each job goes to exactly one worker.
+        return self._to_job(self.collection.find_one_and_update(
+            query,
+            {"$set": {"status": "leased", "worker": worker, "lease_expires": time.time() + lease_seconds},
+             "$inc": {"attempts": 1}},
+            sort=[("enqueued_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        ))
+
+    def heartbeat(self, job_id, worker, lease_seconds=None):
+        lease_seconds = lease_seconds or QUEUE_LEASE_SECONDS
+        result = self.collection.update_one(
+            {"_id": job_id, "worker": worker, "status": "leased"},
+            {"$set": {"lease_expires": time.time() + lease_seconds}},
+        )
+        return result.matched_count == 1
+
+    def complete(self, job_id, worker, result):
+        update = self.collection.update_one(
+            {"_id": job_id, "worker": worker, "status": "leased"},
+            {"$set": {"status": "done", "finished_at": time.time(), "result": result}},
+        )
+        return update.matched_count == 1
+
+    def requeue_expired(self):
+        now = time.time()
+        count = 0
+        for document in self.collection.find({"status": "leased", "lease_expires": {"$lt": now}}):
+            job = self._to_job(document)
+            if job["attempts"] >= self.max_attempts:
+                update = {"$set": {"status": "done", "finished_at": now, "result": _expired_result(job)}}
+            else:
+                update = {"$set": {"status": "queued", "worker": None, "lease_expires": None}}
+            # Match the lease again so a heartbeat that just came in wins.
+            result = self.collection.update_one(
+                {"_id": job["id"], "status": "leased", "lease_expires": {"$lt": now}}, update
+            )
+            count += result.modified_count
+        return count
+
+    def get(self, job_ids):
+        return [self._to_job(document) for document in self.collection.find({"_id": {"$in": list(job_ids)}})]
+
+    def remove(self, job_ids, status):
+        self.collection.delete_many({"_id": {"$in": list(job_ids)}, "status": status})
+
+
+class FileQueue:
+    """Work queue in a JSON file, locked with flock on every call. For tests and single-machine trials."""
+
+    def __init__(self, path=None, max_attempts=None):
+        self.path = path or os.path.join(STATE_DIR, "work_queue.json")
+        self.max_attempts = max_attempts or QUEUE_MAX_ATTEMPTS
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+    @contextmanager
+    def _jobs(self):
+        """Yield the jobs dict (id -> job) under an exclusive lock and save it afterwards."""
+        with open(self.path + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                jobs = load_json_state(self.path, {})
+                yield jobs
+                save_json_state(self.path, jobs)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def enqueue(self, name):
+        with self._jobs() as jobs:
+            for job in jobs.values():
+                if job["name"] == name and job["status"] != "done":
+                    return job["id"]
+            job = _new_job(name)
+            jobs[job["id"]] = job
+            return job["id"]
+
+    def claim(self, worker, kinds=None, lease_seconds=None):
+        lease_seconds = lease_seconds or QUEUE_LEASE_SECONDS
+        with self._jobs() as jobs:
+            queued = [job for job in jobs.values()
+                      if job["status"] == "queued" and (not kinds or job["kind"] in kinds)]
+            if not queued:
+                return None
+            job = min(queued, key=lambda job: job["enqueued_at"])
+            job.update(status="leased", worker=worker, lease_expires=time.time() + lease_seconds,
+                       attempts=job["attempts"] + 1)
+            return dict(job)
+
+    def heartbeat(self, job_id, worker, lease_seconds=None):
+        lease_seconds = lease_seconds or QUEUE_LEASE_SECONDS
+        with self._jobs() as jobs:
+            job = jobs.get(job_id)
+            if not job or job["worker"] != worker or job["status"] != "leased":
+                return False
+            job["lease_expires"] = time.time() + lease_seconds
+            return True
+
+    def complete(self, job_id, worker, result):
+        with self._jobs() as jobs:
+            job = jobs.get(job_id)
+            if not job or job["worker"] != worker or job["status"] != "leased":
+                return False
+            job.update(status="done", finished_at=time.time(), result=result)
+            return True
+
+    def requeue_expired(self):
+        now = time.time()
+        count = 0
+        with self._jobs() as jobs:
+            for job in jobs.values():
+                if job["status"] != "leased" or job["lease_expires"] >= now:
+                    continue
+                if job["attempts"] >= self.max_attempts:
+                    job.update(status="done", finished_at=now, result=_expired_result(job))
+                else:
+                    job.update(status="queued", worker=None, lease_expires=None)
+                count += 1
+        return count
+
+    def get(self, job_ids):
+        with self._jobs() as jobs:
+            return [dict(jobs[job_id]) for job_id in job_ids if job_id in jobs]
+
+    def remove(self, job_ids, status):
+        with self._jobs() as jobs:
+            for job_id in job_ids:
+                if job_id in jobs and jobs[job_id]["status"] == status:
+                    del jobs[job_id]
+
+
+BACKENDS = {"sqlite": SQLiteQueue, "mongo": MongoQueue, "file": FileQueue}
+
+
+def open_queue(backend=None, path=None):
+    """The queue configured by SCRAPER_QUEUE_BACKEND / SCRAPER_QUEUE_PATH (or the arguments)."""
+    backend = backend or QUEUE_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown queue backend '{backend}'. Set SCRAPER_QUEUE_BACKEND to one of: {', '.join(BACKENDS)}")
+    if backend == "mongo":
+        return MongoQueue()
+    return BACKENDS[backend](path or QUEUE_PATH or None)
+
+
+def run_queued(names, queue=None, wait_timeout=None, poll_seconds=None, on_result=None):
+    """
+    Queue a run of every source in `names` and wait for the workers to finish them.
+    Stands in for runner.run_sources when the work is spread over worker processes.
+
+    Jobs that haven't finished after `wait_timeout` seconds (default: SOURCE_TIMEOUT
+    per source) are reported as timed out and taken off the queue, whether nobody
+    claimed them or a worker still holds the lease (its heartbeat then fails and
+    its result is dropped), so the next pass queues them afresh instead of waiting
+    for the lease to run out. Finished jobs are deleted once their results are read.
+
+    `on_result(result)` is called as each job finishes; an exception from it is
+    logged and doesn't stop the wait.
+
+    Returns:
+        list[dict]: Runner-style results (see scraper/runner.py), in the order of `names`.
+    """
+    queue = queue or open_queue()
+    wait_timeout = wait_timeout or SOURCE_TIMEOUT * max(1, len(names))
+    poll_seconds = poll_seconds or QUEUE_POLL_SECONDS
+
+    job_ids = {name: queue.enqueue(name) for name in names}
+    logger.info(f"Queued {len(job_ids)} jobs: {', '.join(names)}")
+
+    results = {}
+
+    def collect():
+        # The waiting side also reclaims expired leases, so a dead worker's job
+        # is requeued (or given up on) even when every other worker is busy.
+        queue.requeue_expired()
+        for job in queue.get([job_id for name, job_id in job_ids.items() if name not in results]):
+            if job["status"] == "done":
+                result = dict(job["result"], name=job["name"], result=None)
+                results[job["name"]] = result
+                if on_result:
+                    try:
+                        on_result(result)
+                    except Exception as e:
+                        logger.warning(f"Result handler failed for '{job['name']}': {e}")
+
+    deadline = time.monotonic() + wait_timeout
+    while len(results) < len(job_ids) and time.monotonic() < deadline:
+        collect()
+        if len(results) < len(job_ids):
+            time.sleep(poll_seconds)
+    if len(results) < len(job_ids):
+        collect()
+
+    # Results are only read here, so finished jobs can go.
+    queue.remove([job_ids[name] for name in results], "done")
+
+    missing = [name for name in names if name not in results]
+    if missing:
+        for status in ("queued", "leased"):
+            queue.remove([job_ids[name] for name in missing], status)
+        logger.error(f"Gave up waiting for {', '.join(missing)} after {wait_timeout}s.")
+        for name in missing:
+            results[name] = {"name": name, "status": "timeout", "seconds": wait_timeout, "result": None,
+                             "error": f"no result from the workers after {wait_timeout}s", "writes": None,
+                             "timings": None}
+    return [results[name] for name in names]
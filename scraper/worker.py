@@ -0,0 +1,104 @@
+import argparse
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+
+from scraper.config import QUEUE_LEASE_SECONDS, QUEUE_POLL_SECONDS
+from scraper.runner import run_sources
+from scraper.sources import lazy_source
+from scraper.work_queue import RESULT_KEYS, open_queue
+
+logger = logging.getLogger("event_scraper_log")
+
+# --- Queue worker ---
+# Claims source runs from the shared work queue (scraper/work_queue.py) and runs
+# them one at a time; start several to run several sources at once.
+#
+#     python -m scraper.worker                   # any source
+#     python -m scraper.worker --kinds selenium  # only the browser sources
+#     python -m scraper.worker --kinds http --exit-when-idle
+
+
+def _keep_lease(queue, job, worker_id, lease_seconds, stop):
+    """Renew the job's lease until `stop` is set (a third of the lease between renewals)."""
+    while not stop.wait(lease_seconds / 3):
+        try:
+            if not queue.heartbeat(job["id"], worker_id, lease_seconds):
+                logger.warning(f"Worker {worker_id} lost the lease on '{job['name']}'.")
+                return
+        except Exception as e:
+            # Keep trying: the lease only runs out if renewals fail for its whole length.
+            logger.error(f"Heartbeat for '{job['name']}' failed: {e}")
+
+
+def run_job(queue, job, worker_id, lease_seconds=None):
+    """Run one claimed job while keeping its lease alive, then store its result."""
+    lease_seconds = lease_seconds or QUEUE_LEASE_SECONDS
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_keep_lease, args=(queue, job, worker_id, lease_seconds, stop),
+                                 name=f"lease-{job['name']}", daemon=True)
+    heartbeat.start()
+    try:
+        result = run_sources([lazy_source(job["name"])], max_workers=1)[0]
+    finally:
+        stop.set()
+        heartbeat.join()
+
+    if not queue.complete(job["id"], worker_id, {key: result[key] for key in RESULT_KEYS}):
+        logger.warning(f"Result of '{job['name']}' dropped: the job was requeued while it ran.")
+    return result
+
+
+def run_worker(queue=None, kinds=None, worker_id=None, lease_seconds=None, poll_seconds=None, exit_when_idle=False):
+    """
+    Claim and run jobs until interrupted (or until the queue has nothing for
+    this worker, with `exit_when_idle`). Returns how many jobs were run.
+    """
+    queue = queue or open_queue()
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    poll_seconds = poll_seconds or QUEUE_POLL_SECONDS
+    logger.info(f"Worker {worker_id} started ({', '.join(kinds) if kinds else 'all'} sources).")
+
+    jobs_run = 0
+    while True:
+        queue.requeue_expired()
+        job = queue.claim(worker_id, kinds, lease_seconds)
+        if job is None:
+            if exit_when_idle:
+                break
+            time.sleep(poll_seconds)
+            continue
+
+        logger.info(f"Worker {worker_id} running '{job['name']}' (attempt {job['attempts']}).")
+        run_job(queue, job, worker_id, lease_seconds)
+        jobs_run += 1
+
+    logger.info(f"Worker {worker_id} stopping after {jobs_run} jobs.")
+    return jobs_run
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m scraper.worker", description="Run sources from the work queue.")
+    parser.add_argument("--backend", help="sqlite, mongo or file (SCRAPER_QUEUE_BACKEND)")
+    parser.add_argument("--path", help="queue file for the sqlite/file backends (SCRAPER_QUEUE_PATH)")
+    parser.add_argument("--kinds", nargs="+", choices=["selenium", "http"], help="only claim these kinds of sources")
+    parser.add_argument("--worker-id", help="name of this worker (default: host:pid)")
+    parser.add_argument("--exit-when-idle", action="store_true", help="stop once there is nothing to claim")
+    args = parser.parse_args(argv)
+
+    from scraper.utils import setup_logger
+    setup_logger("event_scraper_log", "logs/app.log")
+
+    try:
+        run_worker(open_queue(args.backend, args.path), kinds=args.kinds, worker_id=args.worker_id,
+                   exit_when_idle=args.exit_when_idle)
+    except KeyboardInterrupt:
+        logger.info("Worker stopped by user.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
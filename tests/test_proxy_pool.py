@@ -0,0 +1,194 @@
+import http.server
+import socket
+import threading
+import urllib.request
+
+import pytest
+import requests
+
+from scraper import http_client, proxy_pool, rate_limit
+
+# Local stand-ins for the egress proxies of scraper/proxy_pool.py: a site, a
+# forwarding proxy that relays plain-HTTP requests to it, a proxy whose address
+# is blocked (403 for everything) and an address where nothing listens.
+
+
+class _Site(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/slow"):
+            threading.Event().wait(1)
+        body = f"page {self.path}".encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _ForwardProxy(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        # A proxied request names the whole URL: GET http://host:port/path
+        type(self.server).hits += 1
+        try:
+            with urllib.request.build_opener(urllib.request.ProxyHandler({})).open(self.path, timeout=5) as upstream:
+                status, body = upstream.status, upstream.read()
+        except Exception:
+            status, body = 502, b""
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _BlockedProxy(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        type(self.server).hits += 1
+        self.send_response(403)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve(handler):
+    server_class = type(f"{handler.__name__}Server", (http.server.ThreadingHTTPServer,), {"hits": 0})
+    server = server_class(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _unused_address():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+@pytest.fixture
+def servers(monkeypatch):
+    for name in ("NO_PROXY", "no_proxy", "HTTP_PROXY", "http_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    site, good, blocked = _serve(_Site), _serve(_ForwardProxy), _serve(_BlockedProxy)
+    yield {
+        "site": f"http://127.0.0.1:{site.server_port}",
+        "good": f"http://127.0.0.1:{good.server_port}",
+        "blocked": f"http://127.0.0.1:{blocked.server_port}",
+        "dead": _unused_address(),
+        "good_server": good,
+        "blocked_server": blocked,
+    }
+    for server in (site, good, blocked):
+        server.shutdown()
+
+
+@pytest.fixture
+def use_pool(monkeypatch):
+    """Install a pool of the given proxies, with quick cooldowns and no pacing or backoff."""
+    monkeypatch.setattr(proxy_pool, "PROXIES_PER_HOST", 2)
+    monkeypatch.setattr(proxy_pool, "PROXY_MIN_REQUESTS", 2)
+    monkeypatch.setattr(proxy_pool, "PROXY_MAX_ERROR_RATE", 0.3)
+    monkeypatch.setattr(proxy_pool, "PROXY_COOLDOWN_SECONDS", 60)
+    monkeypatch.setattr(proxy_pool, "PROXY_MAX_COOLDOWNS", 2)
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT", False)
+    monkeypatch.setattr(http_client, "HTTP_RETRIES", 2)
+    monkeypatch.setattr(http_client, "retry_delay", lambda attempt, retry_after=None: 0)
+
+    def install(*proxies):
+        pool = proxy_pool.ProxyPool(list(proxies))
+        monkeypatch.setattr(proxy_pool, "_pool", pool)
+        return pool
+
+    return install
+
+
+def _fail(pool, proxy, times):
+    for _ in range(times):
+        pool.record(proxy, error=True)
+
+
+def test_choose_spreads_hosts_and_avoids_the_failed_proxy(use_pool):
+    pool = use_pool("http://p1:1", "http://p2:2", "http://p3:3")
+    first = pool.choose("http://a.test/")
+    assert len(pool._hosts["a.test"]) == 2
+    # The next host gets the proxy no host uses yet.
+    pool.choose("http://b.test/")
+    unused = ({"http://p1:1", "http://p2:2", "http://p3:3"} - set(pool._hosts["a.test"])).pop()
+    assert unused in pool._hosts["b.test"]
+    retry = pool.choose("http://a.test/", avoid=first)
+    assert retry != first and retry in pool._hosts["a.test"]
+
+
+def test_choose_prefers_the_better_score(use_pool):
+    pool = use_pool("http://fast:1", "http://slow:2")
+    pool.record("http://fast:1", seconds=0.1, status=200)
+    pool.record("http://slow:2", seconds=2.0, status=200)
+    assert pool.choose("http://a.test/") == "http://fast:1"
+
+
+def test_failing_proxy_cools_down_then_is_evicted(use_pool):
+    pool = use_pool("http://bad:1", "http://ok:2")
+    _fail(pool, "http://bad:1", 2)
+    assert pool.report()["http://bad:1"]["state"] == "cooling"
+    assert all(pool.choose("http://a.test/") == "http://ok:2" for _ in range(5))
+
+    pool.proxies["http://bad:1"].cooling_until = 0  # cooldown over
+    _fail(pool, "http://bad:1", 2)
+    assert pool.report()["http://bad:1"]["state"] == "evicted"
+    pool.proxies["http://bad:1"].cooling_until = 0
+    assert pool.choose("http://a.test/") == "http://ok:2"
+
+
+def test_no_direct_fallback_when_every_proxy_is_out(use_pool, servers):
+    pool = use_pool(servers["blocked"])
+    _fail(pool, servers["blocked"], 2)
+    with pytest.raises(proxy_pool.NoProxyAvailable):
+        http_client.get(servers["site"] + "/none-left")
+
+
+def test_direct_is_used_only_when_listed(use_pool, servers):
+    use_pool(proxy_pool.DIRECT)
+    response = http_client.get(servers["site"] + "/direct")
+    assert response.status_code == 200 and response.content == b"page /direct"
+
+
+def test_request_goes_through_the_proxy(use_pool, servers):
+    pool = use_pool(servers["good"])
+    response = http_client.get(servers["site"] + "/via-proxy")
+    assert response.content == b"page /via-proxy"
+    assert servers["good_server"].hits == 1
+    assert pool.report()[servers["good"]]["error_rate"] == 0
+
+
+def test_blocked_proxy_is_retried_through_another(use_pool, servers):
+    pool = use_pool(servers["blocked"], servers["good"])
+    # Make the blocked proxy look best so the first attempt goes through it.
+    pool.record(servers["blocked"], seconds=0.001, status=200)
+    pool.record(servers["good"], seconds=1.0, status=200)
+
+    response = http_client.get(servers["site"] + "/retry")
+    assert response.status_code == 200 and response.content == b"page /retry"
+    assert servers["blocked_server"].hits == 1
+    assert pool.report()[servers["blocked"]]["error_rate"] > 0
+
+
+def test_unreachable_proxy_counts_against_it(use_pool, servers):
+    pool = use_pool(servers["dead"], servers["good"])
+    pool.record(servers["dead"], seconds=0.001, status=200)
+    pool.record(servers["good"], seconds=1.0, status=200)
+
+    response = http_client.get(servers["site"] + "/dead-proxy")
+    assert response.status_code == 200
+    assert pool.report()[servers["dead"]]["error_rate"] > 0
+
+
+def test_site_timeouts_do_not_count_against_the_proxy(use_pool, servers):
+    pool = use_pool(servers["good"])
+    for _ in range(3):
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            http_client.get(servers["site"] + "/slow", timeout=(2, 0.2))
+    assert pool.report()[servers["good"]] == {"latency": 0.0, "error_rate": 0.0, "state": "ok"}